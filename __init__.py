@@ -8,16 +8,68 @@ __version__ = "0.1.0"
 
 # Import core functionality from litetoolllm and re-export
 from litetoolllm.core import structured_completion, astructured_completion, UnifiedResponse
-from litetoolllm.tools import Tool
-from litetoolllm.errors import StructuredValidationError
-from litetoolllm.utils import convert_tools_to_api_format
+from litetoolllm.streaming import structured_completion_stream, astructured_completion_stream, StreamEvent
+from litetoolllm.batch import abatch_structured_completion, batch_structured_completion, BatchResult
+from litetoolllm.tools import Tool, ToolCachePolicy, ToolLimit
+from litetoolllm.conversation import Conversation
+from litetoolllm.errors import StructuredValidationError, ToolTimeoutError, DeadlineExceededError
+from litetoolllm.utils import convert_tools_to_api_format, clear_model_capability_cache
+from litetoolllm.registry import ToolRegistry, compile_tools, clear_tool_registry_cache
+from litetoolllm.cache import ResponseCache, InMemoryResponseCache, SQLiteResponseCache
+from litetoolllm.serialization import JSONCodec, set_json_codec
+from litetoolllm.hedging import HedgePolicy
+from litetoolllm.instrumentation import TraceEvent, add_trace_hook, remove_trace_hook, LoggingHook, OpenTelemetryHook
+from litetoolllm.usage import UsageReport, IterationUsage
+from litetoolllm.context import ContextBudget
+from litetoolllm.artifacts import Artifact, ArtifactStore, InMemoryArtifactStore, MmapArtifactStore, ArtifactSet
+from litetoolllm.client import LiteToolClient
+from litetoolllm.scheduling import ToolScheduler, get_tool_scheduler, SingleFlight, get_single_flight
 
 # Make these accessible directly from litecallllm
 __all__ = [
     'structured_completion', 
     'astructured_completion', 
     'UnifiedResponse', 
+    'structured_completion_stream',
+    'astructured_completion_stream',
+    'StreamEvent',
+    'abatch_structured_completion',
+    'batch_structured_completion',
+    'BatchResult',
     'Tool', 
+    'ToolCachePolicy',
+    'ToolLimit',
+    'Conversation',
     'StructuredValidationError',
-    'convert_tools_to_api_format'
+    'ToolTimeoutError',
+    'DeadlineExceededError',
+    'convert_tools_to_api_format',
+    'ToolRegistry',
+    'compile_tools',
+    'clear_tool_registry_cache',
+    'clear_model_capability_cache',
+    'ResponseCache',
+    'InMemoryResponseCache',
+    'SQLiteResponseCache',
+    'JSONCodec',
+    'set_json_codec',
+    'HedgePolicy',
+    'TraceEvent',
+    'add_trace_hook',
+    'remove_trace_hook',
+    'LoggingHook',
+    'OpenTelemetryHook',
+    'UsageReport',
+    'IterationUsage',
+    'ContextBudget',
+    'Artifact',
+    'ArtifactStore',
+    'InMemoryArtifactStore',
+    'MmapArtifactStore',
+    'ArtifactSet',
+    'LiteToolClient',
+    'ToolScheduler',
+    'get_tool_scheduler',
+    'SingleFlight',
+    'get_single_flight',
 ] 
\ No newline at end of file
@@ -0,0 +1,35 @@
+"""
+Microbenchmark: model capability validation overhead per request.
+
+Compares calling litellm's ``supports_response_schema`` and
+``supports_function_calling`` directly (what every request used to pay) with
+the cached ``get_model_capabilities`` used by ``validate_model_capabilities``.
+
+Run from the repository root with: python -m benchmarks.bench_capabilities
+"""
+import os
+import timeit
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+from litetoolllm.utils import get_model_capabilities
+
+MODELS = ["gpt-4o-mini", "gpt-4o", "gemini/gemini-2.0-flash"]
+
+
+def uncached(model):
+    litellm.supports_response_schema(model=model)
+    litellm.supports_function_calling(model=model)
+
+
+def main(number=500):
+    print(f"{'model':<40} {'uncached (us)':>14} {'cached (us)':>12}")
+    for model in MODELS:
+        before = timeit.timeit(lambda: uncached(model), number=number)
+        after = timeit.timeit(lambda: get_model_capabilities(model), number=number)
+        print(f"{model:<40} {before / number * 1e6:>14.2f} {after / number * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: history handling cost in a 50-turn tool chain.
+
+Drives ``_handle_tool_call_loop_async`` against an in-process fake provider
+(no network) and compares it with the previous pattern of rebuilding the
+message list (``[*messages, *new_messages]``) and ``model_dump()``-ing the
+assistant message on every turn. Reports CPU time and peak traced memory.
+
+Run from the repository root with: python -m benchmarks.bench_conversation
+"""
+import os
+import json
+import time
+import asyncio
+import tracemalloc
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+import litetoolllm.utils as utils
+from litetoolllm.utils import _handle_tool_call_loop_async, handle_tool_calls_async, get_tool_calls
+
+TURNS = 50
+TOOL_OUTPUT_SIZE = 20_000
+
+
+def big_lookup(page: int) -> str:
+    """
+    Return a large page of text
+    :param page: int
+    :return: str
+    """
+    return "x" * TOOL_OUTPUT_SIZE
+
+
+def _tool_turn(turn):
+    return litellm.ModelResponse(choices=[{"message": {
+        "role": "assistant", "content": None,
+        "tool_calls": [{"id": f"call_{turn}", "type": "function",
+                        "function": {"name": "big_lookup", "arguments": json.dumps({"page": turn})}}],
+    }}])
+
+
+RESPONSES = [_tool_turn(turn) for turn in range(TURNS)] + [
+    litellm.ModelResponse(choices=[{"message": {"role": "assistant", "content": "done"}}])]
+
+
+def _fake_provider():
+    turn = 0
+
+    async def acompletion(**kwargs):
+        nonlocal turn
+        turn += 1
+        return RESPONSES[turn]
+    return acompletion
+
+
+async def legacy_loop(messages, raw_response, tools):
+    # The pre-Conversation loop body: copy the history and dump the assistant message each turn
+    while get_tool_calls(raw_response) is not None:
+        new_messages = await handle_tool_calls_async(raw_response=raw_response, tools=tools, metadata=None)
+        new_messages[0] = new_messages[0].model_dump()
+        messages = [*messages, *new_messages]
+        raw_response = await utils.acompletion(model="fake", messages=messages, tools=None)
+    return messages
+
+
+async def current_loop(messages, raw_response, tools):
+    messages, _ = await _handle_tool_call_loop_async(
+        kwargs={}, max_recursion=TURNS + 2, messages=messages, model="fake", raw_response=raw_response,
+        response_model=None, metadata=None, tools=tools)
+    return messages
+
+
+def _run(loop_fn):
+    utils.acompletion = _fake_provider()
+    messages = [{"role": "user", "content": "read everything"}]
+    return asyncio.run(loop_fn(messages, RESPONSES[0], [big_lookup]))
+
+
+def measure(loop_fn):
+    start = time.process_time()
+    _run(loop_fn)
+    cpu = time.process_time() - start
+    tracemalloc.start()
+    _run(loop_fn)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return cpu, peak
+
+
+def main():
+    original = utils.acompletion
+    try:
+        print(f"{TURNS} turns, {TOOL_OUTPUT_SIZE // 1000} KB tool output per turn")
+        print(f"{'loop':<22} {'cpu (ms)':>10} {'peak mem (MB)':>14}")
+        for name, loop_fn in (("legacy (copying)", legacy_loop), ("conversation buffer", current_loop)):
+            cpu, peak = measure(loop_fn)
+            print(f"{name:<22} {cpu * 1000:>10.1f} {peak / 1e6:>14.2f}")
+    finally:
+        utils.acompletion = original
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Benchmark: wall-clock time of one turn with N slow I/O tools in the sync path.
+
+Compares sequential execution (``max_workers=1``) with the bounded thread pool
+used by ``structured_completion`` by default.
+
+Run from the repository root with: python -m benchmarks.bench_parallel_tools
+"""
+import os
+import json
+import time
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+from litetoolllm.utils import handle_tool_calls, DEFAULT_MAX_TOOL_WORKERS
+
+TOOL_LATENCY = 0.1
+
+
+def slow_tool(key: str) -> dict:
+    """
+    Simulated I/O-bound tool
+    :param key: str
+    :return: dict
+    """
+    time.sleep(TOOL_LATENCY)
+    return {"key": key}
+
+
+def _turn(n):
+    return litellm.ModelResponse(choices=[{"message": {
+        "role": "assistant",
+        "content": None,
+        "tool_calls": [
+            {"id": f"call_{i}", "type": "function",
+             "function": {"name": "slow_tool", "arguments": json.dumps({"key": str(i)})}}
+            for i in range(n)
+        ],
+    }}])
+
+
+def main():
+    print(f"tool latency: {TOOL_LATENCY * 1000:.0f} ms, max_workers={DEFAULT_MAX_TOOL_WORKERS}")
+    print(f"{'tools':>6} {'sequential (s)':>16} {'parallel (s)':>14}")
+    for n in (1, 2, 5, 10, 20):
+        raw_response = _turn(n)
+        start = time.perf_counter()
+        handle_tool_calls(raw_response, [slow_tool], metadata=None, max_workers=1)
+        sequential = time.perf_counter() - start
+        start = time.perf_counter()
+        handle_tool_calls(raw_response, [slow_tool], metadata=None)
+        parallel = time.perf_counter() - start
+        print(f"{n:>6} {sequential:>16.3f} {parallel:>14.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Benchmark: parse/serialize hot paths for large nested response models.
+
+Compares the previous ``response_model.parse_raw`` against the cached
+``TypeAdapter.validate_json`` (from ``str`` and ``bytes``), and the stdlib
+``json`` codec against ``orjson`` (when installed) for tool arguments and
+tool results.
+
+Run from the repository root with: python -m benchmarks.bench_serialization
+"""
+import os
+import json
+import time
+import warnings
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from litetoolllm import serialization
+from litetoolllm.serialization import validate_json, JSONCodec
+
+ITERATIONS = 200
+
+
+class Address(BaseModel):
+    street: str
+    city: str
+    zip_code: str
+    tags: List[str]
+
+
+class LineItem(BaseModel):
+    sku: str
+    quantity: int
+    price: float
+    attributes: Dict[str, str]
+
+
+class Order(BaseModel):
+    id: int
+    shipping: Address
+    billing: Optional[Address] = None
+    items: List[LineItem]
+
+
+class Report(BaseModel):
+    customer: str
+    orders: List[Order]
+
+
+def _document(orders=50, items=20):
+    address = {"street": "1 Main St", "city": "Springfield", "zip_code": "12345", "tags": ["home", "primary"]}
+    return {"customer": "ACME", "orders": [
+        {"id": i, "shipping": address, "billing": address, "items": [
+            {"sku": f"SKU-{i}-{j}", "quantity": j, "price": j * 1.25, "attributes": {"color": "red", "size": "L"}}
+            for j in range(items)]}
+        for i in range(orders)]}
+
+
+def _time(fn):
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        fn()
+    return (time.perf_counter() - start) / ITERATIONS * 1e3
+
+
+def main():
+    data = _document()
+    text = json.dumps(data)
+    raw = text.encode()
+    print(f"response model: {len(text) / 1e3:.0f} KB JSON, {len(data['orders'])} orders")
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        rows = [("parse_raw (previous)", lambda: Report.parse_raw(text))]
+    rows += [
+        ("validate_json (str)", lambda: validate_json(Report, text)),
+        ("validate_json (bytes)", lambda: validate_json(Report, raw)),
+    ]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        for name, fn in rows:
+            print(f"  {name:<24} {_time(fn):>8.3f} ms")
+
+    codecs = [JSONCodec()]
+    if serialization.orjson is not None:
+        codecs.append(serialization.OrjsonCodec())
+    print("tool payload codec (loads + dumps):")
+    for codec in codecs:
+        print(f"  {codec.name:<24} {_time(lambda: codec.dumps(codec.loads(text))):>8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
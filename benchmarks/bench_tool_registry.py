@@ -0,0 +1,40 @@
+"""
+Microbenchmark: per-iteration tool schema cost in the tool-call loop.
+
+Compares rebuilding schemas with ``convert_tools_to_api_format`` (what the loop
+did on every turn) against looking up a compiled ``ToolRegistry``.
+
+Run from the repository root with: python -m benchmarks.bench_tool_registry
+"""
+import os
+import timeit
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+from litetoolllm.registry import compile_tools, convert_tools_to_api_format
+from litetoolllm.tools import (
+    Tool,
+    get_current_weather,
+    convert_fahrenheit_to_celsius,
+)
+
+TOOLS = [
+    get_current_weather,
+    convert_fahrenheit_to_celsius,
+    Tool(get_current_weather, name="weather_tool"),
+    Tool(convert_fahrenheit_to_celsius, name="celsius_tool"),
+]
+
+
+def main(number=2000):
+    compile_tools(TOOLS)
+    rebuild = timeit.timeit(lambda: convert_tools_to_api_format(TOOLS), number=number)
+    compiled = timeit.timeit(lambda: compile_tools(TOOLS).api_tools, number=number)
+    print(f"tools per set:               {len(TOOLS):10d}")
+    print(f"convert_tools_to_api_format: {rebuild / number * 1e6:10.2f} us/iteration")
+    print(f"compile_tools (cached):      {compiled / number * 1e6:10.2f} us/iteration")
+    print(f"speedup:                     {rebuild / compiled:10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Offline stand-in provider for benchmarks.
+
+``MockProvider`` is registered with litellm as a custom provider, so requests
+to ``mock/<name>`` go through the real ``litellm.completion`` /
+``acompletion`` code path without any network. Replies are scripted from the
+request itself (no per-client state), so any number of concurrent
+conversations can share one provider:
+
+* while fewer than ``tool_turns`` assistant turns have happened since the last
+  user message, the reply asks for ``calls_per_turn`` calls of ``tool_name``;
+* after that it answers with ``final_content`` (a string or a callable
+  building one from the request, e.g. JSON for a ``response_model``).
+
+Every reply waits ``latency`` seconds first (``time.sleep`` for sync,
+``asyncio.sleep`` for async calls) to simulate the provider round trip.
+"""
+import json
+import time
+import asyncio
+import threading
+
+import litellm
+from litellm import CustomLLM
+
+PROVIDER = "mock"
+MODEL = f"{PROVIDER}/agent"
+
+
+def _role(message):
+    return message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+
+
+def default_arguments(turn, index):
+    return {"key": f"{turn}-{index}"}
+
+
+def _turns_since_user(messages):
+    turns = 0
+    for message in reversed(messages):
+        role = _role(message)
+        if role == "user":
+            break
+        if role == "assistant":
+            turns += 1
+    return turns
+
+
+class MockProvider(CustomLLM):
+    """
+    Scripted, latency-configurable litellm provider.
+
+    Attributes:
+        latency (float): Seconds each reply takes
+        tool_turns (int): Assistant turns that request tools before the final answer
+        calls_per_turn (int): Tool calls per tool turn
+        tool_name (str): Tool the scripted calls target
+        arguments (Callable[[int, int], dict]): Builds the arguments of call ``index`` in ``turn``
+        final_content (Union[str, Callable[[dict], str]]): The final answer
+        requests (int): Number of requests served
+    """
+    def __init__(self, latency=0.0, tool_turns=1, calls_per_turn=1, tool_name="lookup",
+                 arguments=None, final_content="done"):
+        super().__init__()
+        self.latency = latency
+        self.tool_turns = tool_turns
+        self.calls_per_turn = calls_per_turn
+        self.tool_name = tool_name
+        self.arguments = arguments or default_arguments
+        self.final_content = final_content
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def configure(self, **settings):
+        for name, value in settings.items():
+            if not hasattr(self, name):
+                raise AttributeError(f"MockProvider has no setting {name!r}")
+            setattr(self, name, value)
+        return self
+
+    def reply(self, messages, optional_params=None):
+        with self._lock:
+            self.requests += 1
+        turn = _turns_since_user(messages)
+        if turn < self.tool_turns:
+            tool_calls = [
+                {"id": f"call_{turn}_{index}", "type": "function",
+                 "function": {"name": self.tool_name, "arguments": json.dumps(self.arguments(turn, index))}}
+                for index in range(self.calls_per_turn)
+            ]
+            message = {"role": "assistant", "content": None, "tool_calls": tool_calls}
+            finish_reason = "tool_calls"
+        else:
+            content = self.final_content
+            if callable(content):
+                content = content(optional_params or {})
+            message = {"role": "assistant", "content": content}
+            finish_reason = "stop"
+        prompt_tokens = 10 * len(messages)
+        return litellm.ModelResponse(
+            model=MODEL,
+            choices=[{"message": message, "finish_reason": finish_reason}],
+            usage={"prompt_tokens": prompt_tokens, "completion_tokens": 10, "total_tokens": prompt_tokens + 10},
+        )
+
+    def completion(self, model, messages, *args, optional_params=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.reply(messages, optional_params)
+
+    async def acompletion(self, model, messages, *args, optional_params=None, **kwargs):
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.reply(messages, optional_params)
+
+
+_provider = None
+
+
+def install(**settings) -> MockProvider:
+    """Register the mock provider with litellm (once) and apply ``settings``; requests go to ``MODEL``."""
+    global _provider
+    if _provider is None:
+        _provider = MockProvider()
+        litellm.custom_provider_map = [
+            *[entry for entry in litellm.custom_provider_map if entry.get("provider") != PROVIDER],
+            {"provider": PROVIDER, "custom_handler": _provider},
+        ]
+        litellm.register_model({MODEL: {
+            "litellm_provider": PROVIDER,
+            "mode": "chat",
+            "max_tokens": 100_000,
+            "supports_function_calling": True,
+            "supports_parallel_function_calling": True,
+            "supports_response_schema": True,
+        }})
+    defaults = dict(latency=0.0, tool_turns=1, calls_per_turn=1, tool_name="lookup", arguments=default_arguments,
+                    final_content="done")
+    _provider.configure(**{**defaults, **settings})
+    _provider.requests = 0
+    return _provider
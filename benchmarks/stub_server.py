@@ -0,0 +1,102 @@
+"""
+Local OpenAI-compatible stand-in server for transport benchmarks.
+
+Serves ``POST /v1/chat/completions`` over HTTP/1.1 keep-alive on 127.0.0.1
+and answers with the same request-derived script as
+``benchmarks.mock_provider.MockProvider`` (tool calls for the first
+``tool_turns`` turns, then a final answer). It counts the TCP connections it
+accepts, which shows whether clients reuse them.
+
+    with StubServer(tool_turns=1, latency=0.005) as server:
+        structured_completion(model=MODEL, api_base=server.base_url, api_key="stub", ...)
+"""
+import json
+import time
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import litellm
+
+from benchmarks.mock_provider import MockProvider
+
+MODEL = "openai/stub"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.stub.record_connection()
+
+    def do_POST(self):
+        stub = self.server.stub
+        length = int(self.headers.get("content-length") or 0)
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if stub.latency:
+            time.sleep(stub.latency)
+        response = stub.provider.reply(request.get("messages", []), request)
+        body = response.model_dump_json().encode()
+        # Status line, headers and body in one write so small responses are not delayed by Nagle/delayed ACK
+        head = (f"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+                f"Connection: keep-alive\r\n\r\n").encode()
+        self.wfile.write(head + body)
+        self.wfile.flush()
+
+
+class StubServer:
+    """
+    Threaded stand-in server; ``MODEL`` is registered with litellm as supporting tools.
+
+    Attributes:
+        provider (MockProvider): Scripts the replies
+        latency (float): Seconds each reply waits, on the server thread
+        connections (int): TCP connections accepted so far
+        requests (int): Requests served so far
+    """
+    def __init__(self, latency=0.0, **script):
+        self.provider = MockProvider(**script)
+        self.latency = latency
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+        litellm.register_model({MODEL: {"litellm_provider": "openai", "mode": "chat", "max_tokens": 100_000,
+                                        "supports_function_calling": True, "supports_response_schema": True}})
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/v1"
+
+    @property
+    def requests(self):
+        return self.provider.requests
+
+    def record_connection(self):
+        with self._lock:
+            self.connections += 1
+
+    def reset_counters(self):
+        with self._lock:
+            self.connections = 0
+            self.provider.requests = 0
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
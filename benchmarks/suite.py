@@ -0,0 +1,319 @@
+"""
+Offline benchmark suite for the tool-call loop.
+
+Every scenario runs against ``benchmarks.mock_provider`` (a scripted litellm
+custom provider, no network or API key) and reports machine-readable
+metrics:
+
+* ``turn_overhead``  - time per loop turn with a zero-latency provider, next to
+  a bare ``litellm.completion`` call, for the sync and async loops
+* ``tool_dispatch``  - cost per tool call of ``handle_tool_calls`` /
+  ``handle_tool_calls_async`` with a no-op tool
+* ``concurrency``    - throughput and latency percentiles of concurrent
+  ``astructured_completion`` calls against a fixed-latency provider
+* ``memory_growth``  - peak traced memory as the loop gets deeper
+* ``validation``     - parsing a large ``response_model`` from a response
+
+Results are written as JSON (``--output``) and can be compared with an
+earlier run (``--compare``); the exit status is 1 when a metric regressed by
+more than ``--threshold``.
+
+Run from the repository root with:
+    python -m benchmarks.suite [--quick] [--only NAME ...] [--output FILE] [--compare FILE]
+"""
+import os
+import gc
+import sys
+import json
+import time
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import litellm
+from pydantic import BaseModel
+
+from benchmarks import mock_provider
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.utils import handle_tool_calls, handle_tool_calls_async, parse_response_content
+
+SCHEMA_VERSION = 1
+MESSAGES = [{"role": "user", "content": "Run the benchmark"}]
+
+
+def lookup(key: str) -> str:
+    """
+    No-op lookup tool
+    :param key: str
+    :return: str
+    """
+    return key
+
+
+def _metric(benchmark, params, metric, value, unit, lower_is_better=True):
+    return {"benchmark": benchmark, "params": params, "metric": metric, "value": round(value, 3), "unit": unit,
+            "lower_is_better": lower_is_better}
+
+
+def _median_time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def _amedian_time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_turn_overhead(quick):
+    repeat = 10 if quick else 50
+    results = []
+    mock_provider.install()
+    # Warm litellm's lazy imports and caches before timing anything
+    structured_completion(model=mock_provider.MODEL, messages=MESSAGES, tools=[lookup])
+    raw = _median_time(lambda: litellm.completion(model=mock_provider.MODEL, messages=MESSAGES), repeat)
+    results.append(_metric("turn_overhead", {}, "raw_completion_us", raw * 1e6, "us"))
+    for tool_turns in (1, 4):
+        mock_provider.install(tool_turns=tool_turns)
+        turns = tool_turns + 1
+        sync = _median_time(lambda: structured_completion(model=mock_provider.MODEL, messages=MESSAGES,
+                                                          tools=[lookup], max_recursion=turns + 1), repeat)
+        async_ = asyncio.run(_amedian_time(lambda: astructured_completion(model=mock_provider.MODEL,
+                                                                          messages=MESSAGES, tools=[lookup],
+                                                                          max_recursion=turns + 1), repeat))
+        params = {"tool_turns": tool_turns}
+        results.append(_metric("turn_overhead", params, "sync_per_turn_us", sync / turns * 1e6, "us"))
+        results.append(_metric("turn_overhead", params, "sync_overhead_per_turn_us", (sync / turns - raw) * 1e6,
+                               "us"))
+        results.append(_metric("turn_overhead", params, "async_per_turn_us", async_ / turns * 1e6, "us"))
+    return results
+
+
+def _tool_turn(calls):
+    return litellm.ModelResponse(choices=[{"message": {
+        "role": "assistant", "content": None,
+        "tool_calls": [{"id": f"call_{i}", "type": "function",
+                        "function": {"name": "lookup", "arguments": json.dumps({"key": str(i)})}}
+                       for i in range(calls)],
+    }}])
+
+
+def bench_tool_dispatch(quick):
+    repeat = 20 if quick else 100
+    results = []
+    for calls in (1, 10, 50):
+        raw_response = _tool_turn(calls)
+        params = {"calls": calls}
+        for workers, label in ((1, "sequential"), (8, "pool")):
+            elapsed = _median_time(lambda: handle_tool_calls(raw_response, [lookup], metadata=None,
+                                                             max_workers=workers), repeat)
+            results.append(_metric("tool_dispatch", params, f"sync_{label}_us_per_call", elapsed / calls * 1e6, "us"))
+        elapsed = asyncio.run(_amedian_time(lambda: handle_tool_calls_async(raw_response, [lookup], metadata=None),
+                                            repeat))
+        results.append(_metric("tool_dispatch", params, "async_us_per_call", elapsed / calls * 1e6, "us"))
+    return results
+
+
+async def _concurrent_requests(concurrency):
+    async def one():
+        start = time.perf_counter()
+        await astructured_completion(model=mock_provider.MODEL, messages=MESSAGES, tools=[lookup])
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    latencies = await asyncio.gather(*(one() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def bench_concurrency(quick):
+    latency = 0.02
+    mock_provider.install(latency=latency, tool_turns=1)
+    results = []
+    for concurrency in ((1, 10, 50) if quick else (1, 10, 50, 200)):
+        elapsed, latencies = asyncio.run(_concurrent_requests(concurrency))
+        params = {"concurrency": concurrency, "provider_latency_ms": latency * 1000}
+        # Two round trips per request; perfect scaling finishes every request in 2 * latency
+        results.append(_metric("concurrency", params, "throughput_rps", concurrency / elapsed, "req/s",
+                               lower_is_better=False))
+        results.append(_metric("concurrency", params, "p50_ms", latencies[len(latencies) // 2] * 1000, "ms"))
+        results.append(_metric("concurrency", params, "p95_ms",
+                               latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000, "ms"))
+        results.append(_metric("concurrency", params, "scaling_efficiency", 2 * latency / elapsed, "ratio",
+                               lower_is_better=False))
+    return results
+
+
+def big_lookup(key: str) -> str:
+    """
+    Lookup returning a 10 KB page
+    :param key: str
+    :return: str
+    """
+    return key * (10_000 // len(key))
+
+
+def bench_memory_growth(quick):
+    results = []
+    for depth in ((2, 8) if quick else (2, 8, 32)):
+        mock_provider.install(tool_turns=depth, tool_name="big_lookup")
+        gc.collect()
+        tracemalloc.start()
+        structured_completion(model=mock_provider.MODEL, messages=MESSAGES, tools=[big_lookup],
+                              max_recursion=depth + 2)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        params = {"depth": depth, "tool_output_bytes": 10_000}
+        results.append(_metric("memory_growth", params, "peak_kb", peak / 1024, "KiB"))
+        results.append(_metric("memory_growth", params, "peak_kb_per_turn", peak / 1024 / (depth + 1), "KiB"))
+    return results
+
+
+class Item(BaseModel):
+    sku: str
+    quantity: int
+    price: float
+    tags: List[str]
+
+
+class Catalog(BaseModel):
+    name: str
+    items: List[Item]
+
+
+def bench_validation(quick):
+    repeat = 10 if quick else 50
+    results = []
+    for size in (10, 100, 1000):
+        catalog = {"name": "catalog", "items": [
+            {"sku": f"sku-{i}", "quantity": i, "price": i * 1.5, "tags": ["a", "b", "c"]} for i in range(size)]}
+        raw_response = litellm.ModelResponse(choices=[{"message": {"role": "assistant",
+                                                                   "content": json.dumps(catalog)}}])
+        elapsed = _median_time(lambda: parse_response_content(raw_response, Catalog), repeat)
+        results.append(_metric("validation", {"items": size}, "parse_us", elapsed * 1e6, "us"))
+    return results
+
+
+BENCHMARKS = {
+    "turn_overhead": bench_turn_overhead,
+    "tool_dispatch": bench_tool_dispatch,
+    "concurrency": bench_concurrency,
+    "memory_growth": bench_memory_growth,
+    "validation": bench_validation,
+}
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def environment():
+    from importlib.metadata import version, PackageNotFoundError
+
+    def package_version(name):
+        try:
+            return version(name)
+        except PackageNotFoundError:
+            return None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "litellm": package_version("litellm"),
+        "pydantic": package_version("pydantic"),
+        "orjson": package_version("orjson"),
+    }
+
+
+def run(names=None, quick=False):
+    """Run the selected benchmarks (all by default) and return the results document."""
+    results = []
+    for name in names or BENCHMARKS:
+        results.extend(BENCHMARKS[name](quick))
+    return {"schema": SCHEMA_VERSION, "quick": quick, "environment": environment(), "results": results}
+
+
+def _key(result):
+    return result["benchmark"], json.dumps(result["params"], sort_keys=True), result["metric"]
+
+
+def compare(baseline, current, threshold=0.2):
+    """
+    Pair the metrics of two result documents.
+
+    Returns one row per metric present in both, with the ratio current/baseline
+    and whether it regressed by more than ``threshold`` (in the metric's bad direction).
+    """
+    previous = {_key(result): result for result in baseline["results"]}
+    rows = []
+    for result in current["results"]:
+        before = previous.get(_key(result))
+        if before is None or not before["value"]:
+            continue
+        ratio = result["value"] / before["value"]
+        if result["lower_is_better"]:
+            regressed = ratio > 1 + threshold
+        else:
+            regressed = ratio < 1 - threshold
+        rows.append({**result, "baseline": before["value"], "ratio": round(ratio, 3), "regressed": regressed})
+    return rows
+
+
+def _print_results(document):
+    for result in document["results"]:
+        params = ", ".join(f"{k}={v}" for k, v in result["params"].items())
+        print(f"{result['benchmark']:<14} {params:<42} {result['metric']:<28} {result['value']:>12.3f} {result['unit']}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--quick", action="store_true", help="fewer repetitions and smaller sizes")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHMARKS), help="benchmarks to run")
+    parser.add_argument("--output", help="write the results as JSON to this file ('-' for stdout)")
+    parser.add_argument("--compare", help="baseline results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="relative change counted as a regression")
+    args = parser.parse_args(argv)
+
+    document = run(args.only, quick=args.quick)
+    if args.output == "-":
+        json.dump(document, sys.stdout, indent=2)
+        print()
+    else:
+        _print_results(document)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(document, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            rows = compare(json.load(f), document, args.threshold)
+        regressions = [row for row in rows if row["regressed"]]
+        for row in regressions:
+            print(f"REGRESSION {row['benchmark']} {row['params']} {row['metric']}: "
+                  f"{row['baseline']} -> {row['value']} {row['unit']} (x{row['ratio']})", file=sys.stderr)
+        print(f"{len(rows)} metrics compared, {len(regressions)} regressions", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
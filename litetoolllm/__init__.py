@@ -1,15 +1,67 @@
 # litetoolllm/__init__.py
 from .core import structured_completion, astructured_completion, UnifiedResponse
-from .tools import Tool
-from .errors import StructuredValidationError
+from .streaming import structured_completion_stream, astructured_completion_stream, StreamEvent
+from .batch import abatch_structured_completion, batch_structured_completion, BatchResult
+from .tools import Tool, ToolCachePolicy, ToolLimit
+from .conversation import Conversation
+from .errors import StructuredValidationError, ToolTimeoutError, DeadlineExceededError
 from .models import *
-from .utils import convert_tools_to_api_format
+from .utils import convert_tools_to_api_format, clear_model_capability_cache
+from .registry import ToolRegistry, compile_tools, clear_tool_registry_cache
+from .cache import ResponseCache, InMemoryResponseCache, SQLiteResponseCache
+from .serialization import JSONCodec, set_json_codec
+from .hedging import HedgePolicy
+from .instrumentation import TraceEvent, add_trace_hook, remove_trace_hook, LoggingHook, OpenTelemetryHook
+from .usage import UsageReport, IterationUsage
+from .context import ContextBudget
+from .artifacts import Artifact, ArtifactStore, InMemoryArtifactStore, MmapArtifactStore, ArtifactSet
+from .client import LiteToolClient
+from .scheduling import ToolScheduler, get_tool_scheduler, SingleFlight, get_single_flight
 
 __all__ = [
     'structured_completion', 
     'astructured_completion', 
     'UnifiedResponse', 
+    'structured_completion_stream',
+    'astructured_completion_stream',
+    'StreamEvent',
+    'abatch_structured_completion',
+    'batch_structured_completion',
+    'BatchResult',
     'Tool', 
+    'ToolCachePolicy',
+    'ToolLimit',
+    'Conversation',
     'StructuredValidationError',
-    'convert_tools_to_api_format'
+    'ToolTimeoutError',
+    'DeadlineExceededError',
+    'convert_tools_to_api_format',
+    'ToolRegistry',
+    'compile_tools',
+    'clear_tool_registry_cache',
+    'clear_model_capability_cache',
+    'ResponseCache',
+    'InMemoryResponseCache',
+    'SQLiteResponseCache',
+    'JSONCodec',
+    'set_json_codec',
+    'HedgePolicy',
+    'TraceEvent',
+    'add_trace_hook',
+    'remove_trace_hook',
+    'LoggingHook',
+    'OpenTelemetryHook',
+    'UsageReport',
+    'IterationUsage',
+    'ContextBudget',
+    'Artifact',
+    'ArtifactStore',
+    'InMemoryArtifactStore',
+    'MmapArtifactStore',
+    'ArtifactSet',
+    'LiteToolClient',
+    'ToolScheduler',
+    'get_tool_scheduler',
+    'SingleFlight',
+    'get_single_flight',
 ]
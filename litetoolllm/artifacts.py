@@ -0,0 +1,272 @@
+import os
+import mmap
+import uuid
+import shutil
+import tempfile
+import threading
+from collections.abc import Mapping
+from typing import Any, Dict, Optional
+
+from .serialization import dumps, loads
+
+DEFAULT_PREVIEW_CHARS = 200
+
+
+def _kind(data):
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return "bytes"
+    if isinstance(data, str):
+        return "text"
+    return "json"
+
+
+class Artifact:
+    """
+    Handle to a tool result kept out of the conversation.
+
+    The model only sees ``reference()``; tools that take an ``Artifact``
+    parameter and callers reading ``UnifiedResponse.artifacts`` get this handle
+    and load the data on demand.
+
+    Attributes:
+        id (str): Identifier the model passes to other tools
+        tool (Optional[str]): Name of the tool that produced the result
+        kind (str): "bytes", "text" or "json" (any other JSON-serializable result)
+        size (int): Size of the stored payload in bytes (characters for in-memory text)
+        preview (str): Short excerpt sent to the model with the reference
+    """
+    __slots__ = ('id', 'tool', 'kind', 'size', 'preview', 'store')
+
+    def __init__(self, id, tool, kind, size, preview, store):
+        self.id = id
+        self.tool = tool
+        self.kind = kind
+        self.size = size
+        self.preview = preview
+        self.store = store
+
+    def read(self) -> Any:
+        """The stored result: the original object (memory store) or bytes view/text/decoded JSON (mmap store)."""
+        return self.store.read(self.id)
+
+    def buffer(self) -> memoryview:
+        """The payload as a read-only ``memoryview``, without copying when the store allows it."""
+        return self.store.buffer(self.id)
+
+    def reference(self) -> Dict[str, Any]:
+        """What goes into the conversation in place of the result."""
+        return {"artifact_id": self.id, "kind": self.kind, "size": self.size, "preview": self.preview}
+
+    def __repr__(self):
+        return f"Artifact({self.id!r}, tool={self.tool!r}, kind={self.kind!r}, size={self.size})"
+
+
+class ArtifactStore:
+    """
+    Base class for artifact stores.
+
+    Subclasses implement ``_write``, ``read`` and ``buffer``; ``put`` and
+    lookups are shared and thread-safe, so one store can serve concurrent
+    requests.
+    """
+    def __init__(self, preview_chars: int = DEFAULT_PREVIEW_CHARS):
+        self.preview_chars = preview_chars
+        self._artifacts: Dict[str, Artifact] = {}
+        self._lock = threading.Lock()
+
+    def put(self, data: Any, tool: Optional[str] = None, text: Optional[str] = None) -> Artifact:
+        """Store ``data`` and return its handle; ``text`` is its serialized form when already known."""
+        kind = _kind(data)
+        if kind == "json" and text is None:
+            text = dumps(data)
+        artifact_id = f"art_{uuid.uuid4().hex[:12]}"
+        size = self._write(artifact_id, data, kind, text)
+        if kind == "bytes":
+            preview = f"<{size} bytes>"
+        else:
+            preview = (data if kind == "text" else text)[:self.preview_chars]
+        artifact = Artifact(artifact_id, tool, kind, size, preview, self)
+        with self._lock:
+            self._artifacts[artifact_id] = artifact
+        return artifact
+
+    def get(self, artifact_id: str) -> Artifact:
+        with self._lock:
+            artifact = self._artifacts.get(artifact_id)
+        if artifact is None:
+            raise KeyError(f"Unknown artifact {artifact_id!r}")
+        return artifact
+
+    def __contains__(self, artifact_id):
+        return artifact_id in self._artifacts
+
+    def __len__(self):
+        return len(self._artifacts)
+
+    def _write(self, artifact_id, data, kind, text):
+        raise NotImplementedError
+
+    def read(self, artifact_id: str) -> Any:
+        raise NotImplementedError
+
+    def buffer(self, artifact_id: str) -> memoryview:
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class InMemoryArtifactStore(ArtifactStore):
+    """Keeps results as the original Python objects; nothing is copied or serialized again."""
+    def __init__(self, preview_chars: int = DEFAULT_PREVIEW_CHARS):
+        super().__init__(preview_chars)
+        self._data = {}
+
+    def _write(self, artifact_id, data, kind, text):
+        self._data[artifact_id] = data
+        if kind == "bytes":
+            return memoryview(data).nbytes
+        return len(data if kind == "text" else text)
+
+    def read(self, artifact_id):
+        self.get(artifact_id)
+        return self._data[artifact_id]
+
+    def buffer(self, artifact_id):
+        data = self.read(artifact_id)
+        kind = _kind(data)
+        if kind == "bytes":
+            return memoryview(data).toreadonly()
+        return memoryview((data if kind == "text" else dumps(data)).encode())
+
+    def close(self):
+        self._data.clear()
+
+
+class MmapArtifactStore(ArtifactStore):
+    """
+    Writes each result to a file and reads it back through ``mmap``.
+
+    Payloads live in the page cache instead of the Python heap, and ``buffer``
+    hands out zero-copy views of the mapping. Text is stored UTF-8 encoded and
+    other results as JSON.
+
+    Attributes:
+        directory (str): Where the files are written; a temporary directory
+            (removed by ``close``) when not given
+    """
+    def __init__(self, directory: Optional[str] = None, preview_chars: int = DEFAULT_PREVIEW_CHARS):
+        super().__init__(preview_chars)
+        self._owns_directory = directory is None
+        self.directory = directory or tempfile.mkdtemp(prefix="litetoolllm-artifacts-")
+        os.makedirs(self.directory, exist_ok=True)
+        self._maps = {}
+
+    def _path(self, artifact_id):
+        return os.path.join(self.directory, artifact_id)
+
+    def _write(self, artifact_id, data, kind, text):
+        if kind == "text":
+            data = data.encode()
+        elif kind == "json":
+            data = text.encode()
+        with open(self._path(artifact_id), "wb") as f:
+            f.write(data)
+        return memoryview(data).nbytes
+
+    def _map(self, artifact_id):
+        with self._lock:
+            mapped = self._maps.get(artifact_id)
+            if mapped is None:
+                if os.path.getsize(self._path(artifact_id)) == 0:
+                    mapped = b""
+                else:
+                    with open(self._path(artifact_id), "rb") as f:
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                self._maps[artifact_id] = mapped
+        return mapped
+
+    def buffer(self, artifact_id):
+        self.get(artifact_id)
+        return memoryview(self._map(artifact_id))
+
+    def read(self, artifact_id):
+        artifact = self.get(artifact_id)
+        view = memoryview(self._map(artifact_id))
+        if artifact.kind == "bytes":
+            return view
+        if artifact.kind == "text":
+            return str(view, "utf-8")
+        return loads(bytes(view))
+
+    def close(self):
+        with self._lock:
+            maps, self._maps = self._maps, {}
+        for mapped in maps.values():
+            if isinstance(mapped, mmap.mmap):
+                try:
+                    mapped.close()
+                except BufferError:
+                    # A caller still holds a view; the mapping is released with it
+                    pass
+        if self._owns_directory:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ArtifactSet(Mapping):
+    """
+    The artifacts of one request, exposed as ``UnifiedResponse.artifacts``.
+
+    A read-only mapping from artifact id to ``Artifact``; the data itself stays
+    in the store until an artifact is read. Tools of the request can reference
+    any artifact in the store.
+
+    Attributes:
+        store (ArtifactStore): Where the request's results are kept
+    """
+    def __init__(self, store: ArtifactStore):
+        self.store = store
+        self._artifacts: Dict[str, Artifact] = {}
+
+    def offload(self, result, threshold, tool=None) -> Optional[Artifact]:
+        """Move ``result`` to the store if it is larger than ``threshold``; None if it stays inline."""
+        kind = _kind(result)
+        text = None
+        if kind == "bytes":
+            size = memoryview(result).nbytes
+        elif kind == "text":
+            size = len(result)
+        else:
+            text = dumps(result)
+            size = len(text)
+        if size <= threshold:
+            return None
+        artifact = self.store.put(result, tool=tool, text=text)
+        self._artifacts[artifact.id] = artifact
+        return artifact
+
+    def resolve(self, artifact_id) -> Artifact:
+        if isinstance(artifact_id, Artifact):
+            return artifact_id
+        try:
+            return self.store.get(artifact_id)
+        except KeyError:
+            raise ValueError(f"Unknown artifact {artifact_id!r}") from None
+
+    def __getitem__(self, artifact_id):
+        return self._artifacts[artifact_id]
+
+    def __iter__(self):
+        return iter(self._artifacts)
+
+    def __len__(self):
+        return len(self._artifacts)
+
+    def __repr__(self):
+        return f"ArtifactSet({list(self._artifacts.values())!r})"
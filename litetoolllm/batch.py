@@ -0,0 +1,143 @@
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, Optional, Union
+
+from .core import astructured_completion, UnifiedResponse
+
+
+class BatchResult:
+    """
+    Outcome of one request in a batch.
+
+    Attributes:
+        index (int): Position of the request in the input
+        request (Dict[str, Any]): The request kwargs as given in the input
+        response (Optional[UnifiedResponse]): The result, None if the request failed
+        error (Optional[Exception]): The exception raised by the request, None on success
+    """
+    __slots__ = ('index', 'request', 'response', 'error')
+
+    def __init__(self, index: int, request: Dict[str, Any],
+                 response: Optional[UnifiedResponse] = None, error: Optional[Exception] = None):
+        self.index = index
+        self.request = request
+        self.response = response
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """JSON-friendly summary, convenient for writing results out line by line."""
+        content = self.response.content if self.response is not None else None
+        if hasattr(content, 'model_dump'):
+            content = content.model_dump()
+        return {
+            "index": self.index,
+            "ok": self.ok,
+            "content": content,
+            "error": f"{type(self.error).__name__}: {self.error}" if self.error is not None else None,
+        }
+
+    def __repr__(self):
+        return f"BatchResult(index={self.index}, ok={self.ok})"
+
+
+async def _iterate(requests):
+    if hasattr(requests, '__aiter__'):
+        async for request in requests:
+            yield request
+    else:
+        for request in requests:
+            yield request
+
+
+async def abatch_structured_completion(requests: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+                                       *,
+                                       concurrency: int = 8,
+                                       ordered: bool = False,
+                                       max_buffered: Optional[int] = None,
+                                       **defaults) -> AsyncIterator[BatchResult]:
+    """
+    Run many ``astructured_completion`` requests with bounded concurrency.
+
+    ``requests`` is a (possibly async) iterable of kwargs dicts, merged over
+    ``defaults``; it is consumed lazily, so generators of any size work. At most
+    ``concurrency`` requests are in flight. Results are yielded as they
+    complete, or in input order when ``ordered`` is True, in which case at most
+    ``max_buffered`` (default ``4 * concurrency``) finished results wait for a
+    slower predecessor before new requests are started. A failing request
+    yields a ``BatchResult`` with ``error`` set instead of aborting the batch.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    max_outstanding = (max_buffered or 4 * concurrency) if ordered else concurrency
+
+    async def run(index, request):
+        try:
+            response = await astructured_completion(**{**defaults, **request})
+            return BatchResult(index, request, response=response)
+        except Exception as e:
+            return BatchResult(index, request, error=e)
+
+    source = _iterate(requests)
+    pending = set()
+    buffered = {}
+    next_index = 0
+    submitted = 0
+    exhausted = False
+    try:
+        while True:
+            while (not exhausted and len(pending) < concurrency
+                   and len(pending) + len(buffered) < max(max_outstanding, concurrency)):
+                try:
+                    request = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(run(submitted, request)))
+                submitted += 1
+            if not pending:
+                break
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                result = task.result()
+                if ordered:
+                    buffered[result.index] = result
+                else:
+                    yield result
+            while next_index in buffered:
+                yield buffered.pop(next_index)
+                next_index += 1
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+        await source.aclose()
+
+
+def batch_structured_completion(requests: Iterable[Dict[str, Any]],
+                                *,
+                                concurrency: int = 8,
+                                ordered: bool = False,
+                                max_buffered: Optional[int] = None,
+                                **defaults) -> Iterator[BatchResult]:
+    """
+    Synchronous wrapper around ``abatch_structured_completion``.
+
+    Runs the batch on a private event loop and yields results lazily; must not
+    be called from inside a running event loop.
+    """
+    loop = asyncio.new_event_loop()
+    results = abatch_structured_completion(requests, concurrency=concurrency, ordered=ordered,
+                                           max_buffered=max_buffered, **defaults)
+    try:
+        while True:
+            try:
+                yield loop.run_until_complete(results.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        loop.run_until_complete(results.aclose())
+        loop.close()
@@ -0,0 +1,205 @@
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+
+import litellm
+
+# Request fields that do not change what the provider returns
+_KEY_EXCLUDED_FIELDS = frozenset({
+    "metadata", "timeout", "api_key", "api_base", "base_url", "num_retries",
+    "max_retries", "client", "logger_fn", "extra_headers",
+})
+
+
+def _to_jsonable(value):
+    if isinstance(value, type) and hasattr(value, "model_json_schema"):
+        return value.model_json_schema()
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return repr(value)
+
+
+def make_cache_key(request):
+    """
+    Return a stable hash of a completion request.
+
+    The key covers the model, messages, tool schemas, response format schema
+    and sampling parameters; transport and bookkeeping fields such as
+    ``metadata``, ``timeout`` and credentials are left out.
+    """
+    keyed = {k: v for k, v in request.items() if k not in _KEY_EXCLUDED_FIELDS}
+    payload = json.dumps(keyed, sort_keys=True, default=_to_jsonable, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Base class for completion response caches.
+
+    Subclasses implement ``_get`` and ``_set``. Counters are kept per cache
+    instance and exposed through ``stats()``.
+
+    Attributes:
+        ttl (Optional[float]): Seconds an entry stays valid, None for no expiry
+        hits (int): Number of lookups served from the cache
+        misses (int): Number of lookups that went to the provider
+    """
+    def __init__(self, ttl=None):
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def get(self, key):
+        value = self._get(key)
+        with self._stats_lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, response):
+        self._set(key, response)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / total if total else 0.0}
+
+    def _expires_at(self):
+        return time.time() + self.ttl if self.ttl is not None else None
+
+    def _get(self, key):
+        raise NotImplementedError
+
+    def _set(self, key, response):
+        raise NotImplementedError
+
+
+class InMemoryResponseCache(ResponseCache):
+    """
+    Bounded, thread-safe LRU cache with optional TTL.
+
+    Cached responses are returned as the same objects, so callers must treat
+    them as read-only.
+    """
+    def __init__(self, max_entries=1024, ttl=None):
+        super().__init__(ttl=ttl)
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            response, expires_at = entry
+            if expires_at is not None and expires_at < time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return response
+
+    def _set(self, key, response):
+        with self._lock:
+            self._entries[key] = (response, self._expires_at())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteResponseCache(ResponseCache):
+    """
+    On-disk cache backed by a SQLite file, safe to share between worker processes.
+
+    Responses are stored as JSON (``ModelResponse`` objects are rebuilt on
+    read), so other response types must be JSON-serializable. Each thread
+    uses its own connection; the database runs in WAL mode so readers do not
+    block the writer.
+    """
+    def __init__(self, path, ttl=None):
+        super().__init__(ttl=ttl)
+        self.path = str(path)
+        self._local = threading.local()
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)"
+        )
+
+    def _connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    def _get(self, key):
+        row = self._connection().execute(
+            "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at < time.time():
+            self._connection().execute("DELETE FROM responses WHERE key = ?", (key,))
+            return None
+        return self._loads(value)
+
+    def _set(self, key, response):
+        self._connection().execute(
+            "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, self._dumps(response), self._expires_at()),
+        )
+
+    def clear(self):
+        self._connection().execute("DELETE FROM responses")
+
+    @staticmethod
+    def _dumps(response):
+        if isinstance(response, litellm.ModelResponse):
+            return json.dumps({"model_response": response.model_dump()})
+        return json.dumps({"raw": response})
+
+    @staticmethod
+    def _loads(value):
+        value = json.loads(value)
+        if "model_response" in value:
+            return litellm.ModelResponse(**value["model_response"])
+        return value["raw"]
+
+
+def cached_completion(cache, completion_fn, **request):
+    if cache is None or request.get("stream"):
+        return completion_fn(**request)
+    key = make_cache_key(request)
+    response = cache.get(key)
+    if response is None:
+        response = completion_fn(**request)
+        cache.set(key, response)
+    return response
+
+
+async def acached_completion(cache, acompletion_fn, **request):
+    if cache is None or request.get("stream"):
+        return await acompletion_fn(**request)
+    key = make_cache_key(request)
+    response = cache.get(key)
+    if response is None:
+        response = await acompletion_fn(**request)
+        cache.set(key, response)
+    return response
@@ -0,0 +1,163 @@
+import os
+import threading
+import importlib.util
+from typing import Callable, List, Optional
+
+import httpx
+import litellm
+
+from .core import structured_completion, astructured_completion, UnifiedResponse
+from .registry import compile_tools
+
+# Providers served by the openai SDK, which accepts a caller-owned httpx pool
+_OPENAI_SDK_PROVIDERS = frozenset({"openai", "custom_openai"})
+_DEFAULT_OPENAI_BASE = "https://api.openai.com/v1"
+
+
+def _http2_available():
+    return importlib.util.find_spec("h2") is not None
+
+
+class LiteToolClient:
+    """
+    Long-lived session for many ``structured_completion`` calls.
+
+    The client compiles its tools once and owns pooled HTTP connections
+    (keep-alive, and HTTP/2 when the ``h2`` package is installed), so every
+    round trip of every tool loop made through it reuses warm connections.
+    Default keyword arguments, a response cache, trace hooks and any other
+    ``structured_completion`` option given to the constructor apply to every
+    call; per-call arguments override them (``trace_hooks`` are combined).
+
+    Requests to OpenAI and OpenAI-compatible endpoints (``openai/...`` models
+    with ``api_base``) go through the client's pool; other providers keep
+    litellm's own connection handling. The async pool belongs to the event loop
+    that first uses it; close the client with ``close`` / ``aclose`` or use it
+    as a (async) context manager.
+
+    Attributes:
+        model (Optional[str]): Default model
+        tools (ToolRegistry): The compiled default tools
+        defaults (Dict[str, Any]): Default keyword arguments for every call
+        http2 (bool): Whether the pools negotiate HTTP/2
+        limits (httpx.Limits): Connection pool limits
+    """
+    def __init__(self,
+                 model: Optional[str] = None,
+                 tools: Optional[List] = None,
+                 *,
+                 http2: bool = True,
+                 max_connections: int = 100,
+                 max_keepalive_connections: int = 20,
+                 keepalive_expiry: float = 60.0,
+                 timeout: float = 600.0,
+                 trace_hooks: Optional[List[Callable]] = None,
+                 **defaults):
+        self.model = model
+        self.tools = compile_tools(tools)
+        self.defaults = defaults
+        self.trace_hooks = list(trace_hooks or ())
+        self.http2 = http2 and _http2_available()
+        self.limits = httpx.Limits(max_connections=max_connections,
+                                   max_keepalive_connections=max_keepalive_connections,
+                                   keepalive_expiry=keepalive_expiry)
+        self.timeout = timeout
+        self._http = None
+        self._ahttp = None
+        self._sdk_clients = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http(self) -> httpx.Client:
+        """The pooled sync HTTP client, created on first use."""
+        if self._http is None:
+            with self._lock:
+                if self._http is None:
+                    self._http = httpx.Client(http2=self.http2, limits=self.limits, timeout=self.timeout)
+        return self._http
+
+    @property
+    def ahttp(self) -> httpx.AsyncClient:
+        """The pooled async HTTP client, created on first use."""
+        if self._ahttp is None:
+            with self._lock:
+                if self._ahttp is None:
+                    self._ahttp = httpx.AsyncClient(http2=self.http2, limits=self.limits, timeout=self.timeout)
+        return self._ahttp
+
+    def _sdk_client(self, request, is_async):
+        """The openai SDK client bound to this session's pool for ``request``, or None to let litellm decide."""
+        route = (is_async, request["model"], request.get("api_key"), request.get("api_base"),
+                 request.get("base_url"), request.get("organization"))
+        try:
+            return self._sdk_clients[route]
+        except KeyError:
+            pass
+        # Provider and credentials are resolved once per route, not on every call
+        client = self._build_sdk_client(request, is_async)
+        with self._lock:
+            return self._sdk_clients.setdefault(route, client)
+
+    def _build_sdk_client(self, request, is_async):
+        try:
+            provider = litellm.get_llm_provider(request["model"], api_base=request.get("api_base"))[1]
+        except Exception:
+            return None
+        if provider not in _OPENAI_SDK_PROVIDERS:
+            return None
+        api_key = request.get("api_key") or litellm.api_key or litellm.openai_key or os.getenv("OPENAI_API_KEY")
+        if not api_key:
+            return None
+        base_url = (request.get("api_base") or request.get("base_url") or litellm.api_base
+                    or os.getenv("OPENAI_BASE_URL") or os.getenv("OPENAI_API_BASE") or _DEFAULT_OPENAI_BASE)
+        import openai
+        if is_async:
+            return openai.AsyncOpenAI(api_key=api_key, base_url=base_url, organization=request.get("organization"),
+                                      http_client=self.ahttp)
+        return openai.OpenAI(api_key=api_key, base_url=base_url, organization=request.get("organization"),
+                             http_client=self.http)
+
+    def _request(self, kwargs, is_async):
+        request = {**self.defaults, **kwargs}
+        request.setdefault("model", self.model)
+        if request["model"] is None:
+            raise ValueError("No model given to the call or to LiteToolClient")
+        request.setdefault("tools", self.tools if self.tools.tools else None)
+        hooks = [*self.trace_hooks, *(request.get("trace_hooks") or ())]
+        request["trace_hooks"] = hooks or None
+        if "client" not in request:
+            client = self._sdk_client(request, is_async)
+            if client is not None:
+                request["client"] = client
+        return request
+
+    def structured_completion(self, *, messages: List[dict], **kwargs) -> UnifiedResponse:
+        return structured_completion(messages=messages, **self._request(kwargs, is_async=False))
+
+    async def astructured_completion(self, *, messages: List[dict], **kwargs) -> UnifiedResponse:
+        return await astructured_completion(messages=messages, **self._request(kwargs, is_async=True))
+
+    def close(self):
+        """Close the sync pool (use ``aclose`` when the async pool was used)."""
+        if self._http is not None:
+            self._http.close()
+
+    async def aclose(self):
+        self.close()
+        if self._ahttp is not None:
+            await self._ahttp.aclose()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    def __repr__(self):
+        return f"LiteToolClient(model={self.model!r}, tools={len(self.tools)}, http2={self.http2})"
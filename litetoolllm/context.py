@@ -0,0 +1,149 @@
+from typing import Callable, Optional
+
+import litellm
+
+from .conversation import _message_to_dict
+
+STRATEGIES = ("truncate", "head_tail", "summarize")
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Tokens in ``text`` with litellm's counter (its default tokenizer when ``model`` is unknown or None)."""
+    return litellm.token_counter(model=model or "", text=text)
+
+
+def trim_text(text: str, max_tokens: int, strategy: str = "head_tail", tokens: Optional[int] = None,
+              model: Optional[str] = None) -> str:
+    """
+    Shorten ``text`` to roughly ``max_tokens`` tokens.
+
+    "truncate" keeps the beginning, "head_tail" keeps the beginning and the
+    end. The cut is made at the text's own characters-per-token ratio, so the
+    text is only tokenized once; a marker records how much was left out.
+    """
+    if tokens is None:
+        tokens = count_tokens(text, model)
+    if tokens <= max_tokens:
+        return text
+    chars_per_token = len(text) / tokens
+    keep = max(0, int(max_tokens * chars_per_token))
+    omitted = tokens - max_tokens
+    if strategy == "truncate":
+        return f"{text[:keep]}\n...[{omitted} tokens truncated]"
+    head = keep // 2
+    tail = keep - head
+    return f"{text[:head]}\n...[{omitted} tokens omitted]...\n{text[len(text) - tail:] if tail else ''}"
+
+
+class ContextBudget:
+    """
+    Token budget for the messages sent on each turn of the tool-call loop.
+
+    Before every round trip the history is counted with litellm's token
+    counter; while it is over ``max_tokens``, the oldest tool outputs are
+    compacted to ``tool_output_tokens`` with ``strategy``. The tool messages of
+    the newest turn and all non-tool messages are never touched. A compacted
+    output stays compacted for the rest of the request, so the message prefix
+    is stable across turns (provider prompt caches keep working), and the
+    caller's ``messages`` are never modified.
+
+    Share one budget between requests; per-request state lives in the request.
+
+    Attributes:
+        max_tokens (int): Target size of the message history
+        strategy (str): "truncate" (keep the start), "head_tail" (keep start and end)
+            or "summarize" (replace with ``summarizer(content)``)
+        tool_output_tokens (int): Size a compacted tool output is reduced to
+        summarizer (Optional[Callable[[str], str]]): Produces the summary of a tool
+            output for the "summarize" strategy; it runs inline, before the round trip
+    """
+    def __init__(self,
+                 max_tokens: int,
+                 strategy: str = "head_tail",
+                 tool_output_tokens: int = 256,
+                 summarizer: Optional[Callable[[str], str]] = None):
+        if strategy not in STRATEGIES:
+            raise ValueError(f"strategy must be one of {STRATEGIES}, got {strategy!r}")
+        if strategy == "summarize" and summarizer is None:
+            raise ValueError("The 'summarize' strategy needs a summarizer")
+        self.max_tokens = max_tokens
+        self.strategy = strategy
+        self.tool_output_tokens = tool_output_tokens
+        self.summarizer = summarizer
+
+    def compact(self, content: str, tokens: int, model: Optional[str] = None) -> str:
+        if self.strategy == "summarize":
+            return self.summarizer(content)
+        return trim_text(content, self.tool_output_tokens, self.strategy, tokens=tokens, model=model)
+
+
+def _is_tool_output(message):
+    return isinstance(message, dict) and message.get("role") == "tool" and isinstance(message.get("content"), str)
+
+
+def _newest_turn_start(messages):
+    for index in range(len(messages) - 1, -1, -1):
+        message = messages[index]
+        role = message.get("role") if isinstance(message, dict) else getattr(message, "role", None)
+        if role == "assistant":
+            return index
+    return 0
+
+
+class ContextWindow:
+    """
+    Applies a ``ContextBudget`` to the successive requests of one tool loop.
+
+    Token counts are cached per message object and compactions per message,
+    so each turn only tokenizes the messages it added.
+
+    Attributes:
+        budget (ContextBudget): The policy being enforced
+        model (str): Model whose tokenizer is used
+        compacted (int): Number of tool outputs compacted so far
+        tokens_saved (int): Tokens removed from the history by compaction
+    """
+    def __init__(self, budget: ContextBudget, model: Optional[str] = None):
+        self.budget = budget
+        self.model = model
+        self.compacted = 0
+        self.tokens_saved = 0
+        self._tokens = {}
+        self._replacements = {}
+
+    def _count(self, message):
+        # The message is kept alongside its count so its id cannot be reused
+        cached = self._tokens.get(id(message))
+        if cached is None:
+            cached = (message, litellm.token_counter(model=self.model or "", messages=[_message_to_dict(message)]))
+            self._tokens[id(message)] = cached
+        return cached[1]
+
+    def fit(self, messages):
+        """Return ``messages`` with old tool outputs compacted to fit the budget (the same list if nothing changed)."""
+        replacements = self._replacements
+        total = 0
+        for message in messages:
+            replacement = replacements.get(id(message))
+            total += self._count(message if replacement is None else replacement)
+        if total > self.budget.max_tokens:
+            for index in range(_newest_turn_start(messages)):
+                message = messages[index]
+                if not _is_tool_output(message) or id(message) in replacements:
+                    continue
+                tokens = self._count(message)
+                content_tokens = count_tokens(message["content"], self.model)
+                if content_tokens <= self.budget.tool_output_tokens:
+                    continue
+                replacement = {**message, "content": self.budget.compact(message["content"], content_tokens,
+                                                                          self.model)}
+                replacements[id(message)] = replacement
+                saved = tokens - self._count(replacement)
+                self.compacted += 1
+                self.tokens_saved += saved
+                total -= saved
+                if total <= self.budget.max_tokens:
+                    break
+        if not replacements:
+            return messages
+        return [replacements.get(id(message), message) for message in messages]
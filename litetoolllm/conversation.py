@@ -0,0 +1,47 @@
+from typing import Any, Iterable, List
+
+
+def _message_to_dict(message):
+    if isinstance(message, dict):
+        return message
+    return message.model_dump()
+
+
+class Conversation:
+    """
+    Append-only message history for the tool-call loop.
+
+    The loop extends a single list in place and hands that same list to
+    litellm on every turn, so a deep tool chain costs O(total messages)
+    instead of re-copying the history each turn. Provider message objects
+    (``litellm.Message``) are stored as-is while the loop runs; ``to_dicts``
+    converts them once, for ``UnifiedResponse.messages``.
+
+    Attributes:
+        messages (List[Any]): The underlying list; treat it as read-only
+    """
+    __slots__ = ('messages',)
+
+    def __init__(self, messages: Iterable[Any] = ()):
+        self.messages: List[Any] = list(messages)
+
+    def append(self, message):
+        self.messages.append(message)
+
+    def extend(self, messages: Iterable[Any]):
+        self.messages.extend(messages)
+
+    def to_dicts(self) -> List[dict]:
+        return [_message_to_dict(message) for message in self.messages]
+
+    def __len__(self):
+        return len(self.messages)
+
+    def __iter__(self):
+        return iter(self.messages)
+
+    def __getitem__(self, index):
+        return self.messages[index]
+
+    def __repr__(self):
+        return f"Conversation({len(self.messages)} messages)"
@@ -1,31 +1,92 @@
 # litetoolllm/core.py
+from concurrent.futures import Executor
 from typing import Type, Any, List, Optional, Callable
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, field_serializer
 from litellm import completion, acompletion
+from .cache import ResponseCache
+from .runner import CompletionRunner
+from .hedging import HedgePolicy
+from .context import ContextBudget
+from .artifacts import ArtifactStore, ArtifactSet, InMemoryArtifactStore
+from .instrumentation import make_tracer
+from .usage import UsageReport
 from .errors import StructuredValidationError
+from .json_repair import reask_message
 from .utils import (
     validate_model_capabilities,
+    parse_response_content,
     get_content_from_raw_response,
     _handle_tool_call_loop,
     _handle_tool_call_loop_async,
-    convert_tools_to_api_format,
+    split_post_format_model,
+    compile_tools,
+    DEFAULT_MAX_TOOL_WORKERS,
 )
 
+def _reask_request(messages, error, response_model, registry, kwargs):
+    reask = reask_message(error.__cause__ or error)
+    messages.append(reask)
+    # The history may hold tool calls, which providers only accept alongside the
+    # tool definitions; the correction turn itself must answer, not call a tool.
+    # ``response_model`` is None where the schema cannot be sent with tools
+    # (see ``split_post_format_model``), and the answer is still validated after.
+    request = dict(kwargs, messages=messages, tools=registry.api_tools, response_format=response_model)
+    if registry.api_tools:
+        request["tool_choice"] = "none"
+    return request
+
+def _record_reask_answer(messages, raw_response):
+    content = get_content_from_raw_response(raw_response)
+    if content is not None:
+        messages.append({"role": "assistant", "content": content})
+
 class UnifiedResponse(BaseModel):
     content: Optional[Any] = None
     messages: List[Any] = []
+    prompt_cache_usage: Optional[List[dict]] = None
+    usage: Optional[UsageReport] = None
+    artifacts: Optional[ArtifactSet] = None
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    @field_serializer('usage')
+    def _serialize_usage(self, usage: Optional[UsageReport]):
+        return usage.to_dict() if usage is not None else None
+
+    @field_serializer('artifacts')
+    def _serialize_artifacts(self, artifacts: Optional[ArtifactSet]):
+        # Only the references the model saw; the data stays in the store
+        return [artifact.reference() for artifact in artifacts.values()] if artifacts is not None else None
 
 def structured_completion(*, model: str, messages: List[dict],
                           response_model: Optional[Type[BaseModel]] = None,
                           tools: Optional[List] = None,
                           max_recursion: int = 3,
                           metadata=None,
+                          max_tool_workers: Optional[int] = DEFAULT_MAX_TOOL_WORKERS,
+                          cache: Optional[ResponseCache] = None,
+                          prompt_caching: bool = False,
+                          reask_on_validation_error: bool = False,
+                          post_format_model: Optional[str] = None,
+                          deadline: Optional[float] = None,
+                          hedge: Optional[HedgePolicy] = None,
+                          trace_hooks: Optional[List[Callable]] = None,
+                          context_budget: Optional[ContextBudget] = None,
+                          artifact_store: Optional[ArtifactStore] = None,
                           **kwargs) -> UnifiedResponse:
     validate_model_capabilities(model, response_model, tools)
-    raw_response = completion(
+    response_model, post_format_response_model = split_post_format_model(model, response_model, tools)
+    registry = compile_tools(tools)
+    if artifact_store is None and registry.uses_artifacts:
+        artifact_store = InMemoryArtifactStore()
+    runner = CompletionRunner(model, cache=cache, prompt_caching=prompt_caching, deadline=deadline,
+                              hedge=hedge, tracer=make_tracer(trace_hooks, metadata),
+                              context_budget=context_budget, artifact_store=artifact_store)
+    raw_response = runner.complete(
+        completion,
         model=model,
         messages=messages,
-        tools=convert_tools_to_api_format(tools),
+        tools=registry.api_tools,
         response_format=response_model,
         metadata=metadata,
         **kwargs
@@ -38,23 +99,33 @@ def structured_completion(*, model: str, messages: List[dict],
         model=model,
         raw_response=raw_response,
         response_model=response_model,
-        tools=tools,
+        tools=registry,
         metadata=metadata,
+        max_tool_workers=max_tool_workers,
+        runner=runner,
+        post_format_response_model=post_format_response_model,
+        post_format_model=post_format_model,
     )
 
-    response_content = get_content_from_raw_response(raw_response)
-    parsed = None
+    output_model = response_model or post_format_response_model
     try:
-        if response_model:
-            parsed = response_model.parse_raw(response_content)
-        else:
-            parsed = response_content
-    except Exception as e:
-        raise StructuredValidationError("Failed to validate response", retry_context=raw_response) from e
+        parsed = parse_response_content(raw_response, output_model)
+    except StructuredValidationError as e:
+        if not reask_on_validation_error:
+            raise
+        # One targeted correction turn instead of re-running the whole tool loop
+        raw_response = runner.complete(completion, model=model, metadata=metadata,
+                                       **_reask_request(messages, e, response_model, registry, kwargs))
+        _record_reask_answer(messages, raw_response)
+        parsed = parse_response_content(raw_response, output_model)
 
-    return UnifiedResponse(
+    # The loop already owns ``messages``; skip re-validating the whole history
+    return UnifiedResponse.model_construct(
         content=parsed,
-        messages=messages
+        messages=messages,
+        prompt_cache_usage=runner.prompt_cache_usage if prompt_caching else None,
+        usage=runner.usage,
+        artifacts=runner.artifacts,
     )
 
 async def astructured_completion(*, model: str, messages: List[dict],
@@ -62,15 +133,31 @@ async def astructured_completion(*, model: str, messages: List[dict],
                                  tools: Optional[List] = None,
                                  max_recursion: int = 3,
                                  metadata = None,
+                                 max_tool_workers: Optional[int] = DEFAULT_MAX_TOOL_WORKERS,
+                                 tool_executor: Optional[Executor] = None,
+                                 cache: Optional[ResponseCache] = None,
+                                 prompt_caching: bool = False,
+                                 reask_on_validation_error: bool = False,
+                                 post_format_model: Optional[str] = None,
+                                 deadline: Optional[float] = None,
+                                 hedge: Optional[HedgePolicy] = None,
+                                 trace_hooks: Optional[List[Callable]] = None,
+                                 context_budget: Optional[ContextBudget] = None,
+                                 artifact_store: Optional[ArtifactStore] = None,
                                  **kwargs) -> UnifiedResponse:
-    post_format_response_model = None
-    if 'gemini' in model and tools and len(tools) > 0 and response_model is not None and tools[0].get("googleSearch") is None:
-        post_format_response_model = response_model
-        response_model = None
-    raw_response = await acompletion(
+    validate_model_capabilities(model, response_model, tools)
+    response_model, post_format_response_model = split_post_format_model(model, response_model, tools)
+    registry = compile_tools(tools)
+    if artifact_store is None and registry.uses_artifacts:
+        artifact_store = InMemoryArtifactStore()
+    runner = CompletionRunner(model, cache=cache, prompt_caching=prompt_caching, deadline=deadline,
+                              hedge=hedge, tracer=make_tracer(trace_hooks, metadata),
+                              context_budget=context_budget, artifact_store=artifact_store)
+    raw_response = await runner.acomplete(
+        acompletion,
         model=model,
         messages=messages,
-        tools=convert_tools_to_api_format(tools),
+        tools=registry.api_tools,
         response_format=response_model,
         metadata=metadata,
         **kwargs
@@ -82,24 +169,32 @@ async def astructured_completion(*, model: str, messages: List[dict],
         model=model,
         raw_response=raw_response,
         response_model=response_model,
-        tools=tools,
+        tools=registry,
         metadata=metadata,
-        post_format_response_model=post_format_response_model
+        post_format_response_model=post_format_response_model,
+        tool_executor=tool_executor,
+        max_tool_workers=max_tool_workers,
+        runner=runner,
+        post_format_model=post_format_model,
     )
 
-    response_content = get_content_from_raw_response(raw_response)
-    parsed = None
+    output_model = response_model or post_format_response_model
     try:
-        if response_model:
-            parsed = response_model.parse_raw(response_content)
-        elif post_format_response_model:
-            parsed = post_format_response_model.parse_raw(response_content)
-        else:
-            parsed = response_content
-    except Exception as e:
-        raise StructuredValidationError("Failed to validate response", retry_context=raw_response) from e
+        parsed = parse_response_content(raw_response, output_model)
+    except StructuredValidationError as e:
+        if not reask_on_validation_error:
+            raise
+        # One targeted correction turn instead of re-running the whole tool loop
+        raw_response = await runner.acomplete(acompletion, model=model, metadata=metadata,
+                                              **_reask_request(messages, e, response_model, registry, kwargs))
+        _record_reask_answer(messages, raw_response)
+        parsed = parse_response_content(raw_response, output_model)
 
-    return UnifiedResponse(
+    # The loop already owns ``messages``; skip re-validating the whole history
+    return UnifiedResponse.model_construct(
         content=parsed,
-        messages=messages
+        messages=messages,
+        prompt_cache_usage=runner.prompt_cache_usage if prompt_caching else None,
+        usage=runner.usage,
+        artifacts=runner.artifacts,
     )
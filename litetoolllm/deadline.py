@@ -0,0 +1,38 @@
+import time
+
+from .errors import DeadlineExceededError
+
+
+class Deadline:
+    """
+    Time budget shared by every LLM round trip and tool call of one request.
+
+    Each stage gets whatever is left of the budget when it starts, so a slow
+    tool leaves less time for the next model turn and vice versa.
+
+    Attributes:
+        budget (float): The total budget in seconds
+        expires_at (float): ``time.monotonic()`` value at which the budget is spent
+    """
+    __slots__ = ('budget', 'expires_at')
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires_at - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def limit(self, timeout=None) -> float:
+        """Return the smaller of ``timeout`` and the remaining budget; raises ``DeadlineExceededError`` once it is spent."""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceededError(self.budget)
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def __repr__(self):
+        return f"Deadline(budget={self.budget}, remaining={self.remaining():.3f})"
@@ -18,3 +18,13 @@ class FunctionExecutionError(Exception):
 
 class RecursionDepthExceedError(Exception):
     pass
+
+class ToolTimeoutError(FunctionExecutionError):
+    def __init__(self, function_name, timeout):
+        super().__init__(function_name, f"timed out after {timeout}s")
+        self.timeout = timeout
+
+class DeadlineExceededError(TimeoutError):
+    def __init__(self, budget):
+        super().__init__(f"Request deadline of {budget}s exceeded")
+        self.budget = budget
@@ -0,0 +1,160 @@
+import time
+import asyncio
+import threading
+import concurrent.futures
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+
+class HedgePolicy:
+    """
+    Hedged completion requests for the long latency tail.
+
+    When a turn has not answered after the hedge delay, the same request is
+    sent again (to the next entry of ``models``, or to the same model when
+    ``models`` is empty) and the first successful response wins; the slower
+    requests are cancelled (async) or abandoned (sync). A request that fails
+    before the delay starts the next hedge right away. Hedging happens per LLM
+    round trip, before tools run, so tools only ever run once per turn.
+
+    Share one policy between requests to accumulate latency samples and stats.
+
+    Attributes:
+        delay (Optional[float]): Seconds to wait before hedging; None adapts it to
+            the ``percentile`` of recent response latencies
+        models (List[str]): Alternate models/deployments used by successive hedges
+        max_hedges (int): Maximum number of extra requests per turn
+        percentile (float): Latency percentile used for the adaptive delay
+        initial_delay (float): Delay used until ``min_samples`` latencies are known
+        min_samples (int): Samples needed before the adaptive delay kicks in
+        window (int): Number of recent latencies kept
+    """
+    def __init__(self,
+                 delay: Optional[float] = None,
+                 models: Optional[List[str]] = None,
+                 max_hedges: int = 1,
+                 percentile: float = 0.95,
+                 initial_delay: float = 2.0,
+                 min_samples: int = 20,
+                 window: int = 200):
+        if max_hedges < 1:
+            raise ValueError("max_hedges must be at least 1")
+        self.delay = delay
+        self.models = list(models or ())
+        self.max_hedges = max_hedges
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_samples = min_samples
+        self.window = window
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._hedged = 0
+        self._hedge_wins = 0
+
+    def current_delay(self) -> float:
+        if self.delay is not None:
+            return self.delay
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            return self.initial_delay
+        return samples[min(len(samples) - 1, int(self.percentile * len(samples)))]
+
+    def _hedge_request(self, request, attempt):
+        if attempt == 0 or not self.models:
+            return request
+        return {**request, "model": self.models[(attempt - 1) % len(self.models)]}
+
+    def _record(self, latency, winner, launched):
+        with self._lock:
+            self._requests += 1
+            self._latencies.append(latency)
+            if launched > 1:
+                self._hedged += 1
+            if winner > 0:
+                self._hedge_wins += 1
+
+    def stats(self):
+        with self._lock:
+            requests, hedged, wins = self._requests, self._hedged, self._hedge_wins
+        return {
+            "requests": requests,
+            "hedged": hedged,
+            "hedge_wins": wins,
+            "hedge_rate": hedged / requests if requests else 0.0,
+            "hedge_win_rate": wins / hedged if hedged else 0.0,
+            "delay": self.current_delay(),
+        }
+
+    def call(self, completion_fn, **request):
+        """Run ``completion_fn(**request)`` with hedging on a private thread pool."""
+        executor = ThreadPoolExecutor(max_workers=self.max_hedges + 1, thread_name_prefix="litetoolllm-hedge")
+        attempts = {}
+
+        def launch():
+            attempt = len(attempts)
+            future = executor.submit(completion_fn, **self._hedge_request(request, attempt))
+            attempts[future] = (attempt, time.monotonic())
+            return future
+
+        try:
+            pending = {launch()}
+            delay = self.current_delay()
+            last_error = None
+            while True:
+                can_hedge = len(attempts) <= self.max_hedges
+                done, pending = concurrent.futures.wait(pending, timeout=delay if can_hedge else None,
+                                                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        attempt, started = attempts[future]
+                        self._record(time.monotonic() - started, attempt, len(attempts))
+                        return future.result()
+                    last_error = future.exception()
+                if pending and done:
+                    continue
+                if not can_hedge:
+                    raise last_error
+                pending.add(launch())
+        finally:
+            for future in attempts:
+                future.cancel()
+            executor.shutdown(wait=False)
+
+    async def acall(self, acompletion_fn, **request):
+        """Await ``acompletion_fn(**request)`` with hedging; losing requests are cancelled."""
+        attempts = {}
+
+        def launch():
+            attempt = len(attempts)
+            task = asyncio.ensure_future(acompletion_fn(**self._hedge_request(request, attempt)))
+            attempts[task] = (attempt, time.monotonic())
+            return task
+
+        try:
+            pending = {launch()}
+            delay = self.current_delay()
+            last_error = None
+            while True:
+                can_hedge = len(attempts) <= self.max_hedges
+                done, pending = await asyncio.wait(pending, timeout=delay if can_hedge else None,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        attempt, started = attempts[task]
+                        self._record(time.monotonic() - started, attempt, len(attempts))
+                        return task.result()
+                    last_error = task.exception()
+                if pending and done:
+                    continue
+                if not can_hedge:
+                    raise last_error
+                pending.add(launch())
+        finally:
+            losers = [task for task in attempts if not task.done()]
+            for task in losers:
+                task.cancel()
+            if losers:
+                await asyncio.gather(*losers, return_exceptions=True)
@@ -0,0 +1,197 @@
+import time
+import uuid
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+from .prompt_cache import prompt_cache_usage
+
+logger = logging.getLogger("litetoolllm")
+
+_global_hooks: List[Callable] = []
+
+
+class TraceEvent:
+    """
+    A structured record of one LLM round trip or tool call.
+
+    Attributes:
+        type (str): "llm_call" or "tool_call"
+        request_id (str): Identifier shared by every event of one request
+        metadata (Any): The request's ``metadata``
+        iteration (int): Turn of the tool loop (0 is the first LLM call); tool calls
+            carry the turn whose response requested them
+        name (str): The model for "llm_call" events, the tool name for "tool_call" events
+        start_time (float): Wall-clock start, in seconds since the epoch
+        duration (float): Seconds the call took
+        time_to_first_token (Optional[float]): Seconds until the first streamed chunk
+        usage (Optional[dict]): prompt/completion/total/cached token counts of an LLM call
+        tool_call_id (Optional[str]): Provider id of the tool call
+        arguments_size (Optional[int]): Length of the tool call's JSON arguments
+        cache_hit (bool): Whether the response/tool cache served the call
+        error (Optional[str]): ``"ExceptionType: message"`` if the call failed
+    """
+    __slots__ = ('type', 'request_id', 'metadata', 'iteration', 'name', 'start_time', 'duration',
+                 'time_to_first_token', 'usage', 'tool_call_id', 'arguments_size', 'cache_hit', 'error')
+
+    def __init__(self, type, request_id, metadata, iteration, name, start_time, duration,
+                 time_to_first_token=None, usage=None, tool_call_id=None, arguments_size=None,
+                 cache_hit=False, error=None):
+        self.type = type
+        self.request_id = request_id
+        self.metadata = metadata
+        self.iteration = iteration
+        self.name = name
+        self.start_time = start_time
+        self.duration = duration
+        self.time_to_first_token = time_to_first_token
+        self.usage = usage
+        self.tool_call_id = tool_call_id
+        self.arguments_size = arguments_size
+        self.cache_hit = cache_hit
+        self.error = error
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self):
+        return (f"TraceEvent({self.type!r}, name={self.name!r}, iteration={self.iteration}, "
+                f"duration={self.duration:.4f}, error={self.error!r})")
+
+
+def add_trace_hook(hook: Callable[[TraceEvent], None]):
+    """Register ``hook`` to receive the ``TraceEvent`` of every request in the process."""
+    _global_hooks.append(hook)
+
+
+def remove_trace_hook(hook: Callable[[TraceEvent], None]):
+    _global_hooks.remove(hook)
+
+
+def _usage(response):
+    usage = response.get("usage") if hasattr(response, "get") else None
+    if usage is None:
+        return None
+    cache = prompt_cache_usage(response)
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", None),
+        "completion_tokens": getattr(usage, "completion_tokens", None),
+        "total_tokens": getattr(usage, "total_tokens", None),
+        "cached_tokens": cache["cached_tokens"],
+    }
+
+
+def _describe(error):
+    return f"{type(error).__name__}: {error}" if error is not None else None
+
+
+class Tracer:
+    """
+    Emits the trace events of one request to its hooks.
+
+    Only created when at least one hook is registered, so call sites guard
+    with ``if tracer is not None`` and skip building events when tracing is
+    disabled. The ``UsageReport`` of a request is filled directly by the
+    runner and tool dispatch, not through this hook list.
+    Hook exceptions are logged and never reach the request.
+
+    Attributes:
+        hooks (List[Callable]): Callbacks receiving each ``TraceEvent``
+        request_id (str): Taken from ``metadata["request_id"]`` when present, random otherwise
+        metadata (Any): The request's ``metadata``
+        iteration (int): Current turn of the tool loop
+    """
+    __slots__ = ('hooks', 'request_id', 'metadata', 'iteration')
+
+    def __init__(self, hooks, metadata=None, request_id=None):
+        self.hooks = hooks
+        self.metadata = metadata
+        if request_id is None and isinstance(metadata, dict):
+            request_id = metadata.get("request_id")
+        self.request_id = request_id or uuid.uuid4().hex
+        self.iteration = 0
+
+    def emit(self, type, name, started, **fields):
+        """Send an event for a call that began at ``started`` (``time.monotonic()``) and ends now."""
+        duration = time.monotonic() - started
+        event = TraceEvent(type, self.request_id, self.metadata, self.iteration, name,
+                           time.time() - duration, duration, **fields)
+        for hook in self.hooks:
+            try:
+                hook(event)
+            except Exception:
+                logger.exception("Trace hook %r failed", hook)
+
+    def llm_call(self, model, started, response=None, error=None, cache_hit=False, time_to_first_token=None):
+        self.emit("llm_call", model, started, usage=_usage(response) if response is not None else None,
+                  cache_hit=cache_hit, error=_describe(error), time_to_first_token=time_to_first_token)
+
+    def tool_call(self, tool_call, started, error=None, cache_hit=False):
+        self.emit("tool_call", tool_call.function.name, started, tool_call_id=tool_call.id,
+                  arguments_size=len(tool_call.function.arguments or ""), cache_hit=cache_hit,
+                  error=_describe(error))
+
+
+def make_tracer(hooks=None, metadata=None) -> Optional[Tracer]:
+    """Return a ``Tracer`` for one request, or None when no hook is registered."""
+    if not hooks and not _global_hooks:
+        return None
+    return Tracer([*_global_hooks, *(hooks or ())], metadata=metadata)
+
+
+class LoggingHook:
+    """Trace hook that logs every event (``logging.DEBUG`` by default) to the "litetoolllm" logger."""
+    def __init__(self, logger: Optional[logging.Logger] = None, level: int = logging.DEBUG):
+        self.logger = logger or logging.getLogger("litetoolllm")
+        self.level = level
+
+    def __call__(self, event: TraceEvent):
+        self.logger.log(self.level, "%s", event.to_dict())
+
+
+class OpenTelemetryHook:
+    """
+    Trace hook that exports each event as an OpenTelemetry span.
+
+    Spans use the GenAI semantic-convention attribute names where one exists
+    and carry ``litetoolllm.request_id`` for correlation. Requires the
+    ``opentelemetry-api`` package (``pip install litetoolllm[otel]``).
+
+    Attributes:
+        tracer: The OpenTelemetry tracer spans are created with
+    """
+    def __init__(self, tracer_provider=None, tracer_name: str = "litetoolllm"):
+        try:
+            from opentelemetry import trace
+        except ImportError as e:
+            raise ImportError("OpenTelemetryHook requires opentelemetry-api: pip install litetoolllm[otel]") from e
+        self._status = trace.Status
+        self._error = trace.StatusCode.ERROR
+        self.tracer = trace.get_tracer(tracer_name, tracer_provider=tracer_provider)
+
+    def __call__(self, event: TraceEvent):
+        attributes = {
+            "litetoolllm.request_id": event.request_id,
+            "litetoolllm.iteration": event.iteration,
+            "litetoolllm.cache_hit": event.cache_hit,
+        }
+        if event.type == "llm_call":
+            name = f"chat {event.name}"
+            attributes["gen_ai.request.model"] = event.name
+            if event.usage:
+                for key, attribute in (("prompt_tokens", "gen_ai.usage.input_tokens"),
+                                       ("completion_tokens", "gen_ai.usage.output_tokens"),
+                                       ("cached_tokens", "litetoolllm.usage.cached_tokens")):
+                    if event.usage.get(key) is not None:
+                        attributes[attribute] = event.usage[key]
+            if event.time_to_first_token is not None:
+                attributes["litetoolllm.time_to_first_token"] = event.time_to_first_token
+        else:
+            name = f"execute_tool {event.name}"
+            attributes["gen_ai.tool.name"] = event.name
+            attributes["gen_ai.tool.call.id"] = event.tool_call_id or ""
+            attributes["litetoolllm.tool.arguments_size"] = event.arguments_size or 0
+        start_ns = int(event.start_time * 1e9)
+        span = self.tracer.start_span(name, start_time=start_ns, attributes=attributes)
+        if event.error is not None:
+            span.set_status(self._status(self._error, event.error))
+        span.end(end_time=start_ns + int(event.duration * 1e9))
@@ -0,0 +1,290 @@
+import re
+import json
+
+from pydantic import ValidationError
+
+_CLOSERS = {'{': '}', '[': ']'}
+_FENCE = re.compile(r"```[a-zA-Z0-9_-]*\s*\n?(.*?)(?:```|$)", re.DOTALL)
+_PYTHON_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_MAX_COERCION_PASSES = 5
+# Endings after which a truncated document holds no cut-off value
+_FINISHED_ENDINGS = ('"', '}', ']', 'true', 'false', 'null')
+
+
+class PartialJSONParser:
+    """
+    Incrementally tracks the structure of a growing JSON document.
+
+    ``feed`` only scans the new characters, keeping the stack of open
+    containers and the last position where the document can be cut cleanly,
+    so ``parse`` can close the document in O(depth) before handing it to
+    ``json.loads``. ``parse`` itself still decodes the whole text, so callers
+    that parse while streaming should do it sparingly (see ``safe_points``).
+
+    Attributes:
+        safe_points (int): Number of clean cut points seen so far; a new value
+            of the parsed prefix can only appear when this changes
+        length (int): Characters fed so far
+    """
+    def __init__(self):
+        self._chunks = []
+        self.length = 0
+        self.safe_points = 0
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._safe_length = 0
+        self._safe_stack = []
+
+    @property
+    def text(self):
+        if len(self._chunks) > 1:
+            self._chunks = [''.join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    @property
+    def complete(self):
+        """Whether the top-level container has been closed."""
+        return self.safe_points > 0 and not self._stack and not self._in_string
+
+    def feed(self, chunk):
+        start = self.length
+        self._chunks.append(chunk)
+        self.length += len(chunk)
+        for offset, char in enumerate(chunk):
+            index = start + offset
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+            if char == '"':
+                self._in_string = True
+            elif char in _CLOSERS:
+                self._stack.append(char)
+                self._mark_safe(index + 1)
+            elif char in '}]':
+                if self._stack:
+                    self._stack.pop()
+                self._mark_safe(index + 1)
+            elif char == ',':
+                self._mark_safe(index)
+
+    def _mark_safe(self, length):
+        self.safe_points += 1
+        self._safe_length = length
+        self._safe_stack = list(self._stack)
+
+    def close(self):
+        """
+        Return the text with its open containers closed, or None if it was cut inside a value.
+
+        Unlike ``parse`` nothing is dropped or completed: the text must end on
+        a finished string, container or literal. A trailing number is not
+        finished, as more digits may have been cut off.
+        """
+        text = self.text.rstrip()
+        if not text or self._in_string:
+            return None
+        if self._stack and not text.endswith(_FINISHED_ENDINGS):
+            return None
+        return text + ''.join(_CLOSERS[c] for c in reversed(self._stack))
+
+    def parse(self):
+        """
+        Return the value parsed from the text so far, or None if nothing usable has arrived.
+
+        Meant for streaming partials: an open string is closed and, failing
+        that, the text is cut back to the last clean point.
+        """
+        if self._in_string:
+            # Drop a dangling escape character and close the open string
+            text = (self.text[:-1] if self._escape else self.text) + '"'
+        else:
+            text = self.text.rstrip()
+        if not text:
+            return None
+        candidate = text + ''.join(_CLOSERS[c] for c in reversed(self._stack))
+        try:
+            return json.loads(candidate)
+        except ValueError:
+            pass
+        safe = self.text[:self._safe_length].rstrip().rstrip(',')
+        if not safe:
+            return None
+        try:
+            return json.loads(safe + ''.join(_CLOSERS[c] for c in reversed(self._safe_stack)))
+        except ValueError:
+            return None
+
+
+def strip_code_fences(text):
+    match = _FENCE.search(text)
+    return match.group(1) if match else text
+
+
+def extract_json_span(text):
+    """
+    Return the first JSON object/array in ``text``, dropping surrounding prose.
+
+    A document that is never closed (truncated output) runs to the end of the text.
+    """
+    starts = [i for i in (text.find('{'), text.find('[')) if i != -1]
+    if not starts:
+        return text
+    start = min(starts)
+    depth = 0
+    in_string = escape = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in '{[':
+            depth += 1
+        elif char in '}]':
+            depth -= 1
+            if depth == 0:
+                return text[start:index + 1]
+    return text[start:]
+
+
+def normalize_json_syntax(text):
+    """
+    Fix common syntax slips outside of string literals.
+
+    Converts single-quoted strings to double-quoted ones, Python literals
+    (True/False/None) to JSON, and drops trailing commas before a closing
+    bracket. A comma at the very end is kept: it marks truncated output.
+    """
+    out = []
+    index = 0
+    length = len(text)
+    while index < length:
+        char = text[index]
+        if char == '"':
+            end = index + 1
+            while end < length and text[end] != '"':
+                end += 2 if text[end] == '\\' else 1
+            out.append(text[index:end + 1])
+            index = end + 1
+        elif char == "'":
+            end = index + 1
+            chars = []
+            while end < length and text[end] != "'":
+                if text[end] == '\\' and end + 1 < length:
+                    chars.append(text[end + 1])
+                    end += 2
+                    continue
+                chars.append(text[end])
+                end += 1
+            # An unterminated string stays as it is, so truncation is still detected
+            out.append(json.dumps(''.join(chars)) if end < length else text[index:])
+            index = end + 1
+        elif char == ',':
+            lookahead = index + 1
+            while lookahead < length and text[lookahead].isspace():
+                lookahead += 1
+            if lookahead >= length or text[lookahead] not in '}]':
+                out.append(char)
+            index += 1
+        elif char.isalpha():
+            end = index
+            while end < length and (text[end].isalnum() or text[end] == '_'):
+                end += 1
+            word = text[index:end]
+            out.append(_PYTHON_LITERALS.get(word, word))
+            index = end
+        else:
+            out.append(char)
+            index += 1
+    return ''.join(out)
+
+
+def repair_json(text):
+    """
+    Best-effort conversion of model output into a JSON value.
+
+    Applies, in order: fence stripping, JSON span extraction, syntax
+    normalization and closing of truncated containers. Truncated output is
+    only closed when it ends on a finished value; a cut-off string, number or
+    member raises ``ValueError`` like anything else that does not parse.
+    """
+    if text is None:
+        raise ValueError("No content to repair")
+    candidate = extract_json_span(strip_code_fences(text).strip())
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+    candidate = normalize_json_syntax(candidate)
+    try:
+        return json.loads(candidate)
+    except ValueError:
+        pass
+    parser = PartialJSONParser()
+    parser.feed(candidate)
+    closed = parser.close()
+    if closed is None:
+        raise ValueError("Content does not contain repairable JSON")
+    return json.loads(closed)
+
+
+def _set_at(data, loc, value):
+    target = data
+    for key in loc[:-1]:
+        target = target[key]
+    target[loc[-1]] = value
+
+
+def coerce_to_model(data, response_model):
+    """
+    Validate ``data`` against ``response_model``, coercing near misses.
+
+    Scalars are converted to strings where the schema expects a string, a
+    single-key wrapper object or a one-element list around the expected
+    object is unwrapped. Raises the last ``ValidationError`` if coercion fails.
+    """
+    candidates = [data]
+    if isinstance(data, dict) and len(data) == 1:
+        candidates.append(next(iter(data.values())))
+    if isinstance(data, list) and len(data) == 1:
+        candidates.append(data[0])
+    last_error = None
+    for candidate in candidates:
+        for _ in range(_MAX_COERCION_PASSES):
+            try:
+                return response_model.model_validate(candidate)
+            except ValidationError as e:
+                last_error = e
+                fixed = False
+                for error in e.errors():
+                    if error["type"] == "string_type" and isinstance(error["input"], (int, float, bool)) and error["loc"]:
+                        _set_at(candidate, error["loc"], json.dumps(error["input"]))
+                        fixed = True
+                if not fixed:
+                    break
+    raise last_error
+
+
+def repair_structured_content(content, response_model):
+    """Repair ``content`` locally and validate it; raises ``ValueError``/``ValidationError`` on failure."""
+    return coerce_to_model(repair_json(content), response_model)
+
+
+def reask_message(error):
+    """User message that sends a validation failure back to the model for one targeted correction."""
+    return {"role": "user", "content": (
+        "Your previous response could not be parsed into the required schema:\n"
+        f"{error}\n"
+        "Reply with only the corrected JSON object, without any other text."
+    )}
@@ -0,0 +1,76 @@
+import litellm
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Providers that need explicit cache_control breakpoints; others (e.g. OpenAI)
+# cache prompt prefixes automatically and only report the cached tokens.
+_EXPLICIT_MARKER_PROVIDERS = frozenset({"anthropic", "bedrock", "bedrock_converse", "vertex_ai", "vertex_ai_beta"})
+
+
+def uses_explicit_cache_markers(model):
+    try:
+        provider = litellm.get_llm_provider(model)[1]
+    except Exception:
+        return False
+    return provider in _EXPLICIT_MARKER_PROVIDERS
+
+
+def _with_cache_control(message):
+    content = message.get("content")
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content, "cache_control": CACHE_CONTROL}]
+    elif isinstance(content, list) and content and isinstance(content[-1], dict):
+        blocks = [*content[:-1], {**content[-1], "cache_control": CACHE_CONTROL}]
+    else:
+        return None
+    return {**message, "content": blocks}
+
+
+def mark_cacheable_prefix(messages):
+    """
+    Return a copy of ``messages`` with cache breakpoints on the stable prefix.
+
+    Marks the last system message and the last markable message of the
+    history, so the next turn (which only appends) reads everything up to it
+    from the provider's prompt cache. The input list is left untouched.
+    """
+    marked = list(messages)
+    targets = []
+    for index in range(len(marked) - 1, -1, -1):
+        message = marked[index]
+        if isinstance(message, dict) and message.get("role") == "system":
+            targets.append(index)
+            break
+    for index in range(len(marked) - 1, -1, -1):
+        if isinstance(marked[index], dict) and isinstance(marked[index].get("content"), (str, list)):
+            if index not in targets:
+                targets.append(index)
+            break
+    for index in targets:
+        annotated = _with_cache_control(marked[index])
+        if annotated is not None:
+            marked[index] = annotated
+    return marked
+
+
+def mark_cacheable_tools(api_tools):
+    if not api_tools:
+        return api_tools
+    return [*api_tools[:-1], {**api_tools[-1], "cache_control": CACHE_CONTROL}]
+
+
+def prompt_cache_usage(raw_response):
+    """Cached vs. uncached input tokens of one provider response."""
+    usage = raw_response.get("usage") if hasattr(raw_response, "get") else None
+    if usage is None:
+        return {"prompt_tokens": None, "cached_tokens": None, "uncached_tokens": None, "cache_creation_tokens": None}
+    prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", None) or getattr(usage, "cache_read_input_tokens", None) or 0
+    cache_creation_tokens = getattr(usage, "cache_creation_input_tokens", None) or 0
+    return {
+        "prompt_tokens": prompt_tokens,
+        "cached_tokens": cached_tokens,
+        "uncached_tokens": max(prompt_tokens - cached_tokens, 0),
+        "cache_creation_tokens": cache_creation_tokens,
+    }
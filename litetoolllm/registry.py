@@ -0,0 +1,243 @@
+import inspect
+import threading
+from typing import Optional, Union
+from collections import OrderedDict
+import litellm.utils
+
+from .artifacts import Artifact
+from .scheduling import get_tool_scheduler
+from .serialization import build_arguments_model, parse_arguments
+
+_REGISTRY_CACHE_SIZE = 256
+_registry_cache = OrderedDict()
+_registry_cache_lock = threading.Lock()
+_UNSET = object()
+
+
+def _is_plain_function(tool):
+    return callable(tool) and not hasattr(tool, 'func')
+
+
+def _is_tool_instance(tool):
+    return hasattr(tool, 'func') and callable(tool.func)
+
+
+def _tool_to_api_format(tool):
+    # Check if tool is already a callable function
+    if _is_plain_function(tool):
+        return {
+            "type": "function",
+            "function": litellm.utils.function_to_dict(tool)
+        }
+    # Check if tool is a Tool instance
+    if _is_tool_instance(tool):
+        # If it's a Tool instance, use the provided parameters or convert from the function
+        if tool.parameters:
+            function_dict = {
+                "name": tool.name,
+                "description": tool.description,
+                "parameters": tool.parameters
+            }
+        else:
+            function_dict = litellm.utils.function_to_dict(tool.func)
+            function_dict["name"] = tool.name
+            function_dict["description"] = tool.description
+        return {
+            "type": "function",
+            "function": function_dict
+        }
+    # Provider-native tool definitions (e.g. {"googleSearch": {}}) are passed through
+    return tool
+
+
+def convert_tools_to_api_format(tools):
+    if not tools:
+        return None
+    return [_tool_to_api_format(tool) for tool in tools]
+
+
+def get_function_mapping(tools):
+    mapping = {}
+    for tool in tools:
+        if _is_plain_function(tool):
+            # Regular function
+            mapping[tool.__name__] = tool
+        elif _is_tool_instance(tool):
+            # Tool instance
+            mapping[tool.name] = tool
+    return mapping
+
+
+def _accepts_metadata(func):
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        # Signature not introspectable (some builtins/C callables); keep the old behaviour
+        return True
+    return any(p.name == 'metadata' or p.kind is inspect.Parameter.VAR_KEYWORD for p in parameters)
+
+
+def _artifact_params(func):
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return ()
+    return tuple(p.name for p in parameters if p.annotation is Artifact or p.annotation == 'Artifact')
+
+
+def _string_params(func):
+    try:
+        parameters = inspect.signature(func).parameters.values()
+    except (TypeError, ValueError):
+        return ()
+    return tuple(p.name for p in parameters if p.annotation in (str, Optional[str], 'str'))
+
+
+def _is_async_callable(func):
+    return inspect.iscoroutinefunction(func) or inspect.iscoroutinefunction(getattr(func, '__call__', None))
+
+
+class ToolSpec:
+    """
+    Compiled metadata and dispatch information for a single callable tool.
+
+    Attributes:
+        name (str): The name the model uses to call the tool
+        tool (Any): The original tool object (function or Tool instance)
+        schema (Dict[str, Any]): The API-format schema sent to the provider
+        func (Callable): The underlying callable (``Tool.func`` unwrapped)
+        is_async (bool): Whether ``func`` is a coroutine function
+        accepts_metadata (bool): Whether ``func`` takes a ``metadata`` keyword argument
+        cache (Optional[ToolCachePolicy]): Result memoization policy declared on the Tool
+        timeout (Optional[float]): Per-call time limit declared on the Tool
+        on_timeout (str): Timeout policy declared on the Tool ("report" or "raise")
+        max_result_tokens (Optional[int]): Result size limit declared on the Tool
+        artifact_threshold (Optional[int]): Results larger than this go to the artifact store
+        artifact_params (tuple): Parameters annotated ``Artifact``; the model passes an
+            artifact id and the tool receives the ``Artifact`` handle
+        lane (Optional[ToolLane]): Process-wide scheduler lane enforcing the Tool's ``limit``
+        single_flight (bool): Whether identical in-flight calls share one execution
+        validate_arguments (bool): Whether call arguments are validated and converted to the
+            annotated types (``Tool(validate_arguments=True)``) instead of passed through as decoded
+        string_params (tuple): Parameters annotated ``str``; numbers sent for them become strings
+        arguments_model (Optional[Type[BaseModel]]): Validator for the call arguments, built from
+            the signature of ``func`` on first use (None if arguments are not validated or the
+            signature cannot be modelled)
+    """
+    __slots__ = ('name', 'tool', 'schema', 'func', 'is_async', 'accepts_metadata', 'cache',
+                 'timeout', 'on_timeout', 'max_result_tokens', 'artifact_threshold', 'artifact_params',
+                 'lane', 'single_flight', 'validate_arguments', 'string_params', '_arguments_model')
+
+    def __init__(self, name, tool, schema):
+        self.name = name
+        self.tool = tool
+        self.schema = schema
+        self.func = tool.func if _is_tool_instance(tool) else tool
+        self.is_async = _is_async_callable(self.func)
+        self.accepts_metadata = _accepts_metadata(self.func)
+        self.cache = getattr(tool, 'cache', None) if _is_tool_instance(tool) else None
+        self.timeout = getattr(tool, 'timeout', None) if _is_tool_instance(tool) else None
+        self.on_timeout = getattr(tool, 'on_timeout', 'report') if _is_tool_instance(tool) else 'report'
+        self.max_result_tokens = getattr(tool, 'max_result_tokens', None) if _is_tool_instance(tool) else None
+        self.artifact_threshold = getattr(tool, 'artifact_threshold', None) if _is_tool_instance(tool) else None
+        self.artifact_params = _artifact_params(self.func)
+        limit = getattr(tool, 'limit', None) if _is_tool_instance(tool) else None
+        self.lane = get_tool_scheduler().lane(limit.key or name, limit) if limit is not None else None
+        self.single_flight = getattr(tool, 'single_flight', False) if _is_tool_instance(tool) else False
+        self.validate_arguments = getattr(tool, 'validate_arguments', False) if _is_tool_instance(tool) else False
+        self.string_params = _string_params(self.func)
+        self._arguments_model = _UNSET
+
+    @property
+    def arguments_model(self):
+        if self._arguments_model is _UNSET:
+            self._arguments_model = build_arguments_model(self.func, self.name,
+                                                          {name: str for name in self.artifact_params}) \
+                if self.validate_arguments else None
+        return self._arguments_model
+
+    def parse_arguments(self, arguments):
+        """Decode (and, with ``validate_arguments``, validate) the JSON arguments of a tool call into kwargs for ``func``."""
+        return parse_arguments(self.arguments_model, arguments, self.string_params)
+
+    def build_kwargs(self, function_args, metadata):
+        function_args.pop('metadata', None)
+        if self.accepts_metadata:
+            function_args['metadata'] = metadata
+        return function_args
+
+
+class ToolRegistry:
+    """
+    A compiled, reusable view of a tool set.
+
+    Schemas are generated once (docstring parsing in ``function_to_dict`` is
+    expensive), so the tool-call loop can resend ``api_tools`` on every turn
+    without rebuilding them.
+
+    Attributes:
+        tools (tuple): The tools the registry was compiled from
+        api_tools (Optional[List[dict]]): Tool schemas in API format, None if there are no tools
+        function_mapping (Dict[str, Any]): Tool name to original tool object
+        specs (Dict[str, ToolSpec]): Tool name to compiled per-tool metadata; this is
+            the dispatch table used by ``handle_tool_calls`` and ``handle_tool_calls_async``
+        has_timeouts (bool): Whether any tool declares a ``timeout``
+        uses_artifacts (bool): Whether any tool stores results in or reads from an artifact store
+    """
+    def __init__(self, tools=None):
+        self.tools = tuple(tools or ())
+        api_tools = []
+        self.specs = {}
+        for tool in self.tools:
+            schema = _tool_to_api_format(tool)
+            api_tools.append(schema)
+            if _is_plain_function(tool):
+                self.specs[tool.__name__] = ToolSpec(tool.__name__, tool, schema)
+            elif _is_tool_instance(tool):
+                self.specs[tool.name] = ToolSpec(tool.name, tool, schema)
+        self.api_tools = api_tools or None
+        self.function_mapping = {name: spec.tool for name, spec in self.specs.items()}
+        self.has_timeouts = any(spec.timeout is not None for spec in self.specs.values())
+        self.uses_artifacts = any(spec.artifact_threshold is not None or spec.artifact_params
+                                  for spec in self.specs.values())
+
+    def __len__(self):
+        return len(self.tools)
+
+    def __iter__(self):
+        return iter(self.tools)
+
+    def __getitem__(self, index):
+        return self.tools[index]
+
+
+def compile_tools(tools):
+    """
+    Return a ToolRegistry for ``tools``, reusing a cached one for the same tool objects.
+
+    The cache is keyed by the identity of each tool, so passing the same list
+    (or a new list holding the same functions/Tool instances) hits the cache.
+    Tools mutated after compilation are not recompiled; call
+    ``clear_tool_registry_cache`` in that case.
+    """
+    if isinstance(tools, ToolRegistry):
+        return tools
+    tools = tuple(tools or ())
+    key = tuple(id(tool) for tool in tools)
+    with _registry_cache_lock:
+        registry = _registry_cache.get(key)
+        if registry is not None and all(a is b for a, b in zip(registry.tools, tools)):
+            _registry_cache.move_to_end(key)
+            return registry
+    registry = ToolRegistry(tools)
+    with _registry_cache_lock:
+        _registry_cache[key] = registry
+        _registry_cache.move_to_end(key)
+        while len(_registry_cache) > _REGISTRY_CACHE_SIZE:
+            _registry_cache.popitem(last=False)
+    return registry
+
+
+def clear_tool_registry_cache():
+    with _registry_cache_lock:
+        _registry_cache.clear()
@@ -0,0 +1,145 @@
+import time
+import asyncio
+import functools
+
+from .cache import cached_completion, acached_completion
+from .artifacts import ArtifactSet
+from .context import ContextWindow
+from .deadline import Deadline
+from .errors import DeadlineExceededError
+from .usage import UsageReport
+from .prompt_cache import (
+    uses_explicit_cache_markers,
+    mark_cacheable_prefix,
+    mark_cacheable_tools,
+    prompt_cache_usage,
+)
+
+
+class CompletionRunner:
+    """
+    Applies per-request options to every LLM round trip of the tool-call loop.
+
+    One runner is created per ``structured_completion`` / ``astructured_completion``
+    call and shared by the first request and every loop iteration.
+
+    Attributes:
+        cache (Optional[ResponseCache]): Response cache consulted before each provider call
+        prompt_caching (bool): Whether provider prompt caching is requested
+        prompt_cache_usage (List[dict]): Cached/uncached input tokens per iteration
+            (only collected when ``prompt_caching`` is on)
+        deadline (Optional[Deadline]): End-to-end time budget of the request; each
+            round trip gets the remaining budget as its ``timeout``
+        hedge (Optional[HedgePolicy]): Hedging policy applied to provider calls that miss the cache
+        tracer (Optional[Tracer]): Receives an "llm_call" event per round trip, None when tracing is off
+        context (Optional[ContextWindow]): Keeps the messages of each round trip within the
+            request's ``ContextBudget``
+        artifacts (Optional[ArtifactSet]): Tool results of the request kept out of band
+        usage (UsageReport): Tokens and timings of every round trip, collected whether or not
+            tracing is on; the tool dispatchers add their tool times to it
+    """
+    def __init__(self, model, cache=None, prompt_caching=False, deadline=None, hedge=None, tracer=None,
+                 context_budget=None, artifact_store=None):
+        self.cache = cache
+        self.hedge = hedge
+        self.tracer = tracer
+        self.context = ContextWindow(context_budget, model) if context_budget is not None else None
+        self.artifacts = ArtifactSet(artifact_store) if artifact_store is not None else None
+        self.usage = UsageReport()
+        self._calls = 0
+        self.deadline = Deadline(deadline) if deadline is not None else None
+        self.prompt_caching = prompt_caching
+        self.prompt_cache_usage = []
+        self._mark_prefix = prompt_caching and uses_explicit_cache_markers(model)
+        self._marked_tools = (None, None)
+
+    def _prepare(self, request):
+        if self.deadline is not None:
+            request["timeout"] = self.deadline.limit(request.get("timeout"))
+        if self.context is not None:
+            request["messages"] = self.context.fit(request["messages"])
+        if self._mark_prefix:
+            request["messages"] = mark_cacheable_prefix(request["messages"])
+            request["tools"] = self._mark_tools(request.get("tools"))
+        return request
+
+    def _mark_tools(self, api_tools):
+        # Tool schemas are identical on every turn; mark them once per request
+        source, marked = self._marked_tools
+        if source is not api_tools:
+            marked = mark_cacheable_tools(api_tools)
+            self._marked_tools = (api_tools, marked)
+        return marked
+
+    def _record(self, response):
+        if self.prompt_caching:
+            self.prompt_cache_usage.append(prompt_cache_usage(response))
+        return response
+
+    def _begin(self, completion_fn, model):
+        if self.tracer is not None:
+            self.tracer.iteration = self._calls
+        self._calls += 1
+        return _MissProbe(completion_fn), self.usage.begin_llm_call(model), time.monotonic()
+
+    def _end(self, model, iteration, started, response=None, error=None, cache_hit=False):
+        self.usage.end_llm_call(iteration, time.monotonic() - started, response=response, cache_hit=cache_hit)
+        if self.tracer is not None:
+            self.tracer.llm_call(model, started, response=response, error=error, cache_hit=cache_hit)
+
+    def _deadline_error(self, error):
+        # Provider timeouts caused by the budget surface as the deadline error
+        if self.deadline is not None and self.deadline.expired:
+            return DeadlineExceededError(self.deadline.budget)
+        return None
+
+    def complete(self, completion_fn, **request):
+        request = self._prepare(request)
+        if self.hedge is not None:
+            completion_fn = functools.partial(self.hedge.call, completion_fn)
+        model = request.get("model")
+        completion_fn, iteration, started = self._begin(completion_fn, model)
+        try:
+            response = cached_completion(self.cache, completion_fn, **request)
+        except Exception as e:
+            error = self._deadline_error(e)
+            self._end(model, iteration, started, error=error or e)
+            if error is None:
+                raise
+            raise error from e
+        self._end(model, iteration, started, response=response, cache_hit=not completion_fn.called)
+        return self._record(response)
+
+    async def acomplete(self, acompletion_fn, **request):
+        request = self._prepare(request)
+        if self.hedge is not None:
+            acompletion_fn = functools.partial(self.hedge.acall, acompletion_fn)
+        model = request.get("model")
+        acompletion_fn, iteration, started = self._begin(acompletion_fn, model)
+        try:
+            if self.deadline is None:
+                response = await acached_completion(self.cache, acompletion_fn, **request)
+            else:
+                response = await asyncio.wait_for(acached_completion(self.cache, acompletion_fn, **request),
+                                                  self.deadline.limit())
+        except Exception as e:
+            error = self._deadline_error(e)
+            self._end(model, iteration, started, error=error or e)
+            if error is None:
+                raise
+            raise error from e
+        self._end(model, iteration, started, response=response, cache_hit=not acompletion_fn.called)
+        return self._record(response)
+
+
+class _MissProbe:
+    """Wraps the provider call so usage and tracing can tell response-cache hits from misses."""
+    __slots__ = ('completion_fn', 'called')
+
+    def __init__(self, completion_fn):
+        self.completion_fn = completion_fn
+        self.called = False
+
+    def __call__(self, **request):
+        self.called = True
+        return self.completion_fn(**request)
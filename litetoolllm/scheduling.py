@@ -0,0 +1,364 @@
+import time
+import asyncio
+import functools
+import threading
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict
+
+
+class _ThreadWaiter:
+    __slots__ = ('granted', 'enqueued', 'event')
+
+    def __init__(self):
+        self.granted = False
+        self.enqueued = time.monotonic()
+        self.event = threading.Event()
+
+    def wake(self):
+        self.event.set()
+
+
+def _resolve(future):
+    if not future.done():
+        future.set_result(None)
+
+
+class _AsyncWaiter:
+    __slots__ = ('granted', 'enqueued', 'loop', 'future')
+
+    def __init__(self, loop):
+        self.granted = False
+        self.enqueued = time.monotonic()
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def wake(self):
+        # Runs under the lane lock, possibly on another thread or loop
+        try:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+        except RuntimeError:
+            # Loop already closed; nobody is waiting any more
+            pass
+
+
+class ToolLane:
+    """
+    Admission control for the calls of one tool (or of every tool sharing a ``ToolLimit.key``).
+
+    A call starts when fewer than ``max_concurrency`` calls are running and
+    the token bucket holds a token; otherwise it waits in a FIFO queue shared
+    by threads (``handle_tool_calls``) and event loops
+    (``handle_tool_calls_async``) alike, so no caller can overtake an earlier
+    one. Only the head of the queue sleeps until the next token; the others
+    sleep until they are granted.
+
+    Attributes:
+        key (str): The lane's name in its ``ToolScheduler``
+        limit (ToolLimit): The limits enforced
+    """
+    def __init__(self, key, limit):
+        self.key = key
+        self.limit = limit
+        self._lock = threading.Lock()
+        self._queue = deque()
+        self._active = 0
+        self._tokens = float(limit.burst)
+        self._updated = time.monotonic()
+        self._calls = 0
+        self._queued_calls = 0
+        self._max_queued = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _refill(self, now):
+        if self.limit.rate is not None:
+            self._tokens = min(float(self.limit.burst), self._tokens + (now - self._updated) * self.limit.rate)
+        self._updated = now
+
+    def _start(self, now):
+        self._active += 1
+        self._calls += 1
+        if self.limit.rate is not None:
+            self._tokens -= 1
+
+    def _try_start(self):
+        """Start a call right away if nobody is queued and there is capacity."""
+        if self._queue:
+            return False
+        now = time.monotonic()
+        self._refill(now)
+        if self.limit.max_concurrency is not None and self._active >= self.limit.max_concurrency:
+            return False
+        if self.limit.rate is not None and self._tokens < 1:
+            return False
+        self._start(now)
+        return True
+
+    def _enqueue(self, waiter):
+        self._queue.append(waiter)
+        self._queued_calls += 1
+        self._max_queued = max(self._max_queued, len(self._queue))
+        return waiter
+
+    def _grant(self, caller=None):
+        """
+        Start queued calls in order while capacity allows.
+
+        Returns the seconds ``caller`` should sleep before checking again: the
+        time until the next token if it heads a queue blocked by the rate
+        limit, None (until woken) otherwise.
+        """
+        now = time.monotonic()
+        self._refill(now)
+        while self._queue:
+            if self.limit.max_concurrency is not None and self._active >= self.limit.max_concurrency:
+                return None
+            head = self._queue[0]
+            if self.limit.rate is not None and self._tokens < 1:
+                if head is not caller:
+                    head.wake()
+                    return None
+                return (1 - self._tokens) / self.limit.rate
+            self._queue.popleft()
+            self._start(now)
+            wait = now - head.enqueued
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+            head.granted = True
+            head.wake()
+        return None
+
+    def acquire(self):
+        """Block the calling thread until the call may start."""
+        with self._lock:
+            if self._try_start():
+                return
+            waiter = self._enqueue(_ThreadWaiter())
+        while True:
+            with self._lock:
+                if waiter.granted:
+                    return
+                waiter.event.clear()
+                delay = self._grant(waiter)
+                if waiter.granted:
+                    return
+            waiter.event.wait(delay)
+
+    async def acquire_async(self):
+        """Wait on the running event loop until the call may start; cancelling gives up the place in the queue."""
+        with self._lock:
+            if self._try_start():
+                return
+            waiter = self._enqueue(_AsyncWaiter(asyncio.get_running_loop()))
+        try:
+            while True:
+                with self._lock:
+                    if waiter.granted:
+                        return
+                    waiter.future = waiter.loop.create_future()
+                    delay = self._grant(waiter)
+                    if waiter.granted:
+                        return
+                await asyncio.wait((waiter.future,), timeout=delay)
+        except BaseException:
+            with self._lock:
+                if waiter.granted:
+                    self._active -= 1
+                else:
+                    self._queue.remove(waiter)
+                self._grant()
+            raise
+
+    def release(self):
+        with self._lock:
+            self._active -= 1
+            self._grant()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
+
+    async def __aenter__(self):
+        await self.acquire_async()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            calls = self._calls
+            return {
+                "active": self._active,
+                "queued": len(self._queue),
+                "max_queued": self._max_queued,
+                "calls": calls,
+                "queued_calls": self._queued_calls,
+                "mean_wait": self._total_wait / calls if calls else 0.0,
+                "max_wait": self._max_wait,
+            }
+
+
+def _limits(limit):
+    return limit.max_concurrency, limit.rate, limit.burst
+
+
+class ToolScheduler:
+    """
+    Registry of the ``ToolLane`` of every limited tool.
+
+    The process-wide instance (``get_tool_scheduler``) is used by
+    ``compile_tools``, so a tool's limit holds across every concurrent
+    request, thread and event loop in the process.
+    """
+    def __init__(self):
+        self._lanes = {}
+        self._lock = threading.Lock()
+
+    def lane(self, key: str, limit) -> ToolLane:
+        """Return the lane for ``key``, creating it for ``limit``; a key cannot be reused with different limits."""
+        with self._lock:
+            lane = self._lanes.get(key)
+            if lane is None:
+                lane = self._lanes[key] = ToolLane(key, limit)
+            elif _limits(lane.limit) != _limits(limit):
+                raise ValueError(f"Tool limit {key!r} is already registered with {lane.limit!r}, got {limit!r}")
+            return lane
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Queue depth, running calls and wait times per lane."""
+        with self._lock:
+            lanes = list(self._lanes.values())
+        return {lane.key: lane.stats() for lane in lanes}
+
+
+_scheduler = ToolScheduler()
+
+
+def get_tool_scheduler() -> ToolScheduler:
+    return _scheduler
+
+
+class _Flight:
+    __slots__ = ('done', 'result', 'error', 'waiters', 'futures', 'task')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 1
+        self.futures = []
+        self.task = None
+
+    def outcome(self):
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+class SingleFlight:
+    """
+    Coalesces identical tool calls that are in flight at the same time.
+
+    The first caller for a key runs the call; callers arriving with the same
+    key before it finishes wait for that execution and get its result (or its
+    exception) instead of running the tool again. Nothing is kept once the
+    call finishes, so this is not a cache. Waiters may be threads
+    (``handle_tool_calls``) or coroutines on any event loop
+    (``handle_tool_calls_async``). An async execution is cancelled only when
+    every caller waiting for it has been cancelled.
+    """
+    def __init__(self):
+        self._flights = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def _join(self, name, key):
+        with self._lock:
+            counts = self._counts.setdefault(name, [0, 0])
+            flight = self._flights.get((name, key))
+            if flight is not None:
+                flight.waiters += 1
+                counts[1] += 1
+                return flight, False
+            flight = self._flights[(name, key)] = _Flight()
+            counts[0] += 1
+            return flight, True
+
+    def _finish(self, name, key, flight, result=None, error=None):
+        with self._lock:
+            if self._flights.get((name, key)) is flight:
+                del self._flights[(name, key)]
+            flight.result = result
+            flight.error = error
+            flight.done.set()
+            futures, flight.futures = flight.futures, []
+        for loop, future in futures:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                pass
+
+    def run(self, name: str, key, func: Callable[[], Any]):
+        """Return ``func()``, sharing one execution among concurrent callers with the same ``name`` and ``key``."""
+        flight, leader = self._join(name, key)
+        if not leader:
+            flight.done.wait()
+            return flight.outcome()
+        try:
+            result = func()
+        except BaseException as e:
+            self._finish(name, key, flight, error=e)
+            raise
+        self._finish(name, key, flight, result)
+        return result
+
+    def _task_done(self, name, key, flight, task):
+        if task.cancelled():
+            self._finish(name, key, flight, error=asyncio.CancelledError())
+        elif task.exception() is not None:
+            self._finish(name, key, flight, error=task.exception())
+        else:
+            self._finish(name, key, flight, task.result())
+
+    async def run_async(self, name: str, key, factory: Callable[[], Awaitable]):
+        """Await ``factory()``, sharing one task among concurrent callers with the same ``name`` and ``key``."""
+        flight, leader = self._join(name, key)
+        if leader:
+            flight.task = asyncio.ensure_future(factory())
+            flight.task.add_done_callback(functools.partial(self._task_done, name, key, flight))
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        with self._lock:
+            if flight.done.is_set():
+                future.set_result(None)
+            else:
+                flight.futures.append((loop, future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            with self._lock:
+                flight.waiters -= 1
+                abandon = flight.waiters == 0 and flight.task is not None and not flight.done.is_set()
+                if abandon and self._flights.get((name, key)) is flight:
+                    del self._flights[(name, key)]
+            if abandon:
+                flight.task.cancel()
+            raise
+        return flight.outcome()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Executions and coalesced (shared) calls per tool."""
+        with self._lock:
+            return {name: {"executions": executions, "coalesced": coalesced}
+                    for name, (executions, coalesced) in self._counts.items()}
+
+
+_single_flight = SingleFlight()
+
+
+def get_single_flight() -> SingleFlight:
+    return _single_flight
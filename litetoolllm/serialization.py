@@ -0,0 +1,143 @@
+import json
+import inspect
+import threading
+from typing import Any
+
+from pydantic import TypeAdapter, ConfigDict, create_model
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class JSONCodec:
+    """
+    Standard-library JSON codec.
+
+    Subclass and pass an instance to ``set_json_codec`` to plug in another
+    implementation; ``loads`` must accept ``str`` and ``bytes`` and ``dumps``
+    must return ``str``.
+    """
+    name = "json"
+
+    def loads(self, data):
+        return json.loads(data)
+
+    def dumps(self, value):
+        return json.dumps(value)
+
+
+class OrjsonCodec(JSONCodec):
+    """
+    JSON codec backed by ``orjson``; opt in with ``set_json_codec("orjson")``.
+
+    Its output is compact and leaves non-ASCII characters unescaped, so tool
+    messages differ byte-for-byte from ``json.dumps`` and responses cached
+    under the standard codec are not reused.
+    """
+    name = "orjson"
+
+    def loads(self, data):
+        return orjson.loads(data)
+
+    def dumps(self, value):
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
+
+_codec = JSONCodec()
+_adapters = {}
+_adapters_lock = threading.Lock()
+
+
+def get_json_codec():
+    return _codec
+
+
+def set_json_codec(codec):
+    """Select the codec used for tool arguments and results: a JSONCodec instance, "json" or "orjson"."""
+    global _codec
+    if codec == "json":
+        codec = JSONCodec()
+    elif codec == "orjson":
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        codec = OrjsonCodec()
+    _codec = codec
+
+
+def loads(data):
+    return _codec.loads(data)
+
+
+def dumps(value):
+    return _codec.dumps(value)
+
+
+def get_type_adapter(target):
+    """Return a cached ``TypeAdapter`` for ``target`` (a model class or any type)."""
+    adapter = _adapters.get(target)
+    if adapter is None:
+        adapter = TypeAdapter(target)
+        with _adapters_lock:
+            _adapters[target] = adapter
+    return adapter
+
+
+def validate_json(target, data):
+    """Validate a JSON ``str``/``bytes`` document straight into ``target`` without an intermediate dict."""
+    return get_type_adapter(target).validate_json(data)
+
+
+def build_arguments_model(func, name, annotations=None):
+    """
+    Build a pydantic model for the keyword arguments of ``func``.
+
+    ``metadata`` and ``*args``/``**kwargs`` are left out; unannotated
+    parameters accept anything and extra keys are kept so unexpected
+    arguments still reach the function as before. Numbers given for ``str``
+    parameters are converted to strings, as models often send ``68`` for a
+    string field. ``annotations`` overrides
+    the validated type of some parameters. Returns None when the signature
+    cannot be turned into a model.
+    """
+    try:
+        parameters = inspect.signature(func).parameters.values()
+        fields = {}
+        for parameter in parameters:
+            if parameter.name == 'metadata' or parameter.kind in (inspect.Parameter.VAR_POSITIONAL,
+                                                                   inspect.Parameter.VAR_KEYWORD):
+                continue
+            annotation = Any if parameter.annotation is inspect.Parameter.empty else parameter.annotation
+            if annotations and parameter.name in annotations:
+                annotation = annotations[parameter.name]
+            default = ... if parameter.default is inspect.Parameter.empty else parameter.default
+            fields[parameter.name] = (annotation, default)
+        return create_model(f"{name}Arguments", __config__=ConfigDict(extra='allow', arbitrary_types_allowed=True,
+                                                                     coerce_numbers_to_str=True),
+                            **fields)
+    except Exception:
+        return None
+
+
+def parse_arguments(arguments_model, arguments, string_params=()):
+    """
+    Parse a tool-call arguments string into a kwargs dict.
+
+    With ``arguments_model`` the arguments are validated and converted to the
+    annotated types. Otherwise the decoded JSON values are passed through as
+    they are, except numbers given for ``string_params``, which become strings.
+    """
+    if arguments_model is None:
+        function_args = loads(arguments or "{}")
+        if string_params and isinstance(function_args, dict):
+            for name in string_params:
+                value = function_args.get(name)
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    function_args[name] = str(value)
+        return function_args
+    parsed = arguments_model.model_validate_json(arguments or "{}")
+    function_args = dict(parsed.__dict__)
+    if parsed.__pydantic_extra__:
+        function_args.update(parsed.__pydantic_extra__)
+    return function_args
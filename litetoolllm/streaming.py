@@ -0,0 +1,433 @@
+import sys
+import time
+import types
+import typing
+import asyncio
+from typing import Type, List, Optional, Dict, Union, Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+
+import litellm
+from litellm import completion, acompletion
+from litellm.types.utils import ChatCompletionMessageToolCall, Function
+from pydantic import BaseModel, ValidationError, create_model
+
+from .core import UnifiedResponse
+from .artifacts import ArtifactStore, ArtifactSet, InMemoryArtifactStore
+from .conversation import Conversation
+from .json_repair import PartialJSONParser
+from .errors import MaxRecursionError
+from .instrumentation import make_tracer
+from .usage import UsageReport
+from .utils import (
+    validate_model_capabilities,
+    parse_response_content,
+    get_content_from_raw_response,
+    get_tool_calls,
+    handle_tool_calls,
+    handle_tool_calls_async,
+    compile_tools,
+    _execute_tool_call,
+    _await_tool_future,
+    _async_tool_runner,
+    _gather_or_cancel,
+    _worker_count,
+    DEFAULT_MAX_TOOL_WORKERS,
+)
+
+_partial_models = {}
+# A streamed document is re-parsed for partials once it has grown by this fraction
+_PARTIAL_GROWTH = 0.1
+
+
+class StreamEvent:
+    """
+    A single event yielded by ``structured_completion_stream``.
+
+    Attributes:
+        type (str): One of "token", "partial", "tool_call", "tool_result" or "final"
+        content (Optional[str]): Text delta for "token" events
+        partial (Optional[BaseModel]): Partially filled ``response_model`` for "partial" events
+        tool_call (Any): The provider tool call for "tool_call" events
+        message (Optional[dict]): The tool message for "tool_result" events
+        response (Optional[UnifiedResponse]): The complete result for the "final" event
+    """
+    __slots__ = ('type', 'content', 'partial', 'tool_call', 'message', 'response')
+
+    def __init__(self, type, content=None, partial=None, tool_call=None, message=None, response=None):
+        self.type = type
+        self.content = content
+        self.partial = partial
+        self.tool_call = tool_call
+        self.message = message
+        self.response = response
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[1:]
+                           if getattr(self, name) is not None)
+        return f"StreamEvent({self.type!r}{', ' + fields if fields else ''})"
+
+
+def _partial_annotation(annotation):
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return make_partial_model(annotation)
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    if origin is None or not args:
+        return annotation
+    partial_args = tuple(_partial_annotation(arg) for arg in args)
+    if origin is Union or origin is getattr(types, 'UnionType', None):
+        return Union[partial_args]
+    if origin in (list, List):
+        return List[partial_args[0]]
+    if origin in (dict, Dict):
+        return Dict[partial_args[0], partial_args[1]]
+    return annotation
+
+
+def make_partial_model(response_model: Type[BaseModel]) -> Type[BaseModel]:
+    """Return a cached copy of ``response_model`` where every field (recursively) is optional."""
+    partial = _partial_models.get(response_model)
+    if partial is None:
+        fields = {
+            name: (Optional[_partial_annotation(field.annotation)], None)
+            for name, field in response_model.model_fields.items()
+        }
+        partial = create_model(f"Partial{response_model.__name__}", __base__=BaseModel, **fields)
+        _partial_models[response_model] = partial
+    return partial
+
+
+class _TurnState:
+    """Accumulates one streamed assistant turn and records its usage in ``iteration``."""
+    def __init__(self, response_model, iteration):
+        self.iteration = iteration
+        self.started = time.monotonic()
+        self.time_to_first_token = None
+        self.chunks = []
+        self.partial_model = make_partial_model(response_model) if response_model else None
+        self.parser = PartialJSONParser() if response_model else None
+        self.last_partial = None
+        self._parsed_safe_points = 0
+        self._next_parse_length = 0
+
+    def add_chunk(self, chunk):
+        """Record ``chunk`` and return the events it produces."""
+        if not self.chunks:
+            self.time_to_first_token = time.monotonic() - self.started
+        self.chunks.append(chunk)
+        events = []
+        choices = chunk.choices
+        content = choices[0].delta.content if choices else None
+        if not content:
+            return events
+        events.append(StreamEvent("token", content=content))
+        if self.parser is not None:
+            self.parser.feed(content)
+            partial = self._partial()
+            if partial is not None:
+                events.append(StreamEvent("partial", partial=partial))
+        return events
+
+    def _partial(self):
+        """
+        Parse and validate the document so far, if that can produce a new partial.
+
+        The prefix only changes at a new safe point (a container closed or a
+        comma arrived). Parsing decodes the whole buffer, so it also waits
+        until the text has grown by ``_PARTIAL_GROWTH`` since the last parse:
+        the total work stays linear in the document size instead of
+        quadratic. The completed document is always parsed.
+        """
+        parser = self.parser
+        if parser.safe_points == self._parsed_safe_points:
+            return None
+        if parser.length < self._next_parse_length and not parser.complete:
+            return None
+        self._parsed_safe_points = parser.safe_points
+        self._next_parse_length = parser.length + int(parser.length * _PARTIAL_GROWTH)
+        data = parser.parse()
+        if not isinstance(data, dict) or data == self.last_partial:
+            return None
+        try:
+            partial = self.partial_model.model_validate(data)
+        except ValidationError:
+            return None
+        self.last_partial = data
+        return partial
+
+    def build(self):
+        return litellm.stream_chunk_builder(self.chunks)
+
+    def finish(self, usage, tracer, model, response=None, error=None):
+        usage.end_llm_call(self.iteration, time.monotonic() - self.started, response=response)
+        if tracer is not None:
+            tracer.llm_call(model, self.started, response=response, error=error,
+                            time_to_first_token=self.time_to_first_token)
+
+
+def _same_call(started, final):
+    return (started.id == final.id and started.function.name == final.function.name
+            and started.function.arguments.strip() == (final.function.arguments or "").strip())
+
+
+class _SpeculativeToolCalls:
+    """
+    Starts each tool call of a streaming turn as soon as its arguments are complete.
+
+    Tool-call deltas are buffered per index; once a call's arguments form a
+    complete JSON object (that also validates against the signature for tools
+    with ``validate_arguments``), ``start`` is called
+    with the call and returns a handle (a future or task). After the turn,
+    ``handles`` pairs every final tool call with its handle in message order,
+    starting the calls that were not speculated.
+    """
+    def __init__(self, specs, start):
+        self.specs = specs
+        self.start = start
+        self._buffers = {}
+        self._started = {}
+        self._handles = []
+
+    def _start(self, tool_call):
+        handle = self.start(tool_call)
+        self._handles.append(handle)
+        return handle
+
+    def add_chunk(self, chunk):
+        """Buffer the tool-call deltas of ``chunk`` and return "tool_call" events for the calls it starts."""
+        choices = chunk.choices
+        deltas = choices[0].delta.tool_calls if choices else None
+        events = []
+        for delta in deltas or ():
+            index = getattr(delta, 'index', 0) or 0
+            buffer = self._buffers.setdefault(index, {"id": None, "name": None, "arguments": ""})
+            if delta.id:
+                buffer["id"] = delta.id
+            if delta.function is not None:
+                if delta.function.name:
+                    buffer["name"] = delta.function.name
+                if delta.function.arguments:
+                    buffer["arguments"] += delta.function.arguments
+            if index not in self._started:
+                tool_call = self._ready(buffer)
+                if tool_call is not None:
+                    self._started[index] = (tool_call, self._start(tool_call))
+                    events.append(StreamEvent("tool_call", tool_call=tool_call))
+        return events
+
+    def _ready(self, buffer):
+        spec = self.specs.get(buffer["name"])
+        arguments = buffer["arguments"]
+        if spec is None or not buffer["id"] or not arguments.rstrip().endswith('}'):
+            return None
+        try:
+            spec.parse_arguments(arguments)
+        except Exception:
+            return None
+        return ChatCompletionMessageToolCall(id=buffer["id"], type="function",
+                                             function=Function(name=buffer["name"], arguments=arguments))
+
+    def handles(self, tool_calls):
+        """Return the handles for ``tool_calls`` in order and the calls that had to be started now."""
+        handles, late = [], []
+        for index, tool_call in enumerate(tool_calls):
+            started = self._started.get(index)
+            if started is not None and _same_call(started[0], tool_call):
+                handles.append(started[1])
+            else:
+                handles.append(self._start(tool_call))
+                late.append(tool_call)
+        return handles, late
+
+    def cancel(self):
+        """Cancel every started call that has not finished; returns the handles."""
+        for handle in self._handles:
+            handle.cancel()
+        return self._handles
+
+
+def _final_event(raw_response, response_model, conversation, usage, artifacts):
+    content = get_content_from_raw_response(raw_response)
+    if content is not None:
+        conversation.append({"role": "assistant", "content": content})
+    parsed = parse_response_content(raw_response, response_model)
+    return StreamEvent("final", response=UnifiedResponse.model_construct(content=parsed,
+                                                                         messages=conversation.to_dicts(),
+                                                                         usage=usage, artifacts=artifacts))
+
+
+def structured_completion_stream(*, model: str, messages: List[dict],
+                                 response_model: Optional[Type[BaseModel]] = None,
+                                 tools: Optional[List] = None,
+                                 max_recursion: int = 3,
+                                 metadata=None,
+                                 max_tool_workers: Optional[int] = DEFAULT_MAX_TOOL_WORKERS,
+                                 speculative_tools: bool = False,
+                                 trace_hooks: Optional[List[Callable]] = None,
+                                 artifact_store: Optional[ArtifactStore] = None,
+                                 **kwargs):
+    """
+    Streaming variant of ``structured_completion``.
+
+    Yields ``StreamEvent`` objects: "token" deltas, "partial" instances of
+    ``response_model`` as its JSON grows, "tool_call"/"tool_result" events
+    while the tool loop runs, and a last "final" event carrying the
+    ``UnifiedResponse``.
+
+    With ``speculative_tools`` each tool call starts on a thread pool as soon
+    as its arguments have streamed in completely, overlapping tool latency
+    with the rest of the generation; tool messages keep the order of the
+    assistant message. ``Tool(timeout=..., on_timeout=...)`` applies as in
+    ``handle_tool_calls``, timed from the moment each call was started. If the
+    stream fails, calls that have not started are cancelled and running ones
+    are abandoned.
+    """
+    validate_model_capabilities(model, response_model, tools)
+    registry = compile_tools(tools)
+    if artifact_store is None and registry.uses_artifacts:
+        artifact_store = InMemoryArtifactStore()
+    artifacts = ArtifactSet(artifact_store) if artifact_store is not None else None
+    usage = UsageReport()
+    tracer = make_tracer(trace_hooks, metadata)
+    conversation = Conversation(messages)
+    messages = conversation.messages
+    recursion_depth = 0
+    while True:
+        turn = _TurnState(response_model, usage.begin_llm_call(model))
+        if tracer is not None:
+            tracer.iteration = recursion_depth
+        pool = speculation = None
+        if speculative_tools and registry.specs and recursion_depth + 1 < max_recursion:
+            # Threads are only spawned as calls start, so an uncapped pool holds one per call
+            pool = ThreadPoolExecutor(max_workers=_worker_count(max_tool_workers, sys.maxsize),
+                                      thread_name_prefix="litetoolllm-tool")
+            started = {}
+
+            def speculate(tool_call):
+                future = pool.submit(_execute_tool_call, tool_call, registry.specs, metadata, tracer, artifacts,
+                                     usage)
+                started[future] = time.monotonic()
+                return future
+
+            speculation = _SpeculativeToolCalls(registry.specs, speculate)
+        try:
+            try:
+                for chunk in completion(model=model, messages=messages, tools=registry.api_tools,
+                                        response_format=response_model, metadata=metadata, stream=True, **kwargs):
+                    yield from turn.add_chunk(chunk)
+                    if speculation is not None:
+                        yield from speculation.add_chunk(chunk)
+                raw_response = turn.build()
+            except Exception as e:
+                turn.finish(usage, tracer, model, error=e)
+                raise
+            turn.finish(usage, tracer, model, response=raw_response)
+            tool_calls = get_tool_calls(raw_response)
+            if tool_calls is None:
+                break
+            recursion_depth += 1
+            if recursion_depth >= max_recursion:
+                raise MaxRecursionError("Max recursion error in tool calling")
+            if speculation is None:
+                for tool_call in tool_calls:
+                    yield StreamEvent("tool_call", tool_call=tool_call)
+                new_messages = handle_tool_calls(raw_response=raw_response, tools=registry, metadata=metadata,
+                                                 max_workers=max_tool_workers, tracer=tracer, artifacts=artifacts,
+                                                 usage=usage)
+            else:
+                handles, late = speculation.handles(tool_calls)
+                for tool_call in late:
+                    yield StreamEvent("tool_call", tool_call=tool_call)
+                # Each call is timed from its own start, like handle_tool_calls
+                new_messages = [raw_response.choices[0].message,
+                                *(_await_tool_future(handle, tool_call, registry.specs, None, started[handle],
+                                                     tracer, usage)
+                                  for handle, tool_call in zip(handles, tool_calls))]
+        finally:
+            if pool is not None:
+                speculation.cancel()
+                pool.shutdown(wait=False)
+        for message in new_messages[1:]:
+            yield StreamEvent("tool_result", message=message)
+        conversation.extend(new_messages)
+    yield _final_event(raw_response, response_model, conversation, usage, artifacts)
+
+
+async def astructured_completion_stream(*, model: str, messages: List[dict],
+                                        response_model: Optional[Type[BaseModel]] = None,
+                                        tools: Optional[List] = None,
+                                        max_recursion: int = 3,
+                                        metadata=None,
+                                        max_tool_workers: Optional[int] = DEFAULT_MAX_TOOL_WORKERS,
+                                        tool_executor: Optional[Executor] = None,
+                                        speculative_tools: bool = False,
+                                        trace_hooks: Optional[List[Callable]] = None,
+                                        artifact_store: Optional[ArtifactStore] = None,
+                                        **kwargs):
+    """
+    Async variant of ``structured_completion_stream``; tools run through ``handle_tool_calls_async``.
+
+    With ``speculative_tools`` each tool call is started as a task as soon as
+    its arguments are complete; if the stream fails, started calls are cancelled.
+    """
+    validate_model_capabilities(model, response_model, tools)
+    registry = compile_tools(tools)
+    if artifact_store is None and registry.uses_artifacts:
+        artifact_store = InMemoryArtifactStore()
+    artifacts = ArtifactSet(artifact_store) if artifact_store is not None else None
+    usage = UsageReport()
+    tracer = make_tracer(trace_hooks, metadata)
+    conversation = Conversation(messages)
+    messages = conversation.messages
+    recursion_depth = 0
+    while True:
+        turn = _TurnState(response_model, usage.begin_llm_call(model))
+        if tracer is not None:
+            tracer.iteration = recursion_depth
+        speculation = None
+        if speculative_tools and registry.specs and recursion_depth + 1 < max_recursion:
+            execute_tool_call = _async_tool_runner(registry, metadata, executor=tool_executor,
+                                                   max_workers=max_tool_workers, tracer=tracer,
+                                                   artifacts=artifacts, usage=usage)
+            speculation = _SpeculativeToolCalls(
+                registry.specs, lambda tool_call: asyncio.ensure_future(execute_tool_call(tool_call)))
+        try:
+            try:
+                stream = await acompletion(model=model, messages=messages, tools=registry.api_tools,
+                                           response_format=response_model, metadata=metadata, stream=True, **kwargs)
+                async for chunk in stream:
+                    for event in turn.add_chunk(chunk):
+                        yield event
+                    if speculation is not None:
+                        for event in speculation.add_chunk(chunk):
+                            yield event
+                raw_response = turn.build()
+            except Exception as e:
+                turn.finish(usage, tracer, model, error=e)
+                raise
+            turn.finish(usage, tracer, model, response=raw_response)
+            tool_calls = get_tool_calls(raw_response)
+            if tool_calls is None:
+                break
+            recursion_depth += 1
+            if recursion_depth >= max_recursion:
+                raise MaxRecursionError("Max recursion error in tool calling")
+            if speculation is None:
+                for tool_call in tool_calls:
+                    yield StreamEvent("tool_call", tool_call=tool_call)
+                new_messages = await handle_tool_calls_async(raw_response=raw_response, tools=registry,
+                                                             metadata=metadata, executor=tool_executor,
+                                                             max_workers=max_tool_workers, tracer=tracer,
+                                                             artifacts=artifacts, usage=usage)
+            else:
+                handles, late = speculation.handles(tool_calls)
+                for tool_call in late:
+                    yield StreamEvent("tool_call", tool_call=tool_call)
+                new_messages = [raw_response.choices[0].message, *await _gather_or_cancel(handles)]
+        finally:
+            if speculation is not None:
+                await asyncio.gather(*speculation.cancel(), return_exceptions=True)
+        for message in new_messages[1:]:
+            yield StreamEvent("tool_result", message=message)
+        conversation.extend(new_messages)
+    yield _final_event(raw_response, response_model, conversation, usage, artifacts)
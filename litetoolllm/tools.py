@@ -1,6 +1,82 @@
 # litetoolllm/tools.py
+import json
 from typing import Callable, Dict, Any, Optional
 
+from .cache import InMemoryResponseCache
+
+def canonical_arguments(function_args: Dict[str, Any]) -> str:
+    """Key identifying a call's arguments: canonical JSON without ``metadata``."""
+    return json.dumps({k: v for k, v in function_args.items() if k != 'metadata'}, sort_keys=True, default=repr)
+
+class ToolCachePolicy:
+    """
+    Result memoization policy for an idempotent tool.
+
+    Repeat calls with the same arguments (``metadata`` is never part of the
+    key) are served from a bounded LRU cache shared by every request that uses
+    the tool. ``None`` results are not cached.
+
+    Attributes:
+        ttl (Optional[float]): Seconds a result stays valid, None for no expiry
+        max_entries (int): Maximum number of cached results
+        key (Optional[Callable]): Builds a hashable key from the call arguments
+            (without ``metadata``); defaults to canonical JSON of the arguments
+    """
+    def __init__(self,
+                 ttl: Optional[float] = None,
+                 max_entries: int = 256,
+                 key: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.key = key
+        self.results = InMemoryResponseCache(max_entries=max_entries, ttl=ttl)
+
+    def make_key(self, function_args: Dict[str, Any]):
+        if self.key is not None:
+            return self.key({k: v for k, v in function_args.items() if k != 'metadata'})
+        return canonical_arguments(function_args)
+
+    def stats(self):
+        return self.results.stats()
+
+class ToolLimit:
+    """
+    Concurrency and rate limit for a tool, enforced across the whole process.
+
+    Calls over the limit are not rejected: they wait in a FIFO queue shared by
+    every request, thread and event loop, and start in arrival order once a
+    slot and a token are free. Result-cache hits do not count. Queue depth and
+    wait times are reported by ``get_tool_scheduler().stats()``.
+
+    Attributes:
+        max_concurrency (Optional[int]): Calls that may run at once, None for no cap
+        rate (Optional[float]): Calls started per second on average (token bucket), None for no rate limit
+        burst (int): Bucket capacity, i.e. calls that may start back to back after an idle period
+        key (Optional[str]): Scheduler lane, defaults to the tool name; tools with the
+            same key share one budget (e.g. several tools calling the same backend)
+    """
+    def __init__(self,
+                 max_concurrency: Optional[int] = None,
+                 rate: Optional[float] = None,
+                 burst: int = 1,
+                 key: Optional[str] = None):
+        if max_concurrency is None and rate is None:
+            raise ValueError("ToolLimit needs max_concurrency, rate or both")
+        if max_concurrency is not None and max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        if rate is not None and rate <= 0:
+            raise ValueError(f"rate must be positive, got {rate}")
+        if burst < 1:
+            raise ValueError(f"burst must be at least 1, got {burst}")
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.key = key
+
+    def __repr__(self):
+        return (f"ToolLimit(max_concurrency={self.max_concurrency}, rate={self.rate}, burst={self.burst}, "
+                f"key={self.key!r})")
+
 class Tool:
     """
     A class to represent a callable tool for LLM function calling.
@@ -10,16 +86,52 @@ class Tool:
         name (str): The name of the tool (defaults to function name)
         description (str): Description of what the tool does
         parameters (Dict[str, Any]): Parameters schema for the tool
+        cache (Optional[ToolCachePolicy]): Result memoization policy, None for no caching
+        timeout (Optional[float]): Seconds a single call may take, None for no limit
+        on_timeout (str): "report" sends a timed-out call back to the model as a tool
+            error, "raise" raises ``ToolTimeoutError``
+        max_result_tokens (Optional[int]): Longer results are head/tail-trimmed to this many
+            tokens before they enter the conversation, None for no limit
+        artifact_threshold (Optional[int]): Results larger than this (bytes or serialized
+            characters) are kept in the request's artifact store and the model gets a
+            reference with a short preview instead; None keeps every result inline
+        limit (Optional[ToolLimit]): Process-wide concurrency / rate limit, None for no limit
+        single_flight (bool): Identical calls (same name and arguments, ignoring ``metadata``)
+            in flight at the same time share one execution; the tool then runs with the
+            ``metadata`` of the first caller. Only for idempotent tools
+        validate_arguments (bool): Validate the call arguments against the signature and pass
+            them converted to the annotated types (e.g. pydantic models instead of dicts);
+            arguments that do not fit raise before the tool runs. Off by default: the decoded
+            JSON values are passed as they are, with numbers sent for ``str`` parameters
+            turned into strings
     """
     def __init__(self, 
                  func: Callable, 
                  name: Optional[str] = None, 
                  description: Optional[str] = None,
-                 parameters: Optional[Dict[str, Any]] = None):
+                 parameters: Optional[Dict[str, Any]] = None,
+                 cache: Optional[ToolCachePolicy] = None,
+                 timeout: Optional[float] = None,
+                 on_timeout: str = "report",
+                 max_result_tokens: Optional[int] = None,
+                 artifact_threshold: Optional[int] = None,
+                 limit: Optional[ToolLimit] = None,
+                 single_flight: bool = False,
+                 validate_arguments: bool = False):
+        if on_timeout not in ("report", "raise"):
+            raise ValueError(f"on_timeout must be 'report' or 'raise', got {on_timeout!r}")
         self.func = func
         self.name = name or func.__name__
         self.description = description or func.__doc__ or ""
         self.parameters = parameters or {}
+        self.cache = cache
+        self.timeout = timeout
+        self.on_timeout = on_timeout
+        self.max_result_tokens = max_result_tokens
+        self.artifact_threshold = artifact_threshold
+        self.limit = limit
+        self.single_flight = single_flight
+        self.validate_arguments = validate_arguments
     
     def __call__(self, *args, **kwargs):
         return self.func(*args, **kwargs)
@@ -0,0 +1,177 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+import litellm
+
+from .instrumentation import _usage
+
+
+class IterationUsage:
+    """
+    Token usage and timing of one LLM turn and the tools it requested.
+
+    Attributes:
+        model (str): The model the turn was sent to
+        prompt_tokens (int): Input tokens, cached ones included
+        completion_tokens (int): Output tokens
+        cached_tokens (int): Input tokens served from the provider prompt cache
+        llm_time (float): Wall time of the LLM round trip in seconds
+        tool_times (Dict[str, float]): Wall time per tool name for the calls of this turn
+        cache_hit (bool): Whether the response cache answered the turn (no tokens billed)
+    """
+    __slots__ = ('model', 'prompt_tokens', 'completion_tokens', 'cached_tokens', 'llm_time', 'tool_times',
+                 'cache_hit')
+
+    def __init__(self, model, prompt_tokens=0, completion_tokens=0, cached_tokens=0, llm_time=0.0,
+                 cache_hit=False):
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.cached_tokens = cached_tokens
+        self.llm_time = llm_time
+        self.tool_times = {}
+        self.cache_hit = cache_hit
+
+    @property
+    def tool_time(self) -> float:
+        return sum(self.tool_times.values())
+
+    @property
+    def cost(self) -> Optional[float]:
+        """Estimated cost in USD from litellm's price map, None if the model is not priced."""
+        if self.cache_hit:
+            return 0.0
+        try:
+            prompt_cost, completion_cost = litellm.cost_per_token(
+                model=self.model, prompt_tokens=self.prompt_tokens, completion_tokens=self.completion_tokens,
+                cache_read_input_tokens=self.cached_tokens)
+        except Exception:
+            return None
+        return prompt_cost + completion_cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "model": self.model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "llm_time": self.llm_time,
+            "tool_times": dict(self.tool_times),
+            "cache_hit": self.cache_hit,
+            "cost": self.cost,
+        }
+
+    def __repr__(self):
+        return (f"IterationUsage(model={self.model!r}, prompt_tokens={self.prompt_tokens}, "
+                f"completion_tokens={self.completion_tokens}, llm_time={self.llm_time:.3f})")
+
+
+def _fill(iteration, usage, duration, cache_hit):
+    usage = usage or {}
+    iteration.prompt_tokens = usage.get("prompt_tokens") or 0
+    iteration.completion_tokens = usage.get("completion_tokens") or 0
+    iteration.cached_tokens = usage.get("cached_tokens") or 0
+    iteration.llm_time = duration
+    iteration.cache_hit = cache_hit
+
+
+class UsageReport:
+    """
+    Per-iteration usage and latency of one request, available as ``UnifiedResponse.usage``.
+
+    The request's ``CompletionRunner`` (or stream loop) opens an iteration per
+    LLM round trip and the tool dispatchers add their wall time to the latest
+    one, independently of tracing. A report can also be fed ``TraceEvent``s as
+    a trace hook. Costs are only computed when read.
+
+    Attributes:
+        iterations (List[IterationUsage]): One entry per LLM turn, in order
+    """
+    def __init__(self):
+        self.iterations: List[IterationUsage] = []
+        self._lock = threading.Lock()
+
+    def begin_llm_call(self, model) -> IterationUsage:
+        """Open the iteration of an LLM round trip; tool calls recorded from now on belong to it."""
+        iteration = IterationUsage(model)
+        with self._lock:
+            self.iterations.append(iteration)
+        return iteration
+
+    def end_llm_call(self, iteration, duration, response=None, cache_hit=False):
+        _fill(iteration, _usage(response) if response is not None else None, duration, cache_hit)
+
+    def record_tool_call(self, name, duration):
+        with self._lock:
+            if not self.iterations:
+                return
+            tool_times = self.iterations[-1].tool_times
+            tool_times[name] = tool_times.get(name, 0.0) + duration
+
+    def __call__(self, event):
+        if event.type == "llm_call":
+            _fill(self.begin_llm_call(event.name), event.usage, event.duration, event.cache_hit)
+        elif event.type == "tool_call":
+            with self._lock:
+                if not self.iterations:
+                    return
+                iteration = self.iterations[min(event.iteration, len(self.iterations) - 1)]
+                iteration.tool_times[event.name] = iteration.tool_times.get(event.name, 0.0) + event.duration
+
+    @property
+    def turns(self) -> int:
+        return len(self.iterations)
+
+    @property
+    def prompt_tokens(self) -> int:
+        return sum(iteration.prompt_tokens for iteration in self.iterations)
+
+    @property
+    def completion_tokens(self) -> int:
+        return sum(iteration.completion_tokens for iteration in self.iterations)
+
+    @property
+    def cached_tokens(self) -> int:
+        return sum(iteration.cached_tokens for iteration in self.iterations)
+
+    @property
+    def llm_time(self) -> float:
+        return sum(iteration.llm_time for iteration in self.iterations)
+
+    @property
+    def tool_times(self) -> Dict[str, float]:
+        totals = {}
+        for iteration in self.iterations:
+            for name, seconds in iteration.tool_times.items():
+                totals[name] = totals.get(name, 0.0) + seconds
+        return totals
+
+    @property
+    def tool_time(self) -> float:
+        return sum(iteration.tool_time for iteration in self.iterations)
+
+    @property
+    def cost(self) -> Optional[float]:
+        """Total estimated cost in USD, None if any turn's model is not priced."""
+        costs = [iteration.cost for iteration in self.iterations]
+        if any(cost is None for cost in costs):
+            return None
+        return sum(costs)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "llm_time": self.llm_time,
+            "tool_time": self.tool_time,
+            "tool_times": self.tool_times,
+            "cost": self.cost,
+            "iterations": [iteration.to_dict() for iteration in self.iterations],
+        }
+
+    def __repr__(self):
+        return (f"UsageReport(turns={self.turns}, prompt_tokens={self.prompt_tokens}, "
+                f"completion_tokens={self.completion_tokens}, llm_time={self.llm_time:.3f}, "
+                f"tool_time={self.tool_time:.3f})")
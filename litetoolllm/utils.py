@@ -1,51 +1,61 @@
-import json
 import litellm.utils
 from litellm import acompletion, completion
-from .errors import ModelCapabilityError, FunctionExecutionError, MaxRecursionError
+from .errors import (
+    ModelCapabilityError,
+    FunctionExecutionError,
+    MaxRecursionError,
+    StructuredValidationError,
+    ToolTimeoutError,
+    DeadlineExceededError,
+)
+from .runner import CompletionRunner
+from .json_repair import repair_structured_content
+from .serialization import dumps, validate_json
+from .context import trim_text
+from .conversation import Conversation
+from .registry import compile_tools, convert_tools_to_api_format, get_function_mapping
+from .scheduling import get_single_flight
+from .tools import canonical_arguments
 import asyncio
-import inspect
+import functools
+import threading
+import time
+import concurrent.futures
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_MAX_TOOL_WORKERS = 8
 
 structured_output_prompt = """
 Make the output of last response structured. 
 """
-def convert_tools_to_api_format(tools):
-    if not tools:
-        return None
-    
-    dict_tools = []
-    for tool in tools:
-        # Check if tool is already a callable function
-        if callable(tool) and not hasattr(tool, 'func'):
-            dict_tools.append({
-                "type": "function",
-                "function": litellm.utils.function_to_dict(tool)
-            })
-        # Check if tool is a Tool instance
-        elif hasattr(tool, 'func') and callable(tool.func):
-            # If it's a Tool instance, use the provided parameters or convert from the function
-            if tool.parameters:
-                function_dict = {
-                    "name": tool.name,
-                    "description": tool.description,
-                    "parameters": tool.parameters
-                }
-            else:
-                function_dict = litellm.utils.function_to_dict(tool.func)
-                function_dict["name"] = tool.name
-                function_dict["description"] = tool.description
-            
-            dict_tools.append({
-                "type": "function",
-                "function": function_dict
-            })
+_capability_cache = {}
+_capability_cache_lock = threading.Lock()
+
+def get_model_capabilities(model):
+    """
+    Return the json_mode / function_calling support flags for ``model``.
+
+    The lookup walks litellm's model map, so results are cached process-wide
+    per model string. Use ``clear_model_capability_cache`` after registering
+    custom models or changing ``litellm.model_cost``.
+    """
+    capabilities = _capability_cache.get(model)
+    if capabilities is None:
+        capabilities = {"json_mode": litellm.supports_response_schema(model=model),
+                        "function_calling": litellm.supports_function_calling(model=model)}
+        with _capability_cache_lock:
+            _capability_cache[model] = capabilities
+    return capabilities
+
+def clear_model_capability_cache(model=None):
+    with _capability_cache_lock:
+        if model is None:
+            _capability_cache.clear()
         else:
-            dict_tools.append(tool)
-    
-    return dict_tools
+            _capability_cache.pop(model, None)
 
 def validate_model_capabilities(model, response_model, tools):
-    supported_params = {"json_mode": litellm.supports_response_schema(model=model),
-                        "function_calling": litellm.supports_function_calling(model=model)}
+    supported_params = get_model_capabilities(model)
     if response_model and not supported_params.get("json_mode", False):
         raise ModelCapabilityError(f"Model {model} lacks JSON support but response_model required")
     if tools and not supported_params.get("function_calling", False):
@@ -54,126 +64,429 @@ def validate_model_capabilities(model, response_model, tools):
 def get_content_from_raw_response(raw_response):
     return raw_response.get('choices', [{}])[0].get('message', {}).get('content', '{}')
 
+def parse_response_content(raw_response, response_model, repair=True):
+    """
+    Parse the final content into ``response_model`` (or return it as-is without one).
+
+    When strict parsing fails and ``repair`` is on, a local repair pass (code
+    fences, surrounding prose, syntax slips, truncation, schema coercion) is
+    tried before raising ``StructuredValidationError``.
+    """
+    response_content = get_content_from_raw_response(raw_response)
+    if not response_model:
+        return response_content
+    try:
+        return validate_json(response_model, response_content)
+    except Exception as e:
+        if repair:
+            try:
+                return repair_structured_content(response_content, response_model)
+            except Exception:
+                pass
+        raise StructuredValidationError("Failed to validate response", retry_context=raw_response) from e
+
+def split_post_format_model(model, response_model, tools):
+    """
+    Return ``(response_model, post_format_response_model)`` for the tool loop.
+
+    Gemini requests with function tools run the loop without a response
+    schema; the final answer is then validated against
+    ``post_format_response_model`` and only reformatted by a separate call
+    when that fails.
+    """
+    if 'gemini' in model and tools and response_model is not None and not _is_google_search(tools[0]):
+        return None, response_model
+    return response_model, None
+
+def _is_google_search(tool):
+    return isinstance(tool, dict) and tool.get("googleSearch") is not None
+
+def _post_format_request(messages, raw_response, response_model, model, metadata, kwargs):
+    """Formatting request for the final answer, or None if it already validates against ``response_model``."""
+    try:
+        parse_response_content(raw_response, response_model)
+        return None
+    except StructuredValidationError:
+        pass
+    return dict(
+        model=model,
+        messages=[
+            *messages,
+            {"role": "assistant", "content": get_content_from_raw_response(raw_response)},
+            {"role": "system", "content": structured_output_prompt},
+        ],
+        response_format=response_model,
+        metadata=metadata,
+        **kwargs,
+    )
+
 def get_tool_calls(raw_response):
     return raw_response.get('choices', [{}])[0].get('message', {}).get('tool_calls', None)
 
-def get_function_mapping(tools):
-    mapping = {}
-    for tool in tools:
-        if callable(tool) and not hasattr(tool, 'func'):
-            # Regular function
-            mapping[tool.__name__] = tool
-        elif hasattr(tool, 'func') and callable(tool.func):
-            # Tool instance
-            mapping[tool.name] = tool
-    return mapping
-
-def _extract_function_details(tool_call, function_mapping):
+def _extract_function_details(tool_call, specs, artifacts=None):
     function_name = tool_call.function.name
-    function_to_call = function_mapping.get(function_name, None)
-    if function_to_call is None:
+    spec = specs.get(function_name, None)
+    if spec is None:
         raise ValueError(f"Function {function_name} name mismatch in tool calling")
-    
-    function_args = json.loads(tool_call.function.arguments)
-    
-    # If it's a Tool instance, get the actual function
-    if hasattr(function_to_call, 'func'):
-        function_to_call = function_to_call.func
-        
-    return function_name, function_to_call, function_args
-
-def handle_tool_calls(raw_response, tools, metadata):
+
+    function_args = spec.parse_arguments(tool_call.function.arguments)
+    for name in spec.artifact_params:
+        if function_args.get(name) is not None:
+            if artifacts is None:
+                raise ValueError(f"Function {function_name} takes artifacts but no artifact store is configured")
+            function_args[name] = artifacts.resolve(function_args[name])
+    return spec, function_args
+
+def _tool_message(tool_call, function_name, function_response, max_tokens=None):
+    content = dumps(function_response) if isinstance(function_response, dict) else function_response
+    # A result can only exceed the limit if it has more characters than tokens allowed
+    if max_tokens is not None and isinstance(content, str) and len(content) > max_tokens:
+        content = trim_text(content, max_tokens)
+    return {
+        "tool_call_id": tool_call.id,
+        "role": "tool",
+        "name": function_name,
+        "content": content,
+    }
+
+def _result_message(tool_call, spec, result, artifacts=None):
+    if artifacts is not None and spec.artifact_threshold is not None:
+        artifact = artifacts.offload(result, spec.artifact_threshold, tool=spec.name)
+        if artifact is not None:
+            result = artifact.reference()
+    return _tool_message(tool_call, spec.name, result, spec.max_result_tokens)
+
+def _lookup_tool_cache(spec, function_args):
+    if spec.cache is None:
+        return None, None
+    key = spec.cache.make_key(function_args)
+    return key, spec.cache.results.get(key)
+
+def _store_tool_cache(spec, key, result):
+    if spec.cache is not None and result is not None:
+        spec.cache.results.set(key, result)
+
+def _call_tool(spec, function_args):
+    if spec.lane is None:
+        return spec.func(**function_args)
+    with spec.lane:
+        return spec.func(**function_args)
+
+def _run_tool(spec, function_args, metadata):
+    if not spec.single_flight:
+        return _call_tool(spec, spec.build_kwargs(function_args, metadata))
+    key = canonical_arguments(function_args)
+    return get_single_flight().run(spec.name, key,
+                                   lambda: _call_tool(spec, spec.build_kwargs(function_args, metadata)))
+
+def _tool_finished(tool_call, started, tracer=None, usage=None, error=None, cache_hit=False):
+    if usage is not None:
+        usage.record_tool_call(tool_call.function.name, time.monotonic() - started)
+    if tracer is not None:
+        tracer.tool_call(tool_call, started, error=error, cache_hit=cache_hit)
+
+def _execute_tool_call(tool_call, specs, metadata, tracer=None, artifacts=None, usage=None):
+    observed = tracer is not None or usage is not None
+    if observed:
+        started = time.monotonic()
+    try:
+        spec, function_args = _extract_function_details(tool_call, specs, artifacts)
+        cache_key, function_response = _lookup_tool_cache(spec, function_args)
+        cache_hit = function_response is not None
+        if function_response is None:
+            function_response = _run_tool(spec, function_args, metadata)
+            _store_tool_cache(spec, cache_key, function_response)
+        message = _result_message(tool_call, spec, function_response, artifacts)
+    except Exception as e:
+        if observed:
+            _tool_finished(tool_call, started, tracer, usage, error=e)
+        raise FunctionExecutionError(tool_call, str(e)) from e
+    if observed:
+        _tool_finished(tool_call, started, tracer, usage, cache_hit=cache_hit)
+    return message
+
+def _tool_wait(spec, deadline, started):
+    """Seconds left for a tool call begun at ``started``, and whether the request deadline is the binding limit."""
+    tool_end = started + spec.timeout if spec.timeout is not None else None
+    if deadline is not None and (tool_end is None or deadline.expires_at < tool_end):
+        return max(0.0, deadline.expires_at - time.monotonic()), True
+    if tool_end is None:
+        return None, False
+    return max(0.0, tool_end - time.monotonic()), False
+
+def _tool_timed_out(tool_call, spec, deadline, from_deadline, tracer=None, started=None, usage=None):
+    error = DeadlineExceededError(deadline.budget) if from_deadline else ToolTimeoutError(spec.name, spec.timeout)
+    _tool_finished(tool_call, started, tracer, usage, error=error)
+    if from_deadline or spec.on_timeout == "raise":
+        raise error
+    return _tool_message(tool_call, spec.name, {"error": f"Tool {spec.name} timed out after {spec.timeout}s"})
+
+def _await_tool_future(future, tool_call, specs, deadline, started, tracer=None, usage=None):
+    spec = specs.get(tool_call.function.name)
+    if spec is None:
+        # Unknown tool: the worker raises FunctionExecutionError right away
+        return future.result()
+    wait, from_deadline = _tool_wait(spec, deadline, started)
+    try:
+        return future.result(timeout=wait)
+    except concurrent.futures.TimeoutError:
+        return _tool_timed_out(tool_call, spec, deadline, from_deadline, tracer, started, usage)
+
+def _execute_tool_calls_with_timeouts(tool_calls, specs, metadata, workers, deadline, tracer=None,
+                                      artifacts=None, usage=None):
+    """
+    Thread-pool dispatch that enforces per-tool timeouts and the request deadline.
+
+    A worker stuck in a timed-out tool cannot be interrupted in Python; it is
+    abandoned and the pool is shut down without waiting for it. With a single
+    worker the calls still run one after another, each timed from its own start;
+    a call that times out keeps its thread, so the next call gets a fresh one.
+    """
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="litetoolllm-tool")
+    futures = []
+    try:
+        if workers <= 1:
+            messages = []
+            for tool_call in tool_calls:
+                future = executor.submit(_execute_tool_call, tool_call, specs, metadata, tracer, artifacts, usage)
+                messages.append(_await_tool_future(future, tool_call, specs, deadline, time.monotonic(), tracer,
+                                                   usage))
+                if not future.done():
+                    executor.shutdown(wait=False)
+                    executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="litetoolllm-tool")
+            return messages
+        started = time.monotonic()
+        futures = [executor.submit(_execute_tool_call, tool_call, specs, metadata, tracer, artifacts, usage)
+                   for tool_call in tool_calls]
+        return [_await_tool_future(future, tool_call, specs, deadline, started, tracer, usage)
+                for future, tool_call in zip(futures, tool_calls)]
+    finally:
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+def _worker_count(max_workers, calls):
+    """Threads for ``calls`` tool calls: at most ``max_workers``, one per call when it is None."""
+    if max_workers is None:
+        return calls
+    return max(1, min(max_workers, calls))
+
+def handle_tool_calls(raw_response, tools, metadata, max_workers=DEFAULT_MAX_TOOL_WORKERS, deadline=None,
+                      tracer=None, artifacts=None, usage=None):
+    """
+    Execute the tool calls of an assistant turn and return the new messages.
+
+    Independent tool calls run concurrently on a thread pool bounded by
+    ``max_workers``; None lifts the cap (one thread per call) and 1 runs them
+    one after another. Tool messages are always returned in ``tool_call_id`` order and the
+    first failing call (in that order) raises ``FunctionExecutionError``.
+
+    Tools declaring a ``timeout`` and the request ``deadline`` (a ``Deadline``)
+    are enforced while waiting for results; timeouts are counted from when the
+    turn's calls are dispatched, so queueing behind ``max_workers`` counts too.
+    A ``tracer`` receives a "tool_call" event per call and ``usage`` (a
+    ``UsageReport``) the wall time of each call. With ``artifacts`` (an
+    ``ArtifactSet``), large results of tools declaring ``artifact_threshold``
+    are stored out of band and ``Artifact`` parameters are resolved.
+    Tools declaring a ``ToolLimit`` wait for their process-wide scheduler lane
+    on the worker thread, and duplicate calls of ``single_flight`` tools (in
+    this turn or any concurrent request) share one execution.
+    """
     tool_calls = get_tool_calls(raw_response)
-    function_mapping = get_function_mapping(tools)
+    registry = compile_tools(tools)
+    specs = registry.specs
     new_messages = []
     if tool_calls:
+        if deadline is not None:
+            deadline.limit()
         new_messages.append(raw_response.choices[0].message)
-        for tool_call in tool_calls:
-            try:
-                print(f"\nExecuting tool call\n{tool_call}")
-                function_name, function_to_call, function_args = _extract_function_details(tool_call, function_mapping)
-                function_response = function_to_call(**function_args, metadata=metadata)
-                new_messages.append(
-                    {
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": json.dumps(function_response) if isinstance(function_response, dict) else function_response,
-                    }
-                )
-            except Exception as e:
-                raise FunctionExecutionError(tool_call, str(e)) from e
+        workers = _worker_count(max_workers, len(tool_calls))
+        if deadline is not None or registry.has_timeouts:
+            new_messages.extend(_execute_tool_calls_with_timeouts(tool_calls, specs, metadata, workers, deadline,
+                                                                  tracer, artifacts, usage))
+        elif workers <= 1:
+            new_messages.extend(_execute_tool_call(tool_call, specs, metadata, tracer, artifacts, usage)
+                                for tool_call in tool_calls)
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="litetoolllm-tool") as executor:
+                futures = [executor.submit(_execute_tool_call, tool_call, specs, metadata, tracer, artifacts,
+                                           usage)
+                           for tool_call in tool_calls]
+                new_messages.extend(future.result() for future in futures)
         return new_messages
 
 def _handle_tool_call_loop(kwargs, max_recursion, messages, model, raw_response, response_model,
-                           tools, metadata):
+                           tools, metadata, max_tool_workers=DEFAULT_MAX_TOOL_WORKERS, runner=None,
+                           post_format_response_model=None, post_format_model=None):
+    registry = compile_tools(tools)
+    runner = runner or CompletionRunner(model)
+    conversation = Conversation(messages)
+    messages = conversation.messages
     recursion_depth = 0
     while get_tool_calls(raw_response) is not None:
         recursion_depth += 1
         if recursion_depth and recursion_depth >= max_recursion:
             raise MaxRecursionError("Max recursion error in tool calling")
-        new_messages = handle_tool_calls(raw_response=raw_response, tools=tools, metadata=metadata)
-        messages = [*messages, *new_messages]
-        raw_response = completion(model=model, messages=messages, tools=convert_tools_to_api_format(tools),
-                                  response_format=response_model, metadata=metadata, **kwargs)
+        new_messages = handle_tool_calls(raw_response=raw_response, tools=registry, metadata=metadata,
+                                         max_workers=max_tool_workers, deadline=runner.deadline,
+                                         tracer=runner.tracer, artifacts=runner.artifacts, usage=runner.usage)
+        conversation.extend(new_messages)
+        raw_response = runner.complete(completion, model=model, messages=messages,
+                                       tools=registry.api_tools, response_format=response_model,
+                                       metadata=metadata, **kwargs)
+    if post_format_response_model:
+        request = _post_format_request(messages, raw_response, post_format_response_model,
+                                       post_format_model or model, metadata, kwargs)
+        if request is not None:
+            raw_response = runner.complete(completion, **request)
     if get_content_from_raw_response(raw_response) is not None:
-        messages.append({
+        conversation.append({
             "role": "assistant",
             "content": get_content_from_raw_response(raw_response)
         })
-    return messages, raw_response
+    # Provider message objects become plain dicts once, for the caller
+    return conversation.to_dicts(), raw_response
 
-async def handle_tool_calls_async(raw_response, tools, metadata):
-    tool_calls = get_tool_calls(raw_response)
-    if not tool_calls:
-        return []
+def _async_tool_runner(registry, metadata, executor=None, max_workers=DEFAULT_MAX_TOOL_WORKERS, deadline=None,
+                       tracer=None, artifacts=None, usage=None):
+    """
+    Build the coroutine function that executes one tool call and returns its tool message.
+
+    Sync tools share one ``max_workers`` semaphore across every call made
+    through the returned function. Tools declaring a ``ToolLimit`` first wait
+    for their scheduler lane, so queueing there counts towards their timeout.
+    Calls of ``single_flight`` tools join an identical in-flight call, from
+    any request, when there is one.
+    """
+    specs = registry.specs
+    timed = deadline is not None or registry.has_timeouts
+    sync_slots = asyncio.Semaphore(max(1, max_workers)) if max_workers is not None else None
+
+    async def run_sync_tool(spec, function_args):
+        call = functools.partial(spec.func, **function_args)
+        loop = asyncio.get_running_loop()
+        if sync_slots is None:
+            return await loop.run_in_executor(executor, call)
+        async with sync_slots:
+            return await loop.run_in_executor(executor, call)
 
-    async def execute_tool_call(tool_call, tools):
-        function_mapping = get_function_mapping(tools)
-        function_name, function_to_call, function_args = _extract_function_details(tool_call, function_mapping)
-        
-        # Check if function is async
-        function_args.pop('metadata', None)
-        if inspect.iscoroutinefunction(function_to_call):
-            result = await function_to_call(**function_args, metadata=metadata)
+    async def call_tool(spec, function_args):
+        if spec.is_async:
+            return await spec.func(**function_args)
+        return await run_sync_tool(spec, function_args)
+
+    async def call_limited_tool(spec, function_args):
+        async with spec.lane:
+            return await call_tool(spec, function_args)
+
+    async def run_tool_call(tool_call, started):
+        spec, function_args = _extract_function_details(tool_call, specs, artifacts)
+        cache_key, result = _lookup_tool_cache(spec, function_args)
+        if result is not None:
+            return _result_message(tool_call, spec, result, artifacts), True
+        key = canonical_arguments(function_args) if spec.single_flight else None
+        function_args = spec.build_kwargs(function_args, metadata)
+        run = call_tool if spec.lane is None else call_limited_tool
+        if spec.single_flight:
+            call = get_single_flight().run_async(spec.name, key, functools.partial(run, spec, function_args))
+        else:
+            call = run(spec, function_args)
+        if timed:
+            wait, from_deadline = _tool_wait(spec, deadline, started)
+            try:
+                result = await asyncio.wait_for(call, wait)
+            except asyncio.TimeoutError:
+                return _tool_timed_out(tool_call, spec, deadline, from_deadline, tracer, started, usage), None
         else:
-            result = function_to_call(**function_args, metadata=metadata)
-        
-        return {
-            "role": "tool",
-            "tool_call_id": tool_call.get("id"),
-            "content": json.dumps(result) if isinstance(result, dict) else result,
-            "name": function_name
-        }
+            result = await call
+        _store_tool_cache(spec, cache_key, result)
+        return _result_message(tool_call, spec, result, artifacts), False
+
+    async def execute_tool_call(tool_call):
+        started = time.monotonic()
+        if tracer is None and usage is None:
+            message, _ = await run_tool_call(tool_call, started)
+            return message
+        try:
+            message, cache_hit = await run_tool_call(tool_call, started)
+        except (ToolTimeoutError, DeadlineExceededError):
+            # Already recorded where the timeout was detected
+            raise
+        except Exception as e:
+            _tool_finished(tool_call, started, tracer, usage, error=e)
+            raise
+        if cache_hit is not None:
+            _tool_finished(tool_call, started, tracer, usage, cache_hit=cache_hit)
+        return message
+
+    return execute_tool_call
+
+async def _gather_or_cancel(tasks):
+    """Gather ``tasks``; if one raises (or the caller is cancelled), cancel the rest before re-raising."""
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
 
-    tasks = [execute_tool_call(tool_call, tools) for tool_call in tool_calls]
-    responses = await asyncio.gather(*tasks)
-    messages = [raw_response.choices[0].message.model_dump(), *responses]
+async def handle_tool_calls_async(raw_response, tools, metadata, executor=None,
+                                  max_workers=DEFAULT_MAX_TOOL_WORKERS, deadline=None, tracer=None, artifacts=None,
+                                  usage=None):
+    """
+    Execute the tool calls of an assistant turn concurrently on the event loop.
 
-    return messages
+    Async tools are awaited directly. Sync tools are run on ``executor`` (the
+    loop's default thread pool when None; a ``ProcessPoolExecutor`` works for
+    picklable tools and arguments) so a blocking tool never stalls the loop.
+    At most ``max_workers`` sync tools of a turn run at once; None lifts the cap.
+
+    Per-tool timeouts and the request ``deadline`` cancel the waiting call;
+    when one call raises, the other calls of the turn are cancelled.
+    """
+    tool_calls = get_tool_calls(raw_response)
+    if not tool_calls:
+        return []
+    if deadline is not None:
+        deadline.limit()
+
+    execute_tool_call = _async_tool_runner(compile_tools(tools), metadata, executor=executor,
+                                           max_workers=max_workers, deadline=deadline, tracer=tracer,
+                                           artifacts=artifacts, usage=usage)
+    responses = await _gather_or_cancel([asyncio.ensure_future(execute_tool_call(tool_call))
+                                         for tool_call in tool_calls])
+    return [raw_response.choices[0].message, *responses]
 
 async def _handle_tool_call_loop_async(kwargs, max_recursion, messages, model, raw_response, response_model,
-                           metadata, tools, post_format_response_model=None):
+                           metadata, tools, post_format_response_model=None, tool_executor=None,
+                           max_tool_workers=DEFAULT_MAX_TOOL_WORKERS, runner=None, post_format_model=None):
+    registry = compile_tools(tools)
+    runner = runner or CompletionRunner(model)
+    conversation = Conversation(messages)
+    messages = conversation.messages
     recursion_depth = 0
     while get_tool_calls(raw_response) is not None:
         recursion_depth += 1
         if recursion_depth and recursion_depth >= max_recursion:
             raise MaxRecursionError("Max recursion error in tool calling")
-        new_messages = await handle_tool_calls_async(raw_response=raw_response, tools=tools, metadata=metadata)
-        messages = [*messages, *new_messages]
-        raw_response = await acompletion(model=model, messages=messages, tools=convert_tools_to_api_format(tools),
-                                  response_format=response_model, metadata=metadata, **kwargs)
+        new_messages = await handle_tool_calls_async(raw_response=raw_response, tools=registry, metadata=metadata,
+                                                     executor=tool_executor, max_workers=max_tool_workers,
+                                                     deadline=runner.deadline, tracer=runner.tracer,
+                                                     artifacts=runner.artifacts, usage=runner.usage)
+        conversation.extend(new_messages)
+        raw_response = await runner.acomplete(acompletion, model=model, messages=messages,
+                                              tools=registry.api_tools, response_format=response_model,
+                                              metadata=metadata, **kwargs)
     if post_format_response_model:
-        structured_output_messages = [
-            *messages,
-            {"role": "assistant", "content": get_content_from_raw_response(raw_response)},
-            {"role": "system", "content": structured_output_prompt}
-        ]
-        raw_response = await acompletion(model="gemini/gemini-2.0-flash",
-                                         messages=structured_output_messages, response_format=post_format_response_model)
+        request = _post_format_request(messages, raw_response, post_format_response_model,
+                                       post_format_model or model, metadata, kwargs)
+        if request is not None:
+            raw_response = await runner.acomplete(acompletion, **request)
     if get_content_from_raw_response(raw_response) is not None:
-        messages.append({
+        conversation.append({
             "role": "assistant",
             "content": get_content_from_raw_response(raw_response)
         })
-    return messages, raw_response 
\ No newline at end of file
+    # Provider message objects become plain dicts once, for the caller
+    return conversation.to_dicts(), raw_response 
\ No newline at end of file
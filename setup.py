@@ -15,6 +15,15 @@ setup(
             "pytest-asyncio>=0.23.2",
             "numpydoc",
         ],
+        "fast": [
+            "orjson>=3.8",
+        ],
+        "otel": [
+            "opentelemetry-api>=1.20",
+        ],
+        "http2": [
+            "httpx[http2]",
+        ],
     },
     python_requires=">=3.7",
     description="LiteToolLLM - A lightweight wrapper for LLM tool calling and structured output validation",
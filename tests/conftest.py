@@ -0,0 +1,87 @@
+import os
+import json
+
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
+
+import pytest
+import litellm
+from litellm.types.utils import Delta, ModelResponseStream, StreamingChoices
+
+from litetoolllm.utils import clear_model_capability_cache
+
+
+def make_response(content=None, tool_calls=None, usage=None):
+    """Build a litellm ModelResponse; tool_calls is a list of (id, name, args) tuples."""
+    message = {"role": "assistant", "content": content}
+    if tool_calls:
+        message["tool_calls"] = [
+            {"id": call_id, "type": "function",
+             "function": {"name": name, "arguments": json.dumps(args)}}
+            for call_id, name, args in tool_calls
+        ]
+    return litellm.ModelResponse(
+        choices=[{"message": message, "finish_reason": "tool_calls" if tool_calls else "stop"}],
+        usage=usage or {"prompt_tokens": 10, "completion_tokens": 5, "total_tokens": 15},
+    )
+
+
+def make_stream(content=None, tool_calls=None, chunk_size=4):
+    """Split a response into streaming chunks the way providers deliver them."""
+    chunks = []
+    if content:
+        for start in range(0, len(content), chunk_size):
+            chunks.append(Delta(role="assistant" if start == 0 else None, content=content[start:start + chunk_size]))
+    for index, (call_id, name, args) in enumerate(tool_calls or []):
+        arguments = json.dumps(args)
+        chunks.append(Delta(role="assistant", tool_calls=[
+            {"index": index, "id": call_id, "type": "function", "function": {"name": name, "arguments": ""}}]))
+        for start in range(0, len(arguments), chunk_size):
+            chunks.append(Delta(tool_calls=[
+                {"index": index, "type": "function", "function": {"arguments": arguments[start:start + chunk_size]}}]))
+    finish_reason = "tool_calls" if tool_calls else "stop"
+    return [ModelResponseStream(choices=[StreamingChoices(delta=delta)]) for delta in chunks] + [
+        ModelResponseStream(choices=[StreamingChoices(delta=Delta(), finish_reason=finish_reason)])]
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+class ScriptedCompletion:
+    """Replays a fixed list of responses and records the kwargs of every call."""
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        # Snapshot the history: the tool loop keeps appending to the same list
+        self.calls.append({**kwargs, "messages": list(kwargs["messages"])})
+        return self.responses[len(self.calls) - 1]
+
+    async def acall(self, **kwargs):
+        response = self(**kwargs)
+        if kwargs.get("stream"):
+            return _aiter(response)
+        return response
+
+
+@pytest.fixture(autouse=True)
+def _fresh_capability_cache():
+    clear_model_capability_cache()
+    yield
+    clear_model_capability_cache()
+
+
+@pytest.fixture
+def scripted_completion(monkeypatch):
+    """Patch sync and async completion in core and utils with a scripted provider."""
+    def install(responses):
+        scripted = ScriptedCompletion(responses)
+        for module in ("litetoolllm.core", "litetoolllm.utils", "litetoolllm.streaming"):
+            monkeypatch.setattr(f"{module}.completion", scripted)
+            monkeypatch.setattr(f"{module}.acompletion", scripted.acall)
+        monkeypatch.setattr(litellm, "supports_response_schema", lambda model: True)
+        monkeypatch.setattr(litellm, "supports_function_calling", lambda model: True)
+        return scripted
+    return install
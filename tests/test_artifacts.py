@@ -0,0 +1,170 @@
+import json
+
+import pytest
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.streaming import structured_completion_stream, astructured_completion_stream
+from litetoolllm.artifacts import Artifact, ArtifactSet, InMemoryArtifactStore, MmapArtifactStore
+from litetoolllm.errors import FunctionExecutionError
+from litetoolllm.tools import Tool
+from conftest import make_response, make_stream
+
+MESSAGES = [{"role": "user", "content": "How many rows does the sales table have?"}]
+TABLE = [{"region": f"r{i}", "amount": i} for i in range(2000)]
+seen = []
+
+
+def load_table(name: str) -> list:
+    """
+    Load a table
+    :param name: str
+    :return: list
+    """
+    return TABLE
+
+
+def count_rows(table: Artifact) -> str:
+    """
+    Count the rows of a stored table
+    :param table: str
+    :return: str
+    """
+    seen.append(table)
+    return str(len(table.read()))
+
+
+def _reference(message):
+    return json.loads(message["content"])
+
+
+async def _aiter(items):
+    for item in items:
+        yield item
+
+
+class ReferencingProvider:
+    """Scripted provider that passes the artifact id it was shown on to the next tool."""
+    def __init__(self):
+        self.calls = []
+
+    def _turn(self, messages):
+        self.calls.append(list(messages))
+        turn = len(self.calls)
+        if turn == 1:
+            return dict(tool_calls=[("call_1", "load_table", {"name": "sales"})])
+        if turn == 2:
+            artifact_id = _reference(messages[-1])["artifact_id"]
+            return dict(tool_calls=[("call_2", "count_rows", {"table": artifact_id})])
+        return dict(content=messages[-1]["content"])
+
+    def __call__(self, **kwargs):
+        turn = self._turn(kwargs["messages"])
+        return make_stream(**turn) if kwargs.get("stream") else make_response(**turn)
+
+    async def acall(self, **kwargs):
+        response = self(**kwargs)
+        return _aiter(response) if kwargs.get("stream") else response
+
+
+@pytest.fixture
+def provider(scripted_completion, monkeypatch):
+    scripted_completion([])
+    fake = ReferencingProvider()
+    for module in ("litetoolllm.core", "litetoolllm.utils", "litetoolllm.streaming"):
+        monkeypatch.setattr(f"{module}.completion", fake)
+        monkeypatch.setattr(f"{module}.acompletion", fake.acall)
+    seen.clear()
+    return fake
+
+
+class TestArtifactStores:
+    def test_memory_store_keeps_the_object(self):
+        store = InMemoryArtifactStore()
+        artifact = store.put(TABLE, tool="load_table")
+        assert artifact.read() is TABLE
+        assert artifact.kind == "json"
+        assert artifact.preview.startswith('[{"region":')
+        assert store.get(artifact.id) is artifact
+
+    def test_mmap_store_round_trips(self):
+        with MmapArtifactStore() as store:
+            blob = store.put(b"\x00\x01" * 1000)
+            text = store.put("hello " * 100)
+            table = store.put(TABLE)
+            assert isinstance(blob.read(), memoryview)
+            assert blob.buffer()[:2].tobytes() == b"\x00\x01"
+            assert blob.preview == "<2000 bytes>"
+            assert text.read() == "hello " * 100
+            assert table.read() == TABLE
+            empty = store.put(b"")
+            assert bytes(empty.read()) == b""
+
+    def test_unknown_ids_are_rejected(self):
+        artifacts = ArtifactSet(InMemoryArtifactStore())
+        with pytest.raises(ValueError):
+            artifacts.resolve("art_missing")
+
+    def test_small_results_stay_inline(self):
+        artifacts = ArtifactSet(InMemoryArtifactStore())
+        assert artifacts.offload("short", threshold=100) is None
+        assert len(artifacts) == 0
+
+
+class TestArtifactsInToolLoop:
+    def test_reference_goes_to_model_and_tools_read_artifact(self, provider):
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                         tools=[Tool(load_table, artifact_threshold=1000), count_rows])
+        assert response.content == "2000"
+        reference = _reference(response.messages[2])
+        assert set(reference) == {"artifact_id", "kind", "size", "preview"}
+        assert len(response.messages[2]["content"]) < 500
+        assert seen[0].read() is TABLE
+        assert list(response.artifacts) == [reference["artifact_id"]]
+        assert response.artifacts[reference["artifact_id"]].read() is TABLE
+
+    def test_response_serializes_artifact_references(self, provider):
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                         tools=[Tool(load_table, artifact_threshold=1000), count_rows])
+        dumped = json.loads(response.model_dump_json())
+        assert dumped["artifacts"] == [_reference(response.messages[2])]
+
+    async def test_async_loop_with_mmap_store(self, provider):
+        with MmapArtifactStore() as store:
+            response = await astructured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                                    tools=[Tool(load_table, artifact_threshold=1000), count_rows],
+                                                    artifact_store=store)
+            assert response.content == "2000"
+            artifact = next(iter(response.artifacts.values()))
+            assert artifact.read() == TABLE
+            assert len(store) == 1
+
+    def test_stream_offloads_results_and_exposes_artifacts(self, provider):
+        events = list(structured_completion_stream(model="gpt-4o-mini", messages=MESSAGES,
+                                                   tools=[Tool(load_table, artifact_threshold=1000), count_rows]))
+        response = events[-1].response
+        assert response.content == "2000"
+        reference = _reference(response.messages[2])
+        assert response.artifacts[reference["artifact_id"]].read() is TABLE
+        assert seen[0].read() is TABLE
+
+    async def test_async_speculative_stream_with_mmap_store(self, provider):
+        with MmapArtifactStore() as store:
+            events = [event async for event in astructured_completion_stream(
+                model="gpt-4o-mini", messages=MESSAGES, tools=[Tool(load_table, artifact_threshold=1000), count_rows],
+                artifact_store=store, speculative_tools=True)]
+            response = events[-1].response
+            assert response.content == "2000"
+            assert next(iter(response.artifacts.values())).read() == TABLE
+            assert len(store) == 1
+
+    def test_without_artifacts_nothing_changes(self, scripted_completion):
+        scripted_completion([make_response(tool_calls=[("call_1", "load_table", {"name": "sales"})]),
+                             make_response(content="ok")])
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[load_table])
+        assert response.artifacts is None
+        assert response.messages[2]["content"] is TABLE
+
+    def test_unknown_reference_fails_the_call(self, scripted_completion):
+        scripted_completion([make_response(tool_calls=[("call_1", "count_rows", {"table": "art_nope"})])])
+        with pytest.raises(FunctionExecutionError):
+            structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[count_rows])
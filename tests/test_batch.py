@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+
+from litetoolllm.batch import abatch_structured_completion, batch_structured_completion
+from litetoolllm.core import UnifiedResponse
+
+
+class FakeProvider:
+    """Stands in for astructured_completion; the prompt encodes delay and failure."""
+    def __init__(self):
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.started = 0
+
+    async def __call__(self, *, model, messages, **kwargs):
+        self.started += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            prompt = messages[-1]["content"]
+            await asyncio.sleep(0.01 * (5 - int(prompt) % 5))
+            if int(prompt) % 7 == 3:
+                raise RuntimeError(f"provider rejected {prompt}")
+            return UnifiedResponse(content=f"{model}:{prompt}", messages=messages)
+        finally:
+            self.in_flight -= 1
+
+
+def _requests(n):
+    for i in range(n):
+        yield {"messages": [{"role": "user", "content": str(i)}]}
+
+
+@pytest.fixture
+def provider(monkeypatch):
+    fake = FakeProvider()
+    monkeypatch.setattr("litetoolllm.batch.astructured_completion", fake)
+    return fake
+
+
+class TestAsyncBatch:
+    async def test_bounded_concurrency_and_per_item_errors(self, provider):
+        results = [r async for r in abatch_structured_completion(_requests(20), concurrency=4, model="m")]
+        assert provider.max_in_flight == 4
+        assert sorted(r.index for r in results) == list(range(20))
+        failed = sorted((r for r in results if not r.ok), key=lambda r: r.index)
+        assert [r.index for r in failed] == [3, 10, 17]
+        assert str(failed[0].error) == "provider rejected 3"
+        assert all(r.response.content == f"m:{r.index}" for r in results if r.ok)
+
+    async def test_ordered_results(self, provider):
+        results = [r async for r in abatch_structured_completion(_requests(12), concurrency=3, ordered=True, model="m")]
+        assert [r.index for r in results] == list(range(12))
+
+    async def test_input_is_consumed_lazily(self, provider):
+        batch = abatch_structured_completion(_requests(10_000), concurrency=2, model="m")
+        first = await batch.__anext__()
+        await batch.aclose()
+        assert first.ok
+        assert provider.started <= 3
+
+
+class TestSyncBatch:
+    def test_sync_wrapper(self, provider):
+        results = list(batch_structured_completion(_requests(6), concurrency=2, ordered=True, model="m"))
+        assert [r.to_dict()["content"] for r in results if r.ok] == [f"m:{i}" for i in range(6) if i != 3]
+        assert results[3].to_dict()["error"] == "RuntimeError: provider rejected 3"
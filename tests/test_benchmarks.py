@@ -0,0 +1,52 @@
+import json
+
+from benchmarks import mock_provider, suite
+from litetoolllm.core import structured_completion, astructured_completion
+
+MESSAGES = [{"role": "user", "content": "hi"}]
+
+
+def lookup(key: str) -> str:
+    """
+    Look up a key
+    :param key: str
+    :return: str
+    """
+    return key.upper()
+
+
+class TestMockProvider:
+    def test_scripted_tool_turns_through_litellm(self):
+        provider = mock_provider.install(tool_turns=2, calls_per_turn=3)
+        response = structured_completion(model=mock_provider.MODEL, messages=MESSAGES, tools=[lookup])
+        assert response.content == "done"
+        assert provider.requests == 3
+        tool_messages = [m for m in response.messages if isinstance(m, dict) and m.get("role") == "tool"]
+        assert [m["content"] for m in tool_messages[:3]] == ["0-0", "0-1", "0-2"]
+
+    async def test_async_and_final_content_callable(self):
+        mock_provider.install(tool_turns=0, final_content=lambda params: json.dumps({"ok": True}))
+        response = await astructured_completion(model=mock_provider.MODEL, messages=MESSAGES)
+        assert json.loads(response.content) == {"ok": True}
+
+
+class TestSuite:
+    def test_results_are_machine_readable(self):
+        document = suite.run(["validation"], quick=True)
+        assert document["schema"] == suite.SCHEMA_VERSION
+        assert {r["params"]["items"] for r in document["results"]} == {10, 100, 1000}
+        json.dumps(document)
+
+    def test_compare_flags_regressions_in_the_bad_direction(self):
+        baseline = {"results": [
+            suite._metric("b", {"n": 1}, "latency_us", 100, "us"),
+            suite._metric("b", {"n": 1}, "throughput_rps", 100, "req/s", lower_is_better=False),
+        ]}
+        current = {"results": [
+            suite._metric("b", {"n": 1}, "latency_us", 150, "us"),
+            suite._metric("b", {"n": 1}, "throughput_rps", 150, "req/s", lower_is_better=False),
+            suite._metric("b", {"n": 2}, "latency_us", 1, "us"),
+        ]}
+        rows = suite.compare(baseline, current, threshold=0.2)
+        assert [(row["metric"], row["regressed"]) for row in rows] == [("latency_us", True),
+                                                                       ("throughput_rps", False)]
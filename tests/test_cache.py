@@ -0,0 +1,139 @@
+import time
+
+from litetoolllm.cache import InMemoryResponseCache, SQLiteResponseCache, make_cache_key
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.models import Temperature
+from litetoolllm.tools import Tool, ToolCachePolicy, get_current_weather
+from conftest import make_response
+
+
+def _request(**overrides):
+    request = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "hi"}],
+               "tools": None, "response_format": Temperature, "metadata": {"user": "a"}}
+    request.update(overrides)
+    return request
+
+
+class TestCacheKey:
+    def test_key_is_stable_and_ignores_metadata(self):
+        assert make_cache_key(_request()) == make_cache_key(_request(metadata={"user": "b"}))
+
+    def test_key_changes_with_inputs(self):
+        base = make_cache_key(_request())
+        assert base != make_cache_key(_request(model="gpt-4o"))
+        assert base != make_cache_key(_request(response_format=None))
+        assert base != make_cache_key(_request(temperature=0.2))
+
+
+class TestInMemoryResponseCache:
+    def test_lru_eviction(self):
+        cache = InMemoryResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+    def test_ttl_expiry(self):
+        cache = InMemoryResponseCache(ttl=0.05)
+        cache.set("a", 1)
+        assert cache.get("a") == 1
+        time.sleep(0.06)
+        assert cache.get("a") is None
+
+
+class TestSQLiteResponseCache:
+    def test_round_trips_model_response(self, tmp_path):
+        path = tmp_path / "responses.sqlite"
+        response = make_response(tool_calls=[("call_1", "get_current_weather", {"location": "Paris"})])
+        SQLiteResponseCache(path).set("key", response)
+        restored = SQLiteResponseCache(path).get("key")
+        assert restored.choices[0].message.tool_calls[0].function.name == "get_current_weather"
+        assert restored.usage.total_tokens == response.usage.total_tokens
+
+
+class TestCompletionCaching:
+    def test_repeated_request_is_served_from_cache(self, scripted_completion):
+        scripted = scripted_completion([make_response(content='{"location": "Paris", "temperature": "20C"}')])
+        cache = InMemoryResponseCache()
+        for _ in range(3):
+            response = structured_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Temperature in Paris?"}],
+                response_model=Temperature,
+                cache=cache,
+            )
+            assert response.content == Temperature(location="Paris", temperature="20C")
+        assert len(scripted.calls) == 1
+        assert cache.stats()["hits"] == 2
+
+    async def test_intermediate_tool_turns_are_cached(self, scripted_completion, tmp_path):
+        scripted = scripted_completion([
+            make_response(tool_calls=[("call_1", "get_current_weather", {"location": "San Francisco"})]),
+            make_response(content="68F"),
+        ])
+        cache = SQLiteResponseCache(tmp_path / "responses.sqlite")
+        for _ in range(2):
+            response = await astructured_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Weather?"}],
+                tools=[get_current_weather],
+                max_recursion=10,
+                cache=cache,
+            )
+            assert response.content == "68F"
+        assert len(scripted.calls) == 2
+        assert cache.stats() == {"hits": 2, "misses": 2, "hit_rate": 0.5}
+
+
+class TestToolResultMemoization:
+    def _counting_tool(self, policy):
+        calls = []
+
+        def lookup(sku: str, metadata: dict) -> dict:
+            """
+            Catalog lookup
+            :param sku: str
+            :return: dict
+            """
+            calls.append((sku, metadata))
+            return {"sku": sku, "price": 10}
+
+        return Tool(lookup, cache=policy), calls
+
+    def test_repeat_calls_are_served_from_tool_cache(self, scripted_completion):
+        tool, calls = self._counting_tool(ToolCachePolicy(ttl=60))
+        scripted_completion([
+            make_response(tool_calls=[("call_1", "lookup", {"sku": "A"}), ("call_2", "lookup", {"sku": "B"})]),
+            make_response(tool_calls=[("call_3", "lookup", {"sku": "A"})]),
+            make_response(content="done"),
+        ])
+        structured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Prices?"}],
+            tools=[tool],
+            max_recursion=10,
+            metadata={"request": 1},
+            max_tool_workers=1,
+        )
+        assert [sku for sku, _ in calls] == ["A", "B"]
+        assert tool.cache.stats() == {"hits": 1, "misses": 2, "hit_rate": 1 / 3}
+
+    async def test_cache_key_excludes_metadata_across_requests(self, scripted_completion):
+        tool, calls = self._counting_tool(ToolCachePolicy(key=lambda args: args["sku"].lower()))
+        for request_id, sku in enumerate(["A", "a"]):
+            scripted_completion([
+                make_response(tool_calls=[("call_1", "lookup", {"sku": sku, "metadata": "from model"})]),
+                make_response(content="done"),
+            ])
+            await astructured_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Price?"}],
+                tools=[tool],
+                max_recursion=10,
+                metadata={"request": request_id},
+            )
+        assert calls == [("A", {"request": 0})]
+        assert tool.cache.stats()["hits"] == 1
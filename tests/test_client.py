@@ -0,0 +1,63 @@
+import pytest
+
+from benchmarks.stub_server import StubServer, MODEL
+from litetoolllm.client import LiteToolClient
+from litetoolllm.cache import InMemoryResponseCache
+
+MESSAGES = [{"role": "user", "content": "Look it up"}]
+
+
+def lookup(key: str) -> str:
+    """
+    Look up a key
+    :param key: str
+    :return: str
+    """
+    return key.upper()
+
+
+@pytest.fixture
+def server():
+    with StubServer(tool_turns=1) as stub:
+        yield stub
+
+
+class TestLiteToolClient:
+    def test_tool_loops_share_pooled_connections(self, server):
+        events = []
+        with LiteToolClient(MODEL, tools=[lookup], api_base=server.base_url, api_key="stub",
+                            trace_hooks=[events.append]) as client:
+            for _ in range(3):
+                response = client.structured_completion(messages=MESSAGES)
+                assert response.content == "done"
+        assert server.requests == 6
+        assert server.connections == 1
+        assert [e.type for e in events].count("tool_call") == 3
+
+    async def test_async_calls_use_the_async_pool(self, server):
+        async with LiteToolClient(MODEL, tools=[lookup], api_base=server.base_url, api_key="stub") as client:
+            for _ in range(3):
+                response = await client.astructured_completion(messages=MESSAGES)
+                assert response.usage.turns == 2
+        assert server.connections == 1
+
+    def test_call_arguments_override_defaults(self, server):
+        cache = InMemoryResponseCache()
+        per_call = []
+        with LiteToolClient(MODEL, tools=[lookup], api_base=server.base_url, api_key="stub", cache=cache,
+                            trace_hooks=[lambda event: None]) as client:
+            client.structured_completion(messages=MESSAGES)
+            client.structured_completion(messages=MESSAGES, trace_hooks=[per_call.append])
+        assert cache.stats()["hits"] == 2
+        assert [e.type for e in per_call] == ["llm_call", "tool_call", "llm_call"]
+        assert server.requests == 2
+
+    def test_other_providers_keep_litellm_transport(self):
+        client = LiteToolClient("anthropic/claude-3-5-sonnet-20240620", api_key="x")
+        request = client._request({}, is_async=False)
+        assert "client" not in request
+        assert request["tools"] is None
+
+    def test_model_is_required(self):
+        with pytest.raises(ValueError):
+            LiteToolClient().structured_completion(messages=MESSAGES)
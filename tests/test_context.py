@@ -0,0 +1,109 @@
+import pytest
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.context import ContextBudget, ContextWindow, count_tokens, trim_text
+from litetoolllm.tools import Tool
+from conftest import make_response
+
+MESSAGES = [{"role": "user", "content": "Read all the reports"}]
+REPORT = " ".join(f"line {i} of the quarterly report." for i in range(400))
+
+
+def read_report(name: str) -> str:
+    """
+    Read a report
+    :param name: str
+    :return: str
+    """
+    return f"{name}: {REPORT}"
+
+
+def _three_reports():
+    return [
+        make_response(tool_calls=[("call_1", "read_report", {"name": "q1"})]),
+        make_response(tool_calls=[("call_2", "read_report", {"name": "q2"})]),
+        make_response(tool_calls=[("call_3", "read_report", {"name": "q3"})]),
+        make_response(content="done"),
+    ]
+
+
+def _tool_contents(messages):
+    return {m["tool_call_id"]: m["content"] for m in messages if isinstance(m, dict) and m.get("role") == "tool"}
+
+
+class TestTrimText:
+    def test_head_tail_keeps_both_ends(self):
+        trimmed = trim_text(REPORT, 50)
+        assert trimmed.startswith("line 0 of")
+        assert trimmed.endswith("line 399 of the quarterly report.")
+        assert "tokens omitted" in trimmed
+        assert count_tokens(trimmed) < 80
+
+    def test_truncate_keeps_the_start(self):
+        trimmed = trim_text(REPORT, 50, strategy="truncate")
+        assert trimmed.startswith("line 0 of")
+        assert "line 399" not in trimmed
+
+    def test_short_text_is_unchanged(self):
+        assert trim_text("short", 50) == "short"
+
+
+class TestContextBudget:
+    def test_old_tool_outputs_are_compacted_newest_turn_kept(self, scripted_completion):
+        scripted = scripted_completion(_three_reports())
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[read_report],
+                                         max_recursion=5, context_budget=ContextBudget(max_tokens=3000))
+        assert response.content == "done"
+        last_sent = _tool_contents(scripted.calls[-1]["messages"])
+        assert "tokens omitted" in last_sent["call_1"]
+        assert "tokens omitted" in last_sent["call_2"]
+        assert last_sent["call_3"] == read_report("q3")
+        # The returned history and the earlier requests keep full outputs
+        assert _tool_contents(response.messages)["call_1"] == read_report("q1")
+        assert _tool_contents(scripted.calls[1]["messages"])["call_1"] == read_report("q1")
+
+    def test_compacted_prefix_is_stable_across_turns(self, scripted_completion):
+        scripted = scripted_completion(_three_reports())
+        structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[read_report], max_recursion=5,
+                              context_budget=ContextBudget(max_tokens=1500))
+        third, fourth = (_tool_contents(call["messages"]) for call in scripted.calls[2:])
+        assert third["call_1"] == fourth["call_1"]
+
+    async def test_summarize_strategy_async(self, scripted_completion):
+        scripted = scripted_completion(_three_reports())
+        budget = ContextBudget(max_tokens=1500, strategy="summarize", summarizer=lambda text: text[:10] + " (summary)")
+        await astructured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[read_report],
+                                     max_recursion=5, context_budget=budget)
+        assert _tool_contents(scripted.calls[-1]["messages"])["call_1"] == "q1: line 0 (summary)"
+
+    def test_under_budget_sends_history_unchanged(self):
+        window = ContextWindow(ContextBudget(max_tokens=100_000), "gpt-4o-mini")
+        messages = [*MESSAGES, {"role": "assistant", "content": "ok"}]
+        assert window.fit(messages) is messages
+        assert window.compacted == 0
+
+    def test_window_counts_savings(self):
+        window = ContextWindow(ContextBudget(max_tokens=500), "gpt-4o-mini")
+        messages = [*MESSAGES, {"role": "tool", "tool_call_id": "a", "content": REPORT},
+                    {"role": "assistant", "content": "summary please"}]
+        fitted = window.fit(messages)
+        assert fitted is not messages
+        assert window.compacted == 1 and window.tokens_saved > 1000
+
+    def test_invalid_configuration(self):
+        with pytest.raises(ValueError):
+            ContextBudget(max_tokens=10, strategy="drop")
+        with pytest.raises(ValueError):
+            ContextBudget(max_tokens=10, strategy="summarize")
+
+
+class TestResultSizeLimit:
+    def test_large_results_are_trimmed_per_tool(self, scripted_completion):
+        scripted_completion([make_response(tool_calls=[("call_1", "read_report", {"name": "q1"})]),
+                             make_response(content="done")])
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                         tools=[Tool(read_report, max_result_tokens=100)])
+        content = _tool_contents(response.messages)["call_1"]
+        assert content.startswith("q1: line 0")
+        assert "tokens omitted" in content
+        assert count_tokens(content) < 150
@@ -0,0 +1,54 @@
+import json
+
+import litellm
+
+from litetoolllm.conversation import Conversation
+from litetoolllm.core import structured_completion, astructured_completion, UnifiedResponse
+from litetoolllm.tools import get_current_weather, aget_current_weather
+from conftest import make_response
+
+
+def _script():
+    return [
+        make_response(tool_calls=[("call_1", "get_current_weather", {"location": "Paris"})]),
+        make_response(tool_calls=[("call_2", "get_current_weather", {"location": "Rome"})]),
+        make_response(content="done"),
+    ]
+
+
+class TestConversation:
+    def test_to_dicts_serializes_provider_messages_lazily(self):
+        message = make_response(content="hi").choices[0].message
+        conversation = Conversation([{"role": "user", "content": "hello"}])
+        conversation.append(message)
+        assert conversation[-1] is message
+        assert conversation.to_dicts()[-1]["content"] == "hi"
+
+    def test_loop_does_not_mutate_caller_messages(self, scripted_completion):
+        scripted = scripted_completion(_script())
+        messages = [{"role": "user", "content": "Weather?"}]
+        response = structured_completion(model="gpt-4o-mini", messages=messages,
+                                         tools=[get_current_weather], max_recursion=10)
+        assert messages == [{"role": "user", "content": "Weather?"}]
+        assert len(response.messages) == 6
+        assert [len(call["messages"]) for call in scripted.calls] == [1, 3, 5]
+
+    async def test_async_loop_returns_plain_dicts(self, scripted_completion):
+        scripted = scripted_completion([
+            make_response(tool_calls=[("call_1", "aget_current_weather", {"location": "Paris"})]),
+            make_response(content="done"),
+        ])
+        response = await astructured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+                                                tools=[aget_current_weather], max_recursion=10)
+        assert isinstance(response, UnifiedResponse)
+        # Provider objects are kept while the loop runs and converted once at the end
+        assert isinstance(scripted.calls[1]["messages"][1], litellm.Message)
+        assert all(isinstance(message, dict) for message in response.messages)
+        assert json.loads(json.dumps(response.messages))[1]["tool_calls"][0]["id"] == "call_1"
+        assert response.messages[-1] == {"role": "assistant", "content": "done"}
+
+    def test_sync_loop_returns_plain_dicts(self, scripted_completion):
+        scripted_completion(_script())
+        response = structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+                                         tools=[get_current_weather], max_recursion=10)
+        assert json.loads(json.dumps(response.messages))[3]["tool_calls"][0]["id"] == "call_2"
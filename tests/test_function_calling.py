@@ -4,7 +4,8 @@ import pytest
 import litellm
 
 from litetoolllm.errors import ModelCapabilityError, StructuredValidationError
-from litetoolllm.core import structured_completion
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.utils import get_model_capabilities, clear_model_capability_cache
 from litetoolllm.models import Temperature, Temperatures
 from litetoolllm.tools import get_current_weather, convert_fahrenheit_to_celsius
 class TestFunctionCalling:
@@ -109,6 +110,32 @@ class TestErrorHandling:
                 tools=[get_current_weather]
             )
 
+    async def test_async_model_without_tool_support_raises_error(self, monkeypatch):
+        """Verify astructured_completion validates capabilities too"""
+        monkeypatch.setattr(litellm, "supports_function_calling", lambda model: False)
+
+        with pytest.raises(ModelCapabilityError):
+            await astructured_completion(
+                model="non-tool-model",
+                messages=[{"role": "user", "content": "Execute tool call."}],
+                tools=[get_current_weather]
+            )
+
+class TestCapabilityCache:
+    def test_capabilities_are_cached_per_model(self, monkeypatch):
+        """Verify litellm's model map is only consulted once per model"""
+        lookups = []
+        monkeypatch.setattr(litellm, "supports_response_schema", lambda model: lookups.append(model) or True)
+        monkeypatch.setattr(litellm, "supports_function_calling", lambda model: True)
+
+        for _ in range(3):
+            assert get_model_capabilities("cached-model") == {"json_mode": True, "function_calling": True}
+        assert lookups == ["cached-model"]
+
+        clear_model_capability_cache("cached-model")
+        get_model_capabilities("cached-model")
+        assert lookups == ["cached-model", "cached-model"]
+
 class TestValidation:
     def test_invalid_response_structure(self, monkeypatch):
         """Test handling of malformed model responses"""
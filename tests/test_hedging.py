@@ -0,0 +1,122 @@
+import time
+import asyncio
+
+import pytest
+
+import litetoolllm.core
+import litetoolllm.utils
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.hedging import HedgePolicy
+from conftest import make_response
+
+MESSAGES = [{"role": "user", "content": "Weather in Paris?"}]
+
+
+class FakeDeployments:
+    """Provider stand-in whose latency depends on the requested model."""
+    def __init__(self, latencies, responses, fail=()):
+        self.latencies = latencies
+        self.responses = responses
+        self.fail = set(fail)
+        self.calls = []
+        self.cancelled = []
+
+    def _respond(self, model, turn):
+        if model in self.fail:
+            raise RuntimeError(f"{model} unavailable")
+        return self.responses[turn]
+
+    def __call__(self, **kwargs):
+        model = kwargs["model"]
+        turn = sum(1 for m, _ in self.calls if m == model)
+        self.calls.append((model, turn))
+        time.sleep(self.latencies.get(model, 0))
+        return self._respond(model, turn)
+
+    async def acall(self, **kwargs):
+        model = kwargs["model"]
+        turn = sum(1 for m, _ in self.calls if m == model)
+        self.calls.append((model, turn))
+        try:
+            await asyncio.sleep(self.latencies.get(model, 0))
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return self._respond(model, turn)
+
+
+@pytest.fixture
+def deployments(monkeypatch):
+    def install(latencies, responses, fail=()):
+        fake = FakeDeployments(latencies, responses, fail)
+        for module in (litetoolllm.core, litetoolllm.utils):
+            monkeypatch.setattr(module, "completion", fake)
+            monkeypatch.setattr(module, "acompletion", fake.acall)
+        return fake
+    return install
+
+
+class TestHedgePolicy:
+    async def test_hedge_wins_and_primary_is_cancelled(self, deployments):
+        fake = deployments({"gpt-4o-mini": 5, "gpt-4o": 0}, [make_response(content="hedged")])
+        policy = HedgePolicy(delay=0.02, models=["gpt-4o"])
+        started = time.monotonic()
+        response = await astructured_completion(model="gpt-4o-mini", messages=MESSAGES, hedge=policy)
+        assert time.monotonic() - started < 1
+        assert response.content == "hedged"
+        assert fake.cancelled == ["gpt-4o-mini"]
+        assert policy.stats()["hedge_wins"] == 1
+        assert policy.stats()["hedge_win_rate"] == 1.0
+
+    async def test_fast_primary_is_not_hedged(self, deployments):
+        fake = deployments({"gpt-4o-mini": 0}, [make_response(content="primary")])
+        policy = HedgePolicy(delay=1, models=["gpt-4o"])
+        response = await astructured_completion(model="gpt-4o-mini", messages=MESSAGES, hedge=policy)
+        assert response.content == "primary"
+        assert [model for model, _ in fake.calls] == ["gpt-4o-mini"]
+        assert policy.stats()["hedged"] == 0
+
+    def test_failed_primary_falls_back_to_hedge(self, deployments):
+        deployments({}, [make_response(content="backup")], fail={"gpt-4o-mini"})
+        policy = HedgePolicy(delay=5, models=["gpt-4o"])
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, hedge=policy)
+        assert response.content == "backup"
+
+    def test_all_attempts_failing_raises(self, deployments):
+        deployments({}, [make_response(content="never")], fail={"gpt-4o-mini", "gpt-4o"})
+        with pytest.raises(RuntimeError):
+            structured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                  hedge=HedgePolicy(delay=0.01, models=["gpt-4o"]))
+
+    def test_adaptive_delay_uses_latency_percentile(self):
+        policy = HedgePolicy(min_samples=10, initial_delay=3.0)
+        assert policy.current_delay() == 3.0
+        for latency in range(1, 21):
+            policy._record(latency / 10, winner=0, launched=1)
+        assert policy.current_delay() == 2.0
+
+
+class TestHedgingInToolLoop:
+    def test_tools_run_once_per_turn(self, deployments):
+        calls = []
+
+        def lookup(location: str) -> str:
+            """
+            Look up the weather
+            :param location: str
+            :return: str
+            """
+            calls.append(location)
+            return "20C"
+
+        responses = [
+            make_response(tool_calls=[("call_1", "lookup", {"location": "Paris"})]),
+            make_response(content="It is 20C"),
+        ]
+        # Both deployments answer every turn; the slow primary loses each race
+        deployments({"gpt-4o-mini": 0.3, "gpt-4o": 0}, responses)
+        policy = HedgePolicy(delay=0.01, models=["gpt-4o"])
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[lookup], hedge=policy)
+        assert response.content == "It is 20C"
+        assert calls == ["Paris"]
+        assert policy.stats()["requests"] == 2
@@ -0,0 +1,117 @@
+import pytest
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.streaming import structured_completion_stream
+from litetoolllm.cache import InMemoryResponseCache
+from litetoolllm.instrumentation import (
+    add_trace_hook,
+    remove_trace_hook,
+    make_tracer,
+    OpenTelemetryHook,
+)
+from litetoolllm.tools import get_current_weather
+from conftest import make_response, make_stream
+
+MESSAGES = [{"role": "user", "content": "Weather in San Francisco?"}]
+
+
+def _tool_then_answer():
+    return [
+        make_response(tool_calls=[("call_1", "get_current_weather", {"location": "San Francisco"})],
+                      usage={"prompt_tokens": 100, "completion_tokens": 10, "total_tokens": 110,
+                             "prompt_tokens_details": {"cached_tokens": 64}}),
+        make_response(content="It is 68F"),
+    ]
+
+
+class TestTraceEvents:
+    def test_llm_and_tool_events_are_correlated(self, scripted_completion):
+        scripted_completion(_tool_then_answer())
+        events = []
+        structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[get_current_weather],
+                              metadata={"request_id": "req-42", "user": "u1"}, trace_hooks=[events.append])
+        assert [(e.type, e.iteration) for e in events] == [("llm_call", 0), ("tool_call", 0), ("llm_call", 1)]
+        assert {e.request_id for e in events} == {"req-42"}
+        assert events[0].metadata == {"request_id": "req-42", "user": "u1"}
+        assert events[0].name == "gpt-4o-mini"
+        assert events[0].usage["prompt_tokens"] == 100
+        assert events[0].usage["cached_tokens"] == 64
+        tool_event = events[1]
+        assert tool_event.name == "get_current_weather"
+        assert tool_event.tool_call_id == "call_1"
+        assert tool_event.arguments_size == len('{"location": "San Francisco"}')
+        assert tool_event.duration >= 0 and tool_event.error is None
+
+    async def test_async_tool_errors_are_traced(self, scripted_completion):
+        def broken(location: str) -> str:
+            """
+            Always fails
+            :param location: str
+            :return: str
+            """
+            raise RuntimeError("backend down")
+
+        scripted_completion([make_response(tool_calls=[("call_1", "broken", {"location": "Paris"})])])
+        events = []
+        with pytest.raises(RuntimeError):
+            await astructured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[broken],
+                                         trace_hooks=[events.append])
+        assert events[-1].type == "tool_call"
+        assert events[-1].error == "RuntimeError: backend down"
+
+    def test_response_cache_hits_are_flagged(self, scripted_completion):
+        scripted_completion([make_response(content="hi")])
+        cache = InMemoryResponseCache()
+        events = []
+        for _ in range(2):
+            structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}],
+                                  cache=cache, trace_hooks=[events.append])
+        assert [e.cache_hit for e in events] == [False, True]
+
+    def test_stream_reports_time_to_first_token(self, scripted_completion):
+        scripted_completion([make_stream(content="hello there")])
+        events = []
+        list(structured_completion_stream(model="gpt-4o-mini", messages=MESSAGES, trace_hooks=[events.append]))
+        assert events[0].type == "llm_call"
+        assert 0 <= events[0].time_to_first_token <= events[0].duration
+
+    def test_global_hooks_and_failing_hooks(self, scripted_completion, capsys):
+        scripted_completion(_tool_then_answer())
+        events = []
+
+        def broken_hook(event):
+            raise ValueError("hook bug")
+
+        add_trace_hook(events.append)
+        try:
+            response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[get_current_weather],
+                                             trace_hooks=[broken_hook])
+        finally:
+            remove_trace_hook(events.append)
+        assert response.content == "It is 68F"
+        assert len(events) == 3
+        assert capsys.readouterr().out == ""
+
+    def test_tracing_is_off_without_hooks(self):
+        assert make_tracer(None, metadata={"request_id": "x"}) is None
+
+
+class TestOpenTelemetryHook:
+    def test_events_become_spans(self, scripted_completion):
+        pytest.importorskip("opentelemetry.sdk")
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+        from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        scripted_completion(_tool_then_answer())
+        structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[get_current_weather],
+                              metadata={"request_id": "req-7"}, trace_hooks=[OpenTelemetryHook(provider)])
+        spans = exporter.get_finished_spans()
+        assert [span.name for span in spans] == ["chat gpt-4o-mini", "execute_tool get_current_weather",
+                                                 "chat gpt-4o-mini"]
+        assert spans[0].attributes["gen_ai.usage.input_tokens"] == 100
+        assert spans[1].attributes["gen_ai.tool.name"] == "get_current_weather"
+        assert {span.attributes["litetoolllm.request_id"] for span in spans} == {"req-7"}
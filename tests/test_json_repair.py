@@ -0,0 +1,100 @@
+import pytest
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.errors import StructuredValidationError
+from litetoolllm.json_repair import repair_json, repair_structured_content
+from litetoolllm.models import Temperature, Temperatures
+from litetoolllm.tools import get_current_weather
+from conftest import make_response
+
+
+class TestRepairJson:
+    @pytest.mark.parametrize("text, expected", [
+        ('```json\n{"a": 1}\n```', {"a": 1}),
+        ('Sure! Here it is: {"a": {"b": "}"}} Hope that helps.', {"a": {"b": "}"}}),
+        ('{"a": [1, 2,], "b": 3,}', {"a": [1, 2], "b": 3}),
+        ("{'a': 'it\\'s', 'b': True, 'c': None}", {"a": "it's", "b": True, "c": None}),
+        ('{"a": [{"b": "done"}, true', {"a": [{"b": "done"}, True]}),
+    ])
+    def test_repairs_common_slips(self, text, expected):
+        assert repair_json(text) == expected
+
+    @pytest.mark.parametrize("text", [
+        '{"a": [{"b": "trunc',
+        "{'a': 'trunc",
+        '{"a": [1, 2',
+        '{"a": [1, 2,',
+        '{"a": {"b": "c"}, "d":',
+    ])
+    def test_truncated_values_are_not_completed(self, text):
+        with pytest.raises(ValueError):
+            repair_json(text)
+
+    def test_unrepairable_raises(self):
+        with pytest.raises(ValueError):
+            repair_json("no json here")
+
+
+class TestSchemaCoercion:
+    def test_scalars_coerced_to_strings(self):
+        assert repair_structured_content('{"location": "Paris", "temperature": 20}', Temperature) == \
+            Temperature(location="Paris", temperature="20")
+
+    def test_truncated_string_value_raises(self):
+        content = ('{"temperatures": [{"location": "SF", "temperature": "68"}, '
+                   '{"location": "NY", "temperature": "7')
+        with pytest.raises(ValueError):
+            repair_structured_content(content, Temperatures)
+        with pytest.raises(ValueError):
+            repair_structured_content(content, Temperature)
+
+    def test_wrapper_objects_are_unwrapped(self):
+        content = '```\n{"result": {"temperatures": [{"location": "Paris", "temperature": 20.5}]}}\n```'
+        assert repair_structured_content(content, Temperatures).temperatures[0].temperature == "20.5"
+
+
+class TestRepairInCompletion:
+    def test_local_repair_avoids_error(self, scripted_completion):
+        scripted = scripted_completion([
+            make_response(content='Here you go:\n```json\n{"location": "Paris", "temperature": "20C",}\n```'),
+        ])
+        response = structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "Paris?"}],
+                                         response_model=Temperature)
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        assert len(scripted.calls) == 1
+
+    async def test_single_reask_after_failed_repair(self, scripted_completion):
+        scripted = scripted_completion([
+            make_response(content='{"location": "Paris"}'),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        response = await astructured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "Paris?"}],
+                                                response_model=Temperature, reask_on_validation_error=True)
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        reask = scripted.calls[1]
+        assert reask["messages"][-1]["role"] == "user"
+        assert "temperature" in reask["messages"][-1]["content"]
+        assert reask["tools"] is None and "tool_choice" not in reask
+        assert len(response.messages) == 4
+
+    def test_reask_after_tool_loop_keeps_tool_definitions(self, scripted_completion):
+        scripted = scripted_completion([
+            make_response(tool_calls=[("call_1", "get_current_weather", {"location": "Paris"})]),
+            make_response(content='{"location": "Paris"}'),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        response = structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "Paris?"}],
+                                         response_model=Temperature, tools=[get_current_weather],
+                                         reask_on_validation_error=True, temperature=0)
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        reask = scripted.calls[2]
+        assert reask["tools"] == scripted.calls[0]["tools"]
+        assert reask["tool_choice"] == "none"
+        assert reask["temperature"] == 0
+        assert reask["messages"][2]["role"] == "tool"
+
+    def test_reask_failure_raises(self, scripted_completion):
+        scripted_completion([make_response(content="nope"), make_response(content="still nope")])
+        with pytest.raises(StructuredValidationError):
+            structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "Paris?"}],
+                                  response_model=Temperature, reask_on_validation_error=True)
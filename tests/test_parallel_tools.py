@@ -0,0 +1,160 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.errors import FunctionExecutionError
+from conftest import make_response
+
+
+def slow_lookup(location: str, metadata: dict) -> dict:
+    """
+    Slow I/O-bound lookup
+    :param location: str
+    :return: dict
+    """
+    time.sleep(0.2)
+    return {"location": location, "thread": threading.current_thread().name}
+
+
+def failing_lookup(location: str) -> dict:
+    """
+    Always fails
+    :param location: str
+    :return: dict
+    """
+    raise RuntimeError(f"backend down for {location}")
+
+
+def _parallel_script(names):
+    return [
+        make_response(tool_calls=[(f"call_{i}", name, {"location": f"city {i}"}) for i, name in enumerate(names)]),
+        make_response(content="done"),
+    ]
+
+
+class TestSyncParallelToolExecution:
+    def test_tool_calls_run_concurrently_and_keep_order(self, scripted_completion):
+        scripted = scripted_completion(_parallel_script(["slow_lookup"] * 5))
+        start = time.perf_counter()
+        structured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[slow_lookup],
+            max_recursion=10,
+        )
+        elapsed = time.perf_counter() - start
+        tool_messages = [m for m in scripted.calls[1]["messages"] if isinstance(m, dict) and m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == [f"call_{i}" for i in range(5)]
+        assert elapsed < 0.6
+
+    def test_parallel_execution_can_be_disabled(self, scripted_completion):
+        scripted = scripted_completion(_parallel_script(["slow_lookup"] * 2))
+        structured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[slow_lookup],
+            max_recursion=10,
+            max_tool_workers=1,
+        )
+        tool_messages = [m for m in scripted.calls[1]["messages"] if isinstance(m, dict) and m.get("role") == "tool"]
+        assert all(threading.main_thread().name in m["content"] for m in tool_messages)
+        assert "max_tool_workers" not in scripted.calls[0]
+
+    def test_no_worker_cap_matches_the_async_path(self, scripted_completion):
+        scripted_completion(_parallel_script(["slow_lookup"] * 4))
+        start = time.perf_counter()
+        structured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[slow_lookup],
+            max_tool_workers=None,
+        )
+        assert time.perf_counter() - start < 0.6
+
+    def test_tool_error_surfaces(self, scripted_completion):
+        scripted_completion(_parallel_script(["slow_lookup", "failing_lookup", "slow_lookup"]))
+        with pytest.raises(FunctionExecutionError, match="backend down for city 1"):
+            structured_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Weather?"}],
+                tools=[slow_lookup, failing_lookup],
+                max_recursion=10,
+            )
+
+
+async def aslow_lookup(location: str) -> dict:
+    """
+    Slow async lookup
+    :param location: str
+    :return: dict
+    """
+    await asyncio.sleep(0.2)
+    return {"location": location}
+
+
+class TestAsyncSyncToolOffload:
+    async def test_blocking_tool_does_not_stall_event_loop(self, scripted_completion):
+        scripted_completion(_parallel_script(["slow_lookup"]))
+        ticks = 0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal ticks
+            while not done.is_set():
+                ticks += 1
+                await asyncio.sleep(0.01)
+
+        ticker_task = asyncio.create_task(ticker())
+        await astructured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[slow_lookup],
+            max_recursion=10,
+        )
+        done.set()
+        await ticker_task
+        assert ticks >= 5
+
+    async def test_mixed_sync_and_async_tools_overlap(self, scripted_completion):
+        scripted = scripted_completion(_parallel_script(["slow_lookup", "aslow_lookup", "slow_lookup"]))
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            await astructured_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Weather?"}],
+                tools=[slow_lookup, aslow_lookup],
+                max_recursion=10,
+                tool_executor=executor,
+            )
+        assert time.perf_counter() - start < 0.4
+        tool_messages = [m for m in scripted.calls[1]["messages"] if isinstance(m, dict) and m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_0", "call_1", "call_2"]
+
+    async def test_no_worker_cap(self, scripted_completion):
+        scripted_completion(_parallel_script(["slow_lookup"] * 4))
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            start = time.perf_counter()
+            await astructured_completion(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Weather?"}],
+                tools=[slow_lookup],
+                max_tool_workers=None,
+                tool_executor=executor,
+            )
+        assert time.perf_counter() - start < 0.6
+
+    async def test_sync_tool_concurrency_cap(self, scripted_completion):
+        scripted_completion(_parallel_script(["slow_lookup"] * 4))
+        start = time.perf_counter()
+        await astructured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[slow_lookup],
+            max_recursion=10,
+            max_tool_workers=2,
+        )
+        assert time.perf_counter() - start >= 0.4
@@ -0,0 +1,76 @@
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.models import Temperature
+from litetoolllm.tools import get_current_weather
+from conftest import make_response
+
+MESSAGES = [{"role": "user", "content": "Weather in Paris?"}]
+
+
+def _tool_turn():
+    return make_response(tool_calls=[("call_1", "get_current_weather", {"location": "Paris"})])
+
+
+class TestGeminiPostFormat:
+    def test_valid_final_answer_skips_format_call(self, scripted_completion):
+        scripted = scripted_completion([
+            _tool_turn(),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        response = structured_completion(model="gemini/gemini-2.0-flash", messages=MESSAGES,
+                                         response_model=Temperature, tools=[get_current_weather])
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        assert len(scripted.calls) == 2
+        # The tool loop runs without a response schema
+        assert all(call["response_format"] is None for call in scripted.calls)
+
+    def test_invalid_final_answer_is_reformatted(self, scripted_completion):
+        scripted = scripted_completion([
+            _tool_turn(),
+            make_response(content="It is 20C in Paris."),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        response = structured_completion(model="gemini/gemini-1.5-pro", messages=MESSAGES,
+                                         response_model=Temperature, tools=[get_current_weather], timeout=7)
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        format_call = scripted.calls[-1]
+        assert format_call["model"] == "gemini/gemini-1.5-pro"
+        assert format_call["response_format"] is Temperature
+        assert format_call["timeout"] == 7
+        assert format_call["messages"][-2] == {"role": "assistant", "content": "It is 20C in Paris."}
+
+    async def test_async_format_model_is_configurable(self, scripted_completion):
+        scripted = scripted_completion([
+            _tool_turn(),
+            make_response(content="It is 20C in Paris."),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        response = await astructured_completion(model="gemini/gemini-1.5-pro", messages=MESSAGES,
+                                                response_model=Temperature, tools=[get_current_weather],
+                                                post_format_model="gemini/gemini-2.0-flash")
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        assert scripted.calls[-1]["model"] == "gemini/gemini-2.0-flash"
+
+    def test_reask_sends_tools_without_the_response_schema(self, scripted_completion):
+        scripted = scripted_completion([
+            _tool_turn(),
+            make_response(content="It is 20C in Paris."),
+            make_response(content='{"location": "Paris"}'),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        response = structured_completion(model="gemini/gemini-1.5-pro", messages=MESSAGES,
+                                         response_model=Temperature, tools=[get_current_weather],
+                                         reask_on_validation_error=True)
+        assert response.content == Temperature(location="Paris", temperature="20C")
+        reask = scripted.calls[-1]
+        assert reask["response_format"] is None
+        assert reask["tools"] == scripted.calls[0]["tools"]
+        assert reask["tool_choice"] == "none"
+
+    def test_other_models_keep_the_response_schema(self, scripted_completion):
+        scripted = scripted_completion([
+            _tool_turn(),
+            make_response(content='{"location": "Paris", "temperature": "20C"}'),
+        ])
+        structured_completion(model="gpt-4o-mini", messages=MESSAGES, response_model=Temperature,
+                              tools=[get_current_weather])
+        assert all(call["response_format"] is Temperature for call in scripted.calls)
@@ -0,0 +1,68 @@
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.prompt_cache import mark_cacheable_prefix, CACHE_CONTROL
+from litetoolllm.tools import get_current_weather
+from conftest import make_response
+
+CACHED_USAGE = {"prompt_tokens": 1000, "completion_tokens": 5, "total_tokens": 1005,
+                "prompt_tokens_details": {"cached_tokens": 900}}
+
+
+def _script():
+    return [
+        make_response(tool_calls=[("call_1", "get_current_weather", {"location": "Paris"})]),
+        make_response(content="done", usage=CACHED_USAGE),
+    ]
+
+
+MESSAGES = [
+    {"role": "system", "content": "You are a weather bot."},
+    {"role": "user", "content": "Weather?"},
+]
+
+
+class TestMarkCacheablePrefix:
+    def test_marks_system_and_last_message_without_mutating(self):
+        messages = [*MESSAGES, {"role": "tool", "tool_call_id": "c", "content": "sunny"}]
+        marked = mark_cacheable_prefix(messages)
+        assert marked[0]["content"][0]["cache_control"] == CACHE_CONTROL
+        assert marked[1] is messages[1]
+        assert marked[2]["content"] == [{"type": "text", "text": "sunny", "cache_control": CACHE_CONTROL}]
+        assert messages[2]["content"] == "sunny"
+
+
+class TestPromptCaching:
+    def test_anthropic_requests_carry_cache_markers(self, scripted_completion):
+        scripted = scripted_completion(_script())
+        response = structured_completion(
+            model="anthropic/claude-3-5-sonnet-20240620",
+            messages=MESSAGES,
+            tools=[get_current_weather],
+            max_recursion=10,
+            prompt_caching=True,
+        )
+        for call in scripted.calls:
+            assert call["tools"][-1]["cache_control"] == CACHE_CONTROL
+            assert call["messages"][0]["content"][0]["cache_control"] == CACHE_CONTROL
+        assert scripted.calls[1]["messages"][-1]["content"][0]["cache_control"] == CACHE_CONTROL
+        assert isinstance(response.messages[0]["content"], str)
+        assert response.prompt_cache_usage[1] == {"prompt_tokens": 1000, "cached_tokens": 900,
+                                                  "uncached_tokens": 100, "cache_creation_tokens": 0}
+
+    async def test_automatic_caching_providers_only_report_usage(self, scripted_completion):
+        scripted = scripted_completion(_script())
+        response = await astructured_completion(
+            model="gpt-4o-mini",
+            messages=MESSAGES,
+            tools=[get_current_weather],
+            max_recursion=10,
+            prompt_caching=True,
+        )
+        assert "cache_control" not in scripted.calls[0]["tools"][-1]
+        assert scripted.calls[0]["messages"][0]["content"] == "You are a weather bot."
+        assert [usage["cached_tokens"] for usage in response.prompt_cache_usage] == [0, 900]
+
+    def test_disabled_by_default(self, scripted_completion):
+        scripted_completion(_script())
+        response = structured_completion(model="anthropic/claude-3-5-sonnet-20240620", messages=MESSAGES,
+                                         tools=[get_current_weather], max_recursion=10)
+        assert response.prompt_cache_usage is None
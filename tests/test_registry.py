@@ -0,0 +1,91 @@
+import litellm.utils
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.registry import compile_tools, clear_tool_registry_cache, convert_tools_to_api_format
+from litetoolllm.tools import Tool, get_current_weather, aget_current_weather, convert_fahrenheit_to_celsius
+from conftest import make_response
+
+
+class TestToolRegistry:
+    def setup_method(self):
+        clear_tool_registry_cache()
+
+    def test_registry_matches_convert_tools_to_api_format(self):
+        tools = [get_current_weather, Tool(convert_fahrenheit_to_celsius, name="to_celsius"), {"googleSearch": {}}]
+        registry = compile_tools(tools)
+        assert registry.api_tools == convert_tools_to_api_format(tools)
+        assert set(registry.function_mapping) == {"get_current_weather", "to_celsius"}
+        assert registry.specs["to_celsius"].schema["function"]["name"] == "to_celsius"
+
+    def test_registry_is_cached_by_tool_identity(self):
+        tool = Tool(get_current_weather)
+        assert compile_tools([tool]) is compile_tools([tool])
+        assert compile_tools([tool]) is not compile_tools([Tool(get_current_weather)])
+        assert compile_tools(compile_tools([tool])) is compile_tools([tool])
+
+    def test_empty_registry_has_no_api_tools(self):
+        assert compile_tools(None).api_tools is None
+        assert compile_tools([]).api_tools is None
+
+    def test_tool_loop_builds_schemas_once(self, scripted_completion, monkeypatch):
+        calls = []
+        function_to_dict = litellm.utils.function_to_dict
+
+        def counting_function_to_dict(func):
+            calls.append(func)
+            return function_to_dict(func)
+
+        monkeypatch.setattr(litellm.utils, "function_to_dict", counting_function_to_dict)
+        scripted = scripted_completion([
+            make_response(tool_calls=[("call_1", "get_current_weather", {"location": "San Francisco"})]),
+            make_response(tool_calls=[("call_2", "get_current_weather", {"location": "Boston"})]),
+            make_response(content="done"),
+        ])
+        response = structured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[get_current_weather],
+            max_recursion=10,
+        )
+        assert response.content == "done"
+        assert len(scripted.calls) == 3
+        assert len(calls) == 1
+        assert all(call["tools"] is scripted.calls[0]["tools"] for call in scripted.calls)
+
+
+def lookup_without_metadata(location: str) -> dict:
+    """
+    Return weather without metadata
+    :param location: str
+    :return: dict
+    """
+    return {"location": location}
+
+
+class TestToolDispatch:
+    def test_specs_precompute_dispatch_information(self):
+        registry = compile_tools([aget_current_weather, Tool(get_current_weather, name="weather"), lookup_without_metadata])
+        assert registry.specs["aget_current_weather"].is_async
+        assert not registry.specs["weather"].is_async
+        assert registry.specs["weather"].func is get_current_weather
+        assert registry.specs["weather"].accepts_metadata
+        assert not registry.specs["lookup_without_metadata"].accepts_metadata
+
+    async def test_async_dispatch_mixes_sync_and_async_tools(self, scripted_completion):
+        scripted = scripted_completion([
+            make_response(tool_calls=[
+                ("call_1", "aget_current_weather", {"location": "San Francisco"}),
+                ("call_2", "lookup_without_metadata", {"location": "Boston", "metadata": "ignored"}),
+            ]),
+            make_response(content="done"),
+        ])
+        response = await astructured_completion(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[aget_current_weather, lookup_without_metadata],
+            max_recursion=10,
+        )
+        tool_messages = [m for m in scripted.calls[1]["messages"] if isinstance(m, dict) and m.get("role") == "tool"]
+        assert [m["tool_call_id"] for m in tool_messages] == ["call_1", "call_2"]
+        assert '"Boston"' in tool_messages[1]["content"]
+        assert response.content == "done"
@@ -0,0 +1,233 @@
+import time
+import asyncio
+import threading
+
+import pytest
+
+from litetoolllm.tools import Tool, ToolLimit
+from litetoolllm.scheduling import ToolLane, ToolScheduler, get_tool_scheduler, get_single_flight
+from litetoolllm.utils import handle_tool_calls, handle_tool_calls_async
+from conftest import make_response
+
+
+class _Probe:
+    """Records how many calls of a tool overlap."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.peak = 0
+
+    def enter(self):
+        with self.lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+
+    def exit(self):
+        with self.lock:
+            self.running -= 1
+
+
+def _turn(name, count, prefix="call"):
+    return make_response(tool_calls=[(f"{prefix}_{i}", name, {"key": str(i)}) for i in range(count)])
+
+
+class TestToolLane:
+    def test_waiters_start_in_arrival_order(self):
+        lane = ToolLane("fifo", ToolLimit(max_concurrency=1))
+        lane.acquire()
+        order = []
+
+        def worker(i):
+            with lane:
+                order.append(i)
+
+        threads = []
+        for i in range(4):
+            threads.append(threading.Thread(target=worker, args=(i,)))
+            threads[-1].start()
+            while lane.stats()["queued"] < i + 1:
+                time.sleep(0.001)
+        lane.release()
+        for thread in threads:
+            thread.join()
+        assert order == [0, 1, 2, 3]
+        stats = lane.stats()
+        assert stats["calls"] == 5 and stats["queued_calls"] == 4 and stats["max_queued"] == 4
+        assert stats["active"] == 0 and stats["max_wait"] > 0
+
+    def test_token_bucket_spaces_calls(self):
+        lane = ToolLane("rate", ToolLimit(rate=50, burst=2))
+        start = time.monotonic()
+        for _ in range(6):
+            with lane:
+                pass
+        # Two calls from the burst, then one every 20ms
+        assert time.monotonic() - start >= 0.075
+
+    async def test_cancelled_waiter_leaves_the_queue(self):
+        lane = ToolLane("cancel", ToolLimit(max_concurrency=1))
+        await lane.acquire_async()
+        waiter = asyncio.ensure_future(lane.acquire_async())
+        await asyncio.sleep(0.01)
+        assert lane.stats()["queued"] == 1
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        lane.release()
+        stats = lane.stats()
+        assert stats["active"] == 0 and stats["queued"] == 0 and stats["calls"] == 1
+
+    def test_invalid_limits_and_conflicting_keys(self):
+        with pytest.raises(ValueError):
+            ToolLimit()
+        with pytest.raises(ValueError):
+            ToolLimit(max_concurrency=0)
+        scheduler = ToolScheduler()
+        lane = scheduler.lane("search", ToolLimit(max_concurrency=2))
+        assert scheduler.lane("search", ToolLimit(max_concurrency=2, key="search")) is lane
+        with pytest.raises(ValueError):
+            scheduler.lane("search", ToolLimit(max_concurrency=3))
+
+
+class TestLimitedDispatch:
+    def test_sync_dispatch_respects_max_concurrency(self):
+        probe = _Probe()
+
+        def limited_sync_lookup(key: str) -> str:
+            """
+            Slow lookup
+            :param key: str
+            :return: str
+            """
+            probe.enter()
+            time.sleep(0.02)
+            probe.exit()
+            return key
+
+        tool = Tool(limited_sync_lookup, limit=ToolLimit(max_concurrency=2))
+        messages = handle_tool_calls(_turn("limited_sync_lookup", 6), [tool], None, max_workers=6)
+        assert [m["content"] for m in messages[1:]] == [str(i) for i in range(6)]
+        assert probe.peak == 2
+        stats = get_tool_scheduler().stats()["limited_sync_lookup"]
+        assert stats["calls"] == 6 and stats["queued_calls"] >= 4
+
+    async def test_limit_holds_across_concurrent_conversations_and_dispatchers(self):
+        probe = _Probe()
+
+        async def shared_backend(key: str) -> str:
+            """
+            Async backend call
+            :param key: str
+            :return: str
+            """
+            probe.enter()
+            await asyncio.sleep(0.01)
+            probe.exit()
+            return key
+
+        def shared_backend_sync(key: str) -> str:
+            """
+            Blocking backend call
+            :param key: str
+            :return: str
+            """
+            probe.enter()
+            time.sleep(0.01)
+            probe.exit()
+            return key
+
+        limit = ToolLimit(max_concurrency=2, key="shared-backend")
+        async_tools = [Tool(shared_backend, limit=limit)]
+        sync_tools = [Tool(shared_backend_sync, limit=limit)]
+        conversations = [handle_tool_calls_async(_turn("shared_backend", 3, f"c{n}"), async_tools, None)
+                         for n in range(5)]
+        sync_turn = asyncio.get_running_loop().run_in_executor(
+            None, handle_tool_calls, _turn("shared_backend_sync", 3), sync_tools, None)
+        results = await asyncio.gather(*conversations, sync_turn)
+        assert all(len(messages) == 4 for messages in results)
+        assert probe.peak == 2
+        assert get_tool_scheduler().stats()["shared-backend"]["calls"] == 18
+
+
+class TestSingleFlight:
+    def test_duplicate_calls_in_a_turn_share_one_execution(self):
+        calls = []
+
+        def flight_lookup(key: str, metadata: dict) -> dict:
+            """
+            Slow lookup
+            :param key: str
+            :return: dict
+            """
+            calls.append((key, metadata))
+            time.sleep(0.05)
+            return {"key": key}
+
+        raw_response = make_response(tool_calls=[("call_0", "flight_lookup", {"key": "a"}),
+                                                 ("call_1", "flight_lookup", {"key": "b"}),
+                                                 ("call_2", "flight_lookup", {"key": "a", "metadata": "x"})])
+        messages = handle_tool_calls(raw_response, [Tool(flight_lookup, single_flight=True)], {"request": 1})
+        assert sorted(calls) == [("a", {"request": 1}), ("b", {"request": 1})]
+        assert [m["tool_call_id"] for m in messages[1:]] == ["call_0", "call_1", "call_2"]
+        assert messages[1]["content"] == messages[3]["content"] != messages[2]["content"]
+        assert get_single_flight().stats()["flight_lookup"] == {"executions": 2, "coalesced": 1}
+
+    async def test_concurrent_conversations_and_threads_share_one_execution(self):
+        calls = []
+
+        async def shared_flight(key: str) -> str:
+            """
+            Async backend call
+            :param key: str
+            :return: str
+            """
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return key.upper()
+
+        tools = [Tool(shared_flight, single_flight=True)]
+        conversations = [handle_tool_calls_async(_turn("shared_flight", 1, f"c{n}"), tools, {"n": n})
+                         for n in range(5)]
+        results = await asyncio.gather(*conversations)
+        assert calls == ["0"]
+        assert [messages[1]["tool_call_id"] for messages in results] == [f"c{n}_0" for n in range(5)]
+        assert {messages[1]["content"] for messages in results} == {"0"}
+
+        def blocking_flight(key: str) -> str:
+            """
+            Blocking backend call
+            :param key: str
+            :return: str
+            """
+            calls.append(key)
+            time.sleep(0.05)
+            return key
+
+        sync_tools = [Tool(blocking_flight, single_flight=True)]
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(handle_tool_calls_async(_turn("blocking_flight", 2), sync_tools, None),
+                             loop.run_in_executor(None, handle_tool_calls, _turn("blocking_flight", 1), sync_tools,
+                                                  None))
+        assert calls == ["0", "0", "1"]
+
+    async def test_errors_are_shared_and_abandoned_waiters_do_not_cancel_others(self):
+        flight = get_single_flight()
+
+        async def fail():
+            await asyncio.sleep(0.02)
+            raise RuntimeError("backend down")
+
+        outcomes = await asyncio.gather(flight.run_async("failing", "k", fail),
+                                        flight.run_async("failing", "k", fail), return_exceptions=True)
+        assert [type(o) for o in outcomes] == [RuntimeError, RuntimeError]
+
+        async def slow():
+            await asyncio.sleep(0.05)
+            return "ok"
+
+        leader = asyncio.ensure_future(flight.run_async("slow", "k", slow))
+        follower = asyncio.ensure_future(flight.run_async("slow", "k", slow))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        assert await follower == "ok"
+        assert flight.stats()["slow"] == {"executions": 1, "coalesced": 1}
@@ -0,0 +1,106 @@
+import json
+from typing import List
+
+import pytest
+from pydantic import BaseModel, ValidationError
+
+from litetoolllm import serialization
+from litetoolllm.serialization import (
+    JSONCodec,
+    get_json_codec,
+    set_json_codec,
+    get_type_adapter,
+    validate_json,
+)
+from litetoolllm.core import structured_completion
+from litetoolllm.registry import ToolSpec
+from litetoolllm.models import Temperature
+from litetoolllm.tools import Tool, get_current_weather, convert_fahrenheit_to_celsius
+from conftest import make_response
+
+
+class Item(BaseModel):
+    name: str
+    qty: int
+
+
+def order_items(items: List[Item], note=None, metadata=None):
+    return {"count": sum(item.qty for item in items), "note": note}
+
+
+class TestCodec:
+    def teardown_method(self):
+        set_json_codec("json")
+
+    def test_default_codec_matches_json_dumps(self, scripted_completion):
+        assert get_json_codec().name == "json"
+        scripted_completion([
+            make_response(tool_calls=[("call_1", "get_current_weather", {"location": "San Francisco"})]),
+            make_response(content="done"),
+        ])
+        response = structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}],
+                                         tools=[get_current_weather])
+        assert response.messages[2]["content"] == json.dumps({"location": "San Francisco", "temperature": "68°F"})
+
+    def test_codecs_round_trip_the_same_values(self):
+        value = {"a": [1, 2.5, None, True], "b": {"c": "68°F"}}
+        set_json_codec("json")
+        assert serialization.loads(serialization.dumps(value)) == value
+        assert serialization.loads(b'{"a": 1}') == {"a": 1}
+        if serialization.orjson is not None:
+            set_json_codec("orjson")
+            assert serialization.loads(serialization.dumps(value)) == value
+
+    def test_custom_codec_is_used_for_tool_results(self, scripted_completion):
+        class UpperCodec(JSONCodec):
+            def dumps(self, value):
+                return super().dumps(value).upper()
+
+        set_json_codec(UpperCodec())
+        scripted_completion([
+            make_response(tool_calls=[("call_1", "get_current_weather", {"location": "Paris"})]),
+            make_response(content="done"),
+        ])
+        response = structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}],
+                                         tools=[get_current_weather])
+        assert response.messages[2]["content"] == response.messages[2]["content"].upper()
+
+
+class TestValidators:
+    def test_type_adapter_is_cached_per_model(self):
+        assert get_type_adapter(Temperature) is get_type_adapter(Temperature)
+
+    def test_validates_from_str_and_bytes(self):
+        document = '{"location": "Paris", "temperature": "20C"}'
+        assert validate_json(Temperature, document) == Temperature(location="Paris", temperature="20C")
+        assert validate_json(Temperature, document.encode()) == Temperature(location="Paris", temperature="20C")
+        assert validate_json(List[int], b"[1, 2]") == [1, 2]
+
+    def test_tool_arguments_pass_through_as_decoded(self):
+        spec = ToolSpec("order_items", order_items, schema={})
+        assert spec.arguments_model is None
+        args = spec.parse_arguments('{"items": [{"name": "a", "qty": "2"}], "note": 7, "extra": 1}')
+        assert args == {"items": [{"name": "a", "qty": "2"}], "note": 7, "extra": 1}
+        assert spec.parse_arguments('{"items": "not a list"}') == {"items": "not a list"}
+
+    def test_tool_arguments_are_validated_when_opted_in(self):
+        spec = ToolSpec("order_items", Tool(order_items, validate_arguments=True), schema={})
+        args = spec.parse_arguments('{"items": [{"name": "a", "qty": "2"}], "extra": 1}')
+        assert args == {"items": [Item(name="a", qty=2)], "note": None, "extra": 1}
+        assert spec.arguments_model is spec.arguments_model
+        assert "metadata" not in spec.arguments_model.model_fields
+        with pytest.raises(ValidationError):
+            spec.parse_arguments('{"items": [{"name": "a", "qty": "many"}]}')
+
+    def test_numbers_are_accepted_for_str_parameters(self):
+        spec = ToolSpec("convert_fahrenheit_to_celsius", convert_fahrenheit_to_celsius, schema={})
+        assert spec.parse_arguments('{"temp_in_fahrenheit": 68}') == {"temp_in_fahrenheit": "68"}
+        assert spec.parse_arguments('{"temp_in_fahrenheit": 68.5}') == {"temp_in_fahrenheit": "68.5"}
+        assert spec.parse_arguments('{"temp_in_fahrenheit": true}') == {"temp_in_fahrenheit": True}
+        validated = ToolSpec("convert", Tool(convert_fahrenheit_to_celsius, validate_arguments=True), schema={})
+        assert validated.parse_arguments('{"temp_in_fahrenheit": 68}') == {"temp_in_fahrenheit": "68"}
+
+    def test_unmodellable_signature_falls_back_to_plain_decoding(self):
+        spec = ToolSpec("dict", dict, schema={})
+        assert spec.arguments_model is None
+        assert spec.parse_arguments('{"obj": [1]}') == {"obj": [1]}
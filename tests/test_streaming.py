@@ -0,0 +1,283 @@
+import json
+import time
+import asyncio
+import threading
+from typing import List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+import litetoolllm.streaming
+from litetoolllm.streaming import (
+    PartialJSONParser,
+    make_partial_model,
+    structured_completion_stream,
+    astructured_completion_stream,
+)
+from litetoolllm.models import Temperature, Temperatures
+from litetoolllm.tools import Tool, get_current_weather, aget_current_weather
+from litetoolllm.errors import ToolTimeoutError
+from conftest import make_stream
+
+
+def _feed_all(text, step=1):
+    parser = PartialJSONParser()
+    values = []
+    for start in range(0, len(text), step):
+        parser.feed(text[start:start + step])
+        values.append(parser.parse())
+    return values
+
+
+class TestPartialJSONParser:
+    def test_every_prefix_parses_to_a_prefix_of_the_document(self):
+        document = '{"temperatures": [{"location": "San \\"Fran\\"", "temperature": "68F"}, {"location": "NY"}], "ok": true}'
+        values = _feed_all(document)
+        assert values[-1] == {"temperatures": [{"location": 'San "Fran"', "temperature": "68F"}, {"location": "NY"}], "ok": True}
+        assert {"temperatures": [{"location": "San "}]} in values
+        assert all(value is None or isinstance(value, dict) for value in values)
+
+    def test_incomplete_key_is_dropped(self):
+        parser = PartialJSONParser()
+        parser.feed('{"location": "Paris", "tempera')
+        assert parser.parse() == {"location": "Paris"}
+
+
+class Forecast(BaseModel):
+    days: List[Temperature]
+    note: Optional[str]
+
+
+class TestPartialModel:
+    def test_nested_fields_become_optional(self):
+        partial = make_partial_model(Forecast)
+        assert partial.model_validate({"days": [{"location": "Paris"}]}).days[0].temperature is None
+        assert make_partial_model(Forecast) is partial
+
+
+class TestStructuredCompletionStream:
+    def test_streams_tokens_partials_and_final(self, scripted_completion):
+        content = '{"temperatures": [{"location": "Paris", "temperature": "20C"}]}'
+        scripted_completion([make_stream(content=content)])
+        events = list(structured_completion_stream(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Temperature in Paris?"}],
+            response_model=Temperatures,
+        ))
+        assert "".join(e.content for e in events if e.type == "token") == content
+        partials = [e.partial for e in events if e.type == "partial"]
+        assert partials[0].temperatures is None or partials[0].temperatures == []
+        assert partials[-1].temperatures[0].temperature == "20C"
+        assert events[-1].type == "final"
+        assert events[-1].response.content == Temperatures.model_validate_json(content)
+
+    def test_partial_parsing_stays_linear_on_large_documents(self, scripted_completion, monkeypatch):
+        parses = []
+        parse = PartialJSONParser.parse
+        monkeypatch.setattr(PartialJSONParser, "parse", lambda self: parses.append(self.length) or parse(self))
+
+        def stream(count):
+            content = json.dumps({"temperatures": [{"location": f"city {i}", "temperature": f"{i}F"}
+                                                   for i in range(count)]})
+            scripted_completion([make_stream(content=content, chunk_size=4)])
+            parses.clear()
+            started = time.process_time()
+            events = list(structured_completion_stream(
+                model="gpt-4o-mini",
+                messages=[{"role": "user", "content": "Temperatures?"}],
+                response_model=Temperatures,
+            ))
+            partials = [e.partial for e in events if e.type == "partial"]
+            assert len(partials[-1].temperatures) == count
+            return len(content), sum(parses), time.process_time() - started
+
+        size, parsed, _ = stream(1200)
+        assert size > 50_000
+        # Parses happen at geometrically spaced lengths, so the total work is a small multiple of the size
+        assert parsed < 15 * size
+        _, _, small_time = stream(300)
+        _, _, large_time = stream(1200)
+        assert large_time < 10 * small_time + 0.5
+
+    def test_tool_calls_run_through_tool_loop(self, scripted_completion):
+        scripted = scripted_completion([
+            make_stream(tool_calls=[("call_1", "get_current_weather", {"location": "San Francisco"})]),
+            make_stream(content="It is 68F"),
+        ])
+        events = list(structured_completion_stream(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            tools=[get_current_weather],
+            max_recursion=10,
+        ))
+        assert [e.type for e in events if e.type not in ("token", "partial")] == ["tool_call", "tool_result", "final"]
+        assert json.loads(events[1].message["content"]) == {"location": "San Francisco", "temperature": "68\u00b0F"}
+        assert scripted.calls[1]["messages"][-1]["tool_call_id"] == "call_1"
+        assert events[-1].response.content == "It is 68F"
+        assert len(events[-1].response.messages) == 4
+
+    async def test_async_stream(self, scripted_completion):
+        scripted_completion([
+            make_stream(tool_calls=[("call_1", "aget_current_weather", {"location": "San Francisco"})]),
+            make_stream(content='{"location": "San Francisco", "temperature": "68F"}'),
+        ])
+        events = [event async for event in astructured_completion_stream(
+            model="gpt-4o-mini",
+            messages=[{"role": "user", "content": "Weather?"}],
+            response_model=Temperature,
+            tools=[aget_current_weather],
+            max_recursion=10,
+        )]
+        assert any(e.type == "partial" and e.partial.location == "San Francisco" for e in events)
+        assert events[-1].response.content == Temperature(location="San Francisco", temperature="68F")
+
+
+class TestSpeculativeTools:
+    def _install(self, monkeypatch, turns, delay=0.01, fail_after=None):
+        """Stream ``turns`` (lists of chunks) one per call, pausing between chunks."""
+        stream_ended = []
+
+        async def acompletion(**kwargs):
+            chunks = turns.pop(0)
+
+            async def stream():
+                for index, chunk in enumerate(chunks):
+                    if fail_after is not None and index == fail_after:
+                        raise ConnectionError("stream dropped")
+                    yield chunk
+                    await asyncio.sleep(delay)
+                stream_ended.append(time.monotonic())
+            return stream()
+
+        def completion(**kwargs):
+            chunks = turns.pop(0)
+
+            def stream():
+                for index, chunk in enumerate(chunks):
+                    if fail_after is not None and index == fail_after:
+                        raise ConnectionError("stream dropped")
+                    yield chunk
+                    time.sleep(delay)
+                stream_ended.append(time.monotonic())
+            return stream()
+
+        monkeypatch.setattr(litetoolllm.streaming, "acompletion", acompletion)
+        monkeypatch.setattr(litetoolllm.streaming, "completion", completion)
+        return stream_ended
+
+    async def test_tools_start_before_stream_ends_and_keep_order(self, monkeypatch):
+        started = {}
+
+        async def lookup(location: str) -> str:
+            """
+            Look up the weather
+            :param location: str
+            :return: str
+            """
+            started[location] = time.monotonic()
+            # The first call is slower, so it finishes last
+            await asyncio.sleep(0.05 if location == "Paris" else 0)
+            return location.upper()
+
+        stream_ended = self._install(monkeypatch, [
+            make_stream(tool_calls=[("call_1", "lookup", {"location": "Paris"}),
+                                    ("call_2", "lookup", {"location": "Rome"})]),
+            make_stream(content="done"),
+        ])
+        events = [event async for event in astructured_completion_stream(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+            tools=[lookup], speculative_tools=True)]
+        assert started["Paris"] < stream_ended[0]
+        results = [e.message for e in events if e.type == "tool_result"]
+        assert [m["tool_call_id"] for m in results] == ["call_1", "call_2"]
+        assert [m["content"] for m in results] == ["PARIS", "ROME"]
+        assert [e.tool_call.id for e in events if e.type == "tool_call"] == ["call_1", "call_2"]
+        assert events[-1].response.content == "done"
+
+    async def test_stream_error_cancels_started_tools(self, monkeypatch):
+        cancelled = []
+
+        async def lookup(location: str) -> str:
+            """
+            Look up the weather
+            :param location: str
+            :return: str
+            """
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.append(location)
+                raise
+            return location
+
+        chunks = make_stream(tool_calls=[("call_1", "lookup", {"location": "Paris"}),
+                                         ("call_2", "lookup", {"location": "Rome"})])
+        self._install(monkeypatch, [chunks], fail_after=len(chunks) - 2)
+        with pytest.raises(ConnectionError):
+            async for _ in astructured_completion_stream(
+                    model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+                    tools=[lookup], speculative_tools=True):
+                pass
+        assert cancelled == ["Paris"]
+
+    def test_sync_stream_speculates_on_threads(self, monkeypatch):
+        started = {}
+        release = threading.Event()
+
+        def lookup(location: str) -> str:
+            """
+            Look up the weather
+            :param location: str
+            :return: str
+            """
+            started[location] = time.monotonic()
+            release.wait(1)
+            return location.upper()
+
+        stream_ended = self._install(monkeypatch, [
+            make_stream(tool_calls=[("call_1", "lookup", {"location": "Paris"}),
+                                    ("call_2", "lookup", {"location": "Rome"})]),
+            make_stream(content="done"),
+        ])
+        events = []
+        for event in structured_completion_stream(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+                tools=[lookup], speculative_tools=True):
+            events.append(event)
+            if event.type == "tool_call" and event.tool_call.id == "call_2":
+                release.set()
+        assert started["Paris"] < stream_ended[0]
+        assert [e.message["content"] for e in events if e.type == "tool_result"] == ["PARIS", "ROME"]
+        assert events[-1].response.content == "done"
+
+    def test_sync_speculation_honours_tool_timeouts(self, monkeypatch):
+        def stuck_lookup(location: str) -> str:
+            """
+            Look up the weather slowly
+            :param location: str
+            :return: str
+            """
+            time.sleep(1)
+            return location
+
+        def turns():
+            return [make_stream(tool_calls=[("call_1", "stuck_lookup", {"location": "Paris"}),
+                                            ("call_2", "get_current_weather", {"location": "Rome"})]),
+                    make_stream(content="done")]
+
+        self._install(monkeypatch, turns(), delay=0)
+        started = time.monotonic()
+        events = list(structured_completion_stream(
+            model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+            tools=[Tool(stuck_lookup, timeout=0.05), get_current_weather], speculative_tools=True))
+        assert time.monotonic() - started < 0.8
+        results = [e.message["content"] for e in events if e.type == "tool_result"]
+        assert "timed out" in results[0] and "Rome" in results[1]
+        assert events[-1].response.content == "done"
+
+        self._install(monkeypatch, turns(), delay=0)
+        with pytest.raises(ToolTimeoutError):
+            list(structured_completion_stream(
+                model="gpt-4o-mini", messages=[{"role": "user", "content": "Weather?"}],
+                tools=[Tool(stuck_lookup, timeout=0.05, on_timeout="raise"), get_current_weather],
+                speculative_tools=True))
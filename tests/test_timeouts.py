@@ -0,0 +1,116 @@
+import time
+import asyncio
+
+import pytest
+
+import litetoolllm.core
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.deadline import Deadline
+from litetoolllm.errors import ToolTimeoutError, DeadlineExceededError
+from litetoolllm.tools import Tool, get_current_weather
+from conftest import make_response
+
+MESSAGES = [{"role": "user", "content": "Look it up"}]
+
+
+def slow_lookup(query: str) -> str:
+    """
+    Look something up slowly
+    :param query: str
+    :return: str
+    """
+    time.sleep(1)
+    return "late"
+
+
+async def aslow_lookup(query: str) -> str:
+    """
+    Look something up slowly
+    :param query: str
+    :return: str
+    """
+    await asyncio.sleep(5)
+    return "late"
+
+
+def _turns(*names):
+    return [
+        make_response(tool_calls=[(f"call_{i}", name, {"query": "x"} if "lookup" in name else {"location": "Paris"})
+                                  for i, name in enumerate(names)]),
+        make_response(content="done"),
+    ]
+
+
+class TestDeadline:
+    def test_limit_caps_timeout_and_raises_when_spent(self):
+        deadline = Deadline(10)
+        assert deadline.limit(1) == 1
+        assert 9 < deadline.limit() <= 10
+        with pytest.raises(DeadlineExceededError):
+            Deadline(0).limit()
+
+    def test_invalid_timeout_policy(self):
+        with pytest.raises(ValueError):
+            Tool(slow_lookup, on_timeout="ignore")
+
+
+class TestToolTimeouts:
+    def test_sync_timeout_is_reported_to_the_model(self, scripted_completion):
+        scripted = scripted_completion(_turns("slow_lookup", "get_current_weather"))
+        started = time.monotonic()
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                         tools=[Tool(slow_lookup, timeout=0.05), get_current_weather])
+        assert time.monotonic() - started < 0.8
+        assert response.content == "done"
+        tool_messages = scripted.calls[1]["messages"][2:]
+        assert "timed out" in tool_messages[0]["content"]
+        assert "Paris" in tool_messages[1]["content"]
+
+    def test_sequential_calls_after_a_timeout_get_their_own_thread(self, scripted_completion):
+        scripted = scripted_completion(_turns("slow_lookup", "get_current_weather"))
+        structured_completion(model="gpt-4o-mini", messages=MESSAGES, max_tool_workers=1,
+                              tools=[Tool(slow_lookup, timeout=0.1), Tool(get_current_weather, timeout=0.1)])
+        tool_messages = scripted.calls[1]["messages"][2:]
+        assert "timed out" in tool_messages[0]["content"]
+        assert "Paris" in tool_messages[1]["content"]
+
+    def test_sync_timeout_raises_with_raise_policy(self, scripted_completion):
+        scripted_completion(_turns("slow_lookup"))
+        with pytest.raises(ToolTimeoutError):
+            structured_completion(model="gpt-4o-mini", messages=MESSAGES, max_tool_workers=1,
+                                  tools=[Tool(slow_lookup, timeout=0.05, on_timeout="raise")])
+
+    async def test_async_timeout_is_reported_and_other_calls_finish(self, scripted_completion):
+        scripted = scripted_completion(_turns("aslow_lookup", "get_current_weather"))
+        started = time.monotonic()
+        response = await astructured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                                tools=[Tool(aslow_lookup, timeout=0.05), get_current_weather])
+        assert time.monotonic() - started < 1
+        assert response.content == "done"
+        assert "timed out" in scripted.calls[1]["messages"][2]["content"]
+
+
+class TestRequestDeadline:
+    async def test_deadline_cancels_hung_tool(self, scripted_completion):
+        scripted = scripted_completion(_turns("aslow_lookup"))
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceededError):
+            await astructured_completion(model="gpt-4o-mini", messages=MESSAGES,
+                                         tools=[Tool(aslow_lookup, timeout=10)], deadline=0.1)
+        assert time.monotonic() - started < 1
+        assert 0 < scripted.calls[0]["timeout"] <= 0.1
+
+    def test_deadline_caps_caller_timeout_and_covers_sync_tools(self, scripted_completion):
+        scripted = scripted_completion(_turns("slow_lookup"))
+        with pytest.raises(DeadlineExceededError):
+            structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[slow_lookup],
+                                  deadline=0.1, timeout=30)
+        assert scripted.calls[0]["timeout"] <= 0.1
+
+    async def test_deadline_cancels_slow_model_call(self, scripted_completion, monkeypatch):
+        async def hung_acompletion(**kwargs):
+            await asyncio.sleep(5)
+
+        monkeypatch.setattr(litetoolllm.core, "acompletion", hung_acompletion)
+        with pytest.raises(DeadlineExceededError):
+            await astructured_completion(model="gpt-4o-mini", messages=MESSAGES, deadline=0.05)
@@ -0,0 +1,117 @@
+import json
+import time
+
+import litellm
+import pytest
+
+from litetoolllm.core import structured_completion, astructured_completion
+from litetoolllm.streaming import structured_completion_stream
+from litetoolllm.cache import InMemoryResponseCache
+from litetoolllm import instrumentation
+from litetoolllm.instrumentation import TraceEvent
+from litetoolllm.usage import UsageReport
+from conftest import make_response, make_stream
+
+MESSAGES = [{"role": "user", "content": "Weather in Paris?"}]
+
+
+def slow_lookup(location: str) -> str:
+    """
+    Look up the weather slowly
+    :param location: str
+    :return: str
+    """
+    time.sleep(0.02)
+    return "20C"
+
+
+def _tool_then_answer():
+    return [
+        make_response(tool_calls=[("call_1", "slow_lookup", {"location": "Paris"}),
+                                  ("call_2", "slow_lookup", {"location": "Lyon"})],
+                      usage={"prompt_tokens": 1000, "completion_tokens": 20, "total_tokens": 1020,
+                             "prompt_tokens_details": {"cached_tokens": 512}}),
+        make_response(content="It is 20C",
+                      usage={"prompt_tokens": 1100, "completion_tokens": 10, "total_tokens": 1110}),
+    ]
+
+
+class TestUsageReport:
+    def test_per_iteration_breakdown(self, scripted_completion):
+        scripted_completion(_tool_then_answer())
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[slow_lookup])
+        usage = response.usage
+        assert usage.turns == 2
+        first, second = usage.iterations
+        assert (first.prompt_tokens, first.completion_tokens, first.cached_tokens) == (1000, 20, 512)
+        assert (second.prompt_tokens, second.completion_tokens, second.cached_tokens) == (1100, 10, 0)
+        assert set(first.tool_times) == {"slow_lookup"}
+        assert first.tool_times["slow_lookup"] >= 0.04
+        assert second.tool_times == {}
+        assert usage.prompt_tokens == 2100 and usage.completion_tokens == 30 and usage.cached_tokens == 512
+        assert usage.tool_times["slow_lookup"] == usage.tool_time
+        assert usage.llm_time >= 0
+
+    @pytest.mark.parametrize("stream", [False, True])
+    def test_usage_is_collected_without_a_tracer(self, scripted_completion, monkeypatch, stream):
+        def no_tracer(*args, **kwargs):
+            raise AssertionError("a Tracer was built without trace hooks")
+
+        monkeypatch.setattr(instrumentation.Tracer, "__init__", no_tracer)
+        if stream:
+            scripted_completion([make_stream(tool_calls=[("call_1", "slow_lookup", {"location": "Paris"})]),
+                                 make_stream(content="It is 20C")])
+            events = list(structured_completion_stream(model="gpt-4o-mini", messages=MESSAGES,
+                                                       tools=[slow_lookup]))
+            usage = events[-1].response.usage
+        else:
+            scripted_completion(_tool_then_answer())
+            usage = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[slow_lookup]).usage
+        assert usage.turns == 2
+        assert usage.iterations[0].tool_times["slow_lookup"] >= 0.02
+
+    def test_response_with_usage_serializes(self, scripted_completion):
+        scripted_completion(_tool_then_answer())
+        response = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[slow_lookup])
+        dumped = json.loads(response.model_dump_json())
+        assert dumped["usage"] == json.loads(json.dumps(response.usage.to_dict()))
+        assert dumped["usage"]["turns"] == 2
+        assert response.model_dump()["usage"]["iterations"][0]["prompt_tokens"] == 1000
+
+    async def test_async_loop_fills_report(self, scripted_completion):
+        scripted_completion(_tool_then_answer())
+        response = await astructured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[slow_lookup])
+        assert response.usage.turns == 2
+        assert response.usage.iterations[0].tool_times["slow_lookup"] >= 0.02
+
+    def test_cost_uses_litellm_pricing(self, scripted_completion):
+        scripted_completion(_tool_then_answer())
+        usage = structured_completion(model="gpt-4o-mini", messages=MESSAGES, tools=[slow_lookup]).usage
+        expected = 0.0
+        for prompt, completion, cached in ((1000, 20, 512), (1100, 10, 0)):
+            expected += sum(litellm.cost_per_token(model="gpt-4o-mini", prompt_tokens=prompt,
+                                                   completion_tokens=completion, cache_read_input_tokens=cached))
+        assert usage.cost == expected
+        assert usage.to_dict()["iterations"][0]["cost"] > 0
+
+    def test_unknown_model_has_no_cost(self):
+        report = UsageReport()
+        report(TraceEvent("llm_call", "r", None, 0, "no-such-model", 0.0, 0.1,
+                          usage={"prompt_tokens": 10, "completion_tokens": 5}))
+        assert report.turns == 1
+        assert report.cost is None
+
+    def test_cached_response_costs_nothing(self, scripted_completion):
+        scripted_completion([make_response(content="hi", usage={"prompt_tokens": 10, "completion_tokens": 2,
+                                                                "total_tokens": 12})])
+        cache = InMemoryResponseCache()
+        for _ in range(2):
+            response = structured_completion(model="gpt-4o-mini", messages=[{"role": "user", "content": "hi"}],
+                                             cache=cache)
+        assert response.usage.iterations[0].cache_hit
+        assert response.usage.cost == 0.0
+
+    def test_stream_final_response_carries_usage(self, scripted_completion):
+        scripted_completion([make_stream(content="hello there")])
+        events = list(structured_completion_stream(model="gpt-4o-mini", messages=MESSAGES))
+        assert events[-1].response.usage.turns == 1